@@ -0,0 +1,184 @@
+import argparse
+import bisect
+import os
+import re
+import threading
+import time
+import unicodedata
+
+AUTHOR_INDEX_PATH = os.environ.get("AUTHOR_INDEX_PATH", os.path.join("output", "author_names.tsv"))
+SUGGEST_LIMIT = 8
+SCAN_LIMIT = 200    # prefix matches looked at per suggestion query
+
+
+def normalize(name):
+    # "Yann  LeCun", "yann lecun" and "Yánn Le-Cun" -> "yann lecun" / "yann le cun"
+    text = unicodedata.normalize("NFKD", name or "")
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return " ".join(re.findall(r"\w+", text.lower()))
+
+
+def name_keys(key):
+    # The full normalized name, then every suffix starting at a word, so
+    # "bengio" finds "Yoshua Bengio"
+    words = key.split()
+    return [" ".join(words[i:]) for i in range(len(words))]
+
+
+# AUTHOR NAME PREFIX INDEX
+
+class AuthorNameIndex:
+    """Type-ahead over the names of every author resolved so far.
+
+    Names come from API searches, analyzed and evaluated authors, ingested
+    dumps and co-author lists in the paper cache. On disk they are one
+    append-only TSV file (author ID, name; the last line for an ID wins),
+    shared by every process. In memory the index is a sorted list of
+    (name key, author ID) pairs, so a prefix lookup is a binary search plus a
+    short scan. New lines written by other processes are read incrementally
+    on the next lookup.
+    """
+
+    def __init__(self, path=AUTHOR_INDEX_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._names = {}     # authorId -> display name
+        self._norm = {}      # authorId -> normalized name
+        self._keys = []      # sorted (key, authorId)
+        self._offset = 0     # bytes of `path` already read
+
+    def __len__(self):
+        with self._lock:
+            self._refresh()
+            return len(self._names)
+
+    def _refresh(self):
+        # Caller holds the lock
+        try:
+            size = os.path.getsize(self.path)
+        except (FileNotFoundError, TypeError):
+            return
+        if size < self._offset:
+            # Rewritten from scratch: start over
+            self._names, self._norm, self._keys, self._offset = {}, {}, [], 0
+        if size == self._offset:
+            return
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            data = f.read(size - self._offset)
+        end = data.rfind(b"\n") + 1     # only complete lines; the rest is still being written
+        self._offset += end
+        rows = []
+        for line in data[:end].decode("utf-8", "replace").splitlines():
+            author_id, _, name = line.partition("\t")
+            if author_id and name:
+                rows.append((author_id, name))
+        self._apply(rows)
+
+    def _apply(self, rows):
+        # Caller holds the lock
+        changed = {aid: name for aid, name in rows if self._names.get(aid) != name}
+        if not changed:
+            return
+        if len(changed) > len(self._keys) // 8:
+            # Bulk load: one sort instead of many insertions
+            self._names.update(changed)
+            self._norm.update((aid, normalize(name)) for aid, name in changed.items())
+            self._keys = sorted((k, aid) for aid, key in self._norm.items() for k in name_keys(key))
+            return
+        for aid, name in changed.items():
+            if aid in self._norm:
+                for k in name_keys(self._norm[aid]):
+                    i = bisect.bisect_left(self._keys, (k, aid))
+                    if i < len(self._keys) and self._keys[i] == (k, aid):
+                        del self._keys[i]
+            self._names[aid] = name
+            self._norm[aid] = normalize(name)
+            for k in name_keys(self._norm[aid]):
+                bisect.insort(self._keys, (k, aid))
+
+    def add(self, author_id, name):
+        self.add_many([(author_id, name)])
+
+    def add_many(self, authors):
+        # authors: (authorId, name) pairs; unchanged and nameless ones are skipped
+        with self._lock:
+            self._refresh()
+            rows = []
+            for aid, name in authors:
+                name = " ".join((name or "").split())
+                if aid and name and self._names.get(str(aid)) != name:
+                    rows.append((str(aid), name))
+            if not rows:
+                return
+            if self.path:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write("".join(f"{aid}\t{name}\n" for aid, name in rows))
+                self._refresh()
+            else:
+                self._apply(rows)
+
+    def suggest(self, prefix, limit=SUGGEST_LIMIT):
+        """Authors whose name, or a word in it, starts with `prefix`:
+        [{"authorId", "name"}], names starting with the prefix first."""
+        q = normalize(prefix)
+        if not q:
+            return []
+        with self._lock:
+            self._refresh()
+            i = bisect.bisect_left(self._keys, (q,))
+            found = {}
+            for key, aid in self._keys[i:i + SCAN_LIMIT]:
+                if not key.startswith(q):
+                    break
+                found.setdefault(aid, self._norm[aid].startswith(q))
+            names = self._names
+            ranked = sorted(found, key=lambda aid: (not found[aid], names[aid]))
+            return [{"authorId": aid, "name": names[aid]} for aid in ranked[:limit]]
+
+    def exact(self, name):
+        # Every known author with exactly this (normalized) name
+        q = normalize(name)
+        if not q:
+            return []
+        with self._lock:
+            self._refresh()
+            i = bisect.bisect_left(self._keys, (q,))
+            matches = []
+            for key, aid in self._keys[i:]:
+                if key != q:
+                    break
+                if self._norm[aid] == q:
+                    matches.append({"authorId": aid, "name": self._names[aid]})
+            return matches
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or query the author name index")
+    parser.add_argument("query", nargs="*", help="name prefixes to look up")
+    parser.add_argument("--from-cache", action="store_true",
+                        help="add every author and co-author in the local paper cache")
+    parser.add_argument("--path", default=AUTHOR_INDEX_PATH)
+    args = parser.parse_args()
+
+    index = AuthorNameIndex(args.path)
+    if args.from_cache:
+        from bulk_fetch import PAPER_FIELDS
+        from paper_cache import PaperCache
+        cache = PaperCache()
+        before = len(index)
+        for aid in cache.author_ids(PAPER_FIELDS):
+            cached = cache.get(aid, PAPER_FIELDS, allow_stale=True)
+            if cached is not None:
+                index.add_many(zip(cached[0].author_ids, cached[0].author_labels))
+        print(f"Added {len(index) - before:,} authors from the paper cache")
+    start = time.perf_counter()
+    print(f"Author index '{args.path}': {len(index):,} authors (loaded in {time.perf_counter() - start:.2f} s)")
+    for q in args.query:
+        start = time.perf_counter()
+        matches = index.suggest(q)
+        elapsed = (time.perf_counter() - start) * 1e6
+        print(f"   {q!r}: {len(matches)} suggestions in {elapsed:.0f} µs")
+        for m in matches:
+            print(f"      {m['name']} ({m['authorId']})")
@@ -0,0 +1,91 @@
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bulk_fetch import PAPER_FIELDS, BulkFetcher
+from http_client import ApiClient
+from paper_store import PaperStore
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Times the paper fetch paths against the local stub server (run in its own
+# process so it does not compete for the GIL) with simulated network latency:
+#   legacy    - the original web_app loop (sequential pages, 0.1 s sleep, 5000 cap)
+#   pipelined - BulkFetcher.iter_pages with `--window` pages in flight, no cap
+#   batch     - BulkFetcher.iter_author (author batch + pipelined paper batches)
+#
+#   python benchmarks/bench_fetch.py --latency 0.15
+
+
+def legacy_fetch(api_url, author_id):
+    papers, offset = [], 0
+    while True:
+        r = requests.get(f"{api_url}/author/{author_id}/papers",
+                         params={"fields": PAPER_FIELDS, "limit": 100, "offset": offset}, timeout=20)
+        batch = r.json().get("data", [])
+        if not batch:
+            break
+        papers.extend(batch)
+        offset += 100
+        time.sleep(0.1)
+        if offset >= 5000:
+            break
+    return len(papers)
+
+
+def pipelined_fetch(fetcher, author_id):
+    store = PaperStore()
+    for page in fetcher.iter_pages(author_id, PAPER_FIELDS):
+        store.extend(page)
+    return len(store)
+
+
+def batch_fetch(fetcher, author_id):
+    store = PaperStore()
+    for event in fetcher.iter_author(author_id, PAPER_FIELDS):
+        store.extend(event["papers"])
+    return len(store)
+
+
+def timed(label, fn, requests_made=None):
+    start = time.perf_counter()
+    n = fn()
+    elapsed = time.perf_counter() - start
+    extra = f"  {requests_made()} requests" if requests_made else ""
+    print(f"{label:<28} {n:>6} papers  {elapsed:>7.2f} s  {n / elapsed:>8.0f} papers/s{extra}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark paper fetching against the stub API")
+    parser.add_argument("--latency", type=float, default=0.15, help="simulated seconds per response")
+    parser.add_argument("--window", type=int, default=8, help="requests kept in flight")
+    parser.add_argument("--papers", type=int, default=20000)
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    server = subprocess.Popen([sys.executable, os.path.join(ROOT, "stub_server.py"), "--port", str(args.port),
+                               "--latency", str(args.latency), "--papers", "5000=5000", f"20000={args.papers}"],
+                              stdout=subprocess.DEVNULL)
+    api_url = f"http://127.0.0.1:{args.port}/graph/v1"
+    try:
+        for _ in range(50):
+            try:
+                requests.get(f"{api_url}/author/1", timeout=1)
+                break
+            except requests.ConnectionError:
+                time.sleep(0.1)
+        # Warm up: the stub generates each synthetic author on first access
+        for aid in ("5000", "20000"):
+            requests.get(f"{api_url}/author/{aid}/papers", params={"limit": 1}, timeout=120)
+        timed("legacy loop (5k author)", lambda: legacy_fetch(api_url, "5000"))
+        for label, fn in (("pipelined pages", pipelined_fetch), ("batch endpoints", batch_fetch)):
+            fetcher = BulkFetcher(api_url, client=ApiClient(), window=args.window)
+            timed(f"{label} ({args.papers // 1000}k author)", lambda: fn(fetcher, "20000"), lambda: fetcher.requests)
+    finally:
+        server.terminate()
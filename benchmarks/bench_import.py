@@ -0,0 +1,72 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cold-start cost of each module and of the CLI, in fresh interpreters:
+#   - import time of every module (python -X importtime), the heavy
+#     dependencies it pulls in and its slowest direct imports
+#   - wall time of `levelling_up_cli.py --help` and `levelling_up_cli.py evaluate --help`
+#
+#   python benchmarks/bench_import.py [--repeat 5] [--modules levelling_up levelling_up_cli]
+
+MODULES = ["levelling_up_cli", "levelling_up", "metrics", "bulk_fetch", "results_store", "coauthors", "plots", "generate_pdf", "telemetry"]
+HEAVY = ["pandas", "scipy", "pyarrow", "matplotlib", "seaborn", "reportlab", "streamlit"]
+COMMANDS = {"cli --help": ["levelling_up_cli.py", "--help"],
+            "cli evaluate --help": ["levelling_up_cli.py", "evaluate", "--help"]}
+
+
+def import_profile(module):
+    # {nesting depth: [(module, cumulative µs)]} as reported by -X importtime;
+    # imports done by the interpreter itself (site, .pth files) are included
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                         cwd=ROOT, capture_output=True, text=True, check=True).stderr
+    times = {}
+    for line in out.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue    # header line
+        # Nested imports are indented by two spaces per level
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        times.setdefault(depth, []).append((name.strip(), int(cumulative)))
+    return times
+
+
+def cold_start(args, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *args], cwd=ROOT, capture_output=True, check=True)
+        times.append(time.perf_counter() - start)
+    return min(times), statistics.median(times)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure module import times and CLI start-up")
+    parser.add_argument("--modules", nargs="+", default=MODULES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=4, help="slowest direct imports to list per module")
+    args = parser.parse_args()
+
+    startup = {name for depth in import_profile("sys").values() for name, _ in depth}
+    print(f"{'module':<15} {'import ms':>10}  heavy dependencies / slowest direct imports")
+    for module in args.modules:
+        samples = [import_profile(module) for _ in range(args.repeat)]
+        best = min(samples, key=lambda s: dict(s[0])[module])
+        total = dict(best[0])[module] / 1000
+        loaded = {name for depth in best.values() for name, _ in depth}
+        heavy = [h for h in HEAVY if h in loaded]
+        direct = sorted((item for item in best.get(1, []) if item[0] not in startup), key=lambda item: -item[1])[:args.top]
+        print(f"{module:<15} {total:>10.1f}  {', '.join(heavy) or '-'}")
+        print(f"{'':<15} {'':>10}  " + ", ".join(f"{name} {us / 1000:.0f}" for name, us in direct))
+
+    print(f"\n{'command':<22} {'best ms':>8} {'median ms':>10}")
+    for label, command in COMMANDS.items():
+        best, median = cold_start(command, args.repeat)
+        print(f"{label:<22} {best * 1000:>8.1f} {median * 1000:>10.1f}")
@@ -0,0 +1,104 @@
+import argparse
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from metrics import compute_metrics, paper_columns
+
+# Compares the vectorized metrics engine against the original per-paper
+# Python loops (kept below as the reference implementation).
+#
+#   python benchmarks/bench_metrics.py --papers 100000
+
+
+# SYNTHETIC AUTHORS
+
+AUTHOR = {"authorId": "0", "name": "Synthetic Author"}
+
+
+def synthetic_author(n_papers, seed=0):
+    rng = random.Random(seed)
+    papers = []
+    for _ in range(n_papers):
+        n_authors = rng.choice([1, 2, 3, 4, 6, 10]) if rng.random() > 0.01 else rng.randint(1000, 3000)
+        papers.append({
+            "title": "Synthetic paper",
+            "year": rng.randint(1960, 2025) if rng.random() > 0.02 else None,
+            "citationCount": int(rng.paretovariate(1.1)) - 1,
+            "authors": [AUTHOR] * n_authors,
+        })
+    return papers
+
+
+# REFERENCE (ORIGINAL LOOP) IMPLEMENTATION
+
+def legacy_h_index(citations):
+    citations = sorted([c for c in citations if c > 0], reverse=True)
+    for i, c in enumerate(citations, 1):
+        if c < i:
+            return i - 1
+    return len(citations)
+
+
+def legacy_metrics(papers):
+    current = datetime.now().year
+    citations = [p.get("citationCount", 0) or 0 for p in papers]
+    fresh = []
+    adjusted = []
+    yearly = defaultdict(int)
+    for p in papers:
+        y = p.get("year")
+        c = p.get("citationCount", 0) or 0
+        if y and y >= 1950:
+            fresh.append(c / (1 + 0.15 * (current - y)))
+        n = min(len(p.get("authors") or []) or 1, 1000)
+        adjusted.append(c / (1 + 0.05 * (n - 1)))
+        if y and 1950 <= y <= current:
+            yearly[y] += c
+    years = sorted(yearly)
+    cls = 0
+    if len(years) >= 5:
+        per_year = [yearly[y] for y in years]
+        avg = sum(per_year) / len(per_year)
+        if avg:
+            cv = (sum((x - avg) ** 2 for x in per_year) / len(per_year)) ** 0.5 / avg
+            cls = round(avg / (1 + cv) + (len(years) - 5) * 2, 1)
+    return {
+        "papers": len(papers),
+        "total_citations": sum(citations),
+        "h_index": legacy_h_index(citations),
+        "freshness_h": legacy_h_index(fresh),
+        "cri": legacy_h_index(adjusted),
+        "cls": cls,
+    }
+
+
+def best_of(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the metrics engine")
+    parser.add_argument("--papers", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'papers':>8} {'legacy ms':>10} {'columns ms':>11} {'engine ms':>10} {'speedup':>8}")
+    for n in args.papers:
+        papers = synthetic_author(n, seed=n)
+        legacy_t, expected = best_of(lambda: legacy_metrics(papers), args.repeat)
+        columns_t, cols = best_of(lambda: paper_columns(papers), args.repeat)
+        engine_t, got = best_of(lambda: compute_metrics(cols), args.repeat)
+        assert got == expected, (got, expected)
+        print(f"{n:>8} {legacy_t * 1e3:>10.1f} {columns_t * 1e3:>11.1f} {engine_t * 1e3:>10.2f}"
+              f" {legacy_t / (columns_t + engine_t):>7.1f}x")
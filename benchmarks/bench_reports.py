@@ -0,0 +1,93 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import html_report
+import plots
+from generate_pdf import METRIC_COLUMNS, build_cohort_report, build_researcher_report, cohort_figures, load_styles
+from benchmarks.suite import synthetic_results
+
+# Report throughput of the ReportLab path (generate_pdf.py) against the
+# Jinja2 HTML path (html_report.py), and WeasyPrint's HTML -> PDF when its
+# system libraries are installed. Figures are rendered once up front (and
+# then come from the figure cache), so the numbers are the report engines'.
+#
+#   python benchmarks/bench_reports.py --researchers 200 --cohorts 100 10000
+
+
+def timed(fn, repeat=1):
+    # (best seconds, peak traced MB of one more run)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return best, peak / 2 ** 20
+
+
+def report(label, n, seconds, peak):
+    print(f"{label:<38} {n:>7} {seconds * 1000:>10.1f} ms {n / seconds:>10.1f} reports/s {peak:>8.1f} MB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare ReportLab and HTML report throughput")
+    parser.add_argument("--researchers", type=int, default=200, help="per-researcher reports per run")
+    parser.add_argument("--cohorts", type=int, nargs="+", default=[100, 10000], help="cohort report table sizes")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    try:
+        html_report.weasyprint_html()
+        weasyprint = True
+    except RuntimeError as exc:
+        weasyprint = False
+        print(f"WeasyPrint cases skipped: {exc}\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        plots.FIGURE_CACHE_DIR = os.path.join(tmp, "figure_cache")
+        styles = load_styles()
+        df = synthetic_results(args.researchers)
+        ranks = df[METRIC_COLUMNS].rank(ascending=False, method="min").to_dict("records")
+        rows = df.to_dict("records")
+        html_report.template(html_report.RESEARCHER_TEMPLATE)   # compiled once, outside the timings
+
+        def reportlab_researchers():
+            for i, (row, rank) in enumerate(zip(rows, ranks)):
+                build_researcher_report(row, rank, len(df), os.path.join(tmp, f"r{i}.pdf"), styles)
+
+        def html_researchers():
+            for i, (row, rank) in enumerate(zip(rows, ranks)):
+                html_report.write_text(os.path.join(tmp, f"r{i}.html"), html_report.render_researcher(row, rank, len(df)))
+
+        print(f"{'case':<38} {'reports':>7} {'best':>13} {'throughput':>21} {'peak':>11}")
+        report("reportlab researcher reports", len(df), *timed(reportlab_researchers, args.repeat))
+        report("html researcher reports", len(df), *timed(html_researchers, args.repeat))
+        if weasyprint:
+            html_researchers()
+            paths = [os.path.join(tmp, f"r{i}.html") for i in range(len(df))]
+            report("weasyprint researcher PDFs (pool)", len(df), *timed(lambda: html_report.convert_to_pdf(paths), 1))
+
+        for n in args.cohorts:
+            cohort = synthetic_results(n, seed=n)
+            pngs, svgs = cohort_figures(cohort), html_report.figure_uris(cohort)
+            report(f"reportlab cohort report [{n}]", 1,
+                   *timed(lambda: build_cohort_report(cohort, os.path.join(tmp, "c.pdf"), styles, pngs), args.repeat))
+            report(f"html cohort report, streamed [{n}]", 1,
+                   *timed(lambda: html_report.render_cohort(cohort, os.path.join(tmp, "c.html"), svgs), args.repeat))
+            full = lambda: html_report.template(html_report.COHORT_TEMPLATE).render(
+                results=cohort.to_dict("records"), figures=svgs)
+            report(f"html cohort report, one string [{n}]", 1, *timed(full, args.repeat))
+            if weasyprint:
+                report(f"weasyprint cohort PDF [{n}]", 1,
+                       *timed(lambda: html_report.convert_one(os.path.join(tmp, "c.html")), 1))
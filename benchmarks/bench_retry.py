@@ -0,0 +1,75 @@
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bulk_fetch import PAPER_FIELDS, BulkFetcher
+from http_client import ApiClient
+from rate_limit import TokenBucket
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Fetches one cohort through the fault-injecting stub server (rate limit with
+# Retry-After, random 5xx answers and dropped connections) with two retry
+# policies, starting from the same client-side rate:
+#   fixed     - the previous behaviour: fixed 2 s sleep after any failure,
+#               Retry-After ignored, constant request rate
+#   adaptive  - http_client defaults: jittered exponential backoff,
+#               Retry-After honoured, rate halved on every 429
+#
+#   python benchmarks/bench_retry.py --faults 0.1 --server-rate 8 --client-rate 20
+
+
+def fixed_sleep(attempt, response):
+    return 2.0
+
+
+def run(label, client, api_url, author_ids):
+    fetcher = BulkFetcher(api_url, client=client)
+    start = time.perf_counter()
+    result = fetcher.fetch_cohort(author_ids, PAPER_FIELDS)
+    elapsed = time.perf_counter() - start
+    papers = sum(len(a["papers"]) for a in result["authors"].values())
+    s = client.stats
+    print(f"{label:<10} {elapsed:>7.2f} s {papers / elapsed:>8.0f} papers/s {s['requests']:>5} requests"
+          f" {s['retries']:>4} retries {s['throttled']:>4} x 429 {s['backoff_seconds']:>6.1f} s backoff"
+          f"  {len(result['failed'])} authors failed  (final rate {client.limiter.rate:.1f}/s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare retry policies against the fault-injecting stub")
+    parser.add_argument("--authors", type=int, default=200)
+    parser.add_argument("--faults", type=float, default=0.1)
+    parser.add_argument("--server-rate", type=float, default=8, help="requests/s the stub accepts before 429s")
+    parser.add_argument("--client-rate", type=float, default=20, help="starting client request rate")
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--port", type=int, default=8768)
+    args = parser.parse_args()
+
+    author_ids = [str(1000 + i) for i in range(args.authors)]
+    server = subprocess.Popen([sys.executable, os.path.join(ROOT, "stub_server.py"), "--port", str(args.port),
+                               "--rate", str(args.server_rate), "--burst", "4", "--faults", str(args.faults),
+                               "--latency", str(args.latency)], stdout=subprocess.DEVNULL)
+    api_url = f"http://127.0.0.1:{args.port}/graph/v1"
+    try:
+        for _ in range(50):
+            try:
+                requests.get(f"{api_url}/author/1", timeout=1)
+                break
+            except requests.ConnectionError:
+                time.sleep(0.1)
+        time.sleep(1)   # let the stub's token bucket refill
+        policies = {
+            "fixed": ApiClient(TokenBucket(args.client_rate, 4), retries=3, backoff=fixed_sleep, adaptive=False),
+            "adaptive": ApiClient(TokenBucket(args.client_rate, 4)),
+        }
+        for label, client in policies.items():
+            run(label, client, api_url, author_ids)
+            time.sleep(1)
+    finally:
+        server.terminate()
@@ -0,0 +1,315 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pandas as pd
+
+from bulk_fetch import PAPER_FIELDS, BulkFetcher
+from http_client import ApiClient
+from coauthors import collaboration_profile
+from generate_pdf import METRIC_COLUMNS, build_cohort_report, build_researcher_report, cohort_figures, load_styles
+from metrics import compute_metrics, trajectory
+from paper_store import PaperStore
+import html_report
+import plots
+from stub_server import save_recording, start_stub_server
+
+# One benchmark run over every stage of the pipeline, compared against a
+# stored baseline:
+#   metrics - PaperStore building, compute_metrics, trajectory and co-author
+#             profiles for synthetic authors from 10 to 100k papers
+#   fetch   - the paging and cohort batch paths against stub_server.py
+#             replaying recorded API responses (fixtures/api_replay.jsonl.gz)
+#   plots   - rendering the two comparison figures, and a figure cache hit
+#   pdf     - a researcher report and the cohort report, with ReportLab and
+#             as HTML (html_report.py)
+#   startup - cold interpreter starts: `levelling_up_cli.py --help` and `import levelling_up`
+#             (python benchmarks/bench_import.py breaks these down)
+#
+#   python benchmarks/suite.py                  # run, flag regressions against benchmarks/baseline.json
+#   python benchmarks/suite.py --save-baseline  # run and store the results as the new baseline
+#   python benchmarks/suite.py --record [--upstream https://api.semanticscholar.org/graph/v1]
+#
+# Each case reports the best, median and p95 wall time over --repeat runs,
+# throughput (items per second at the median) and peak traced memory
+# (tracemalloc, one extra run). The exit status is 1 when a case's best time
+# or peak memory exceeds the baseline by more than --tolerance.
+
+BASELINE = os.path.join(ROOT, "benchmarks", "baseline.json")
+REPLAY_FIXTURE = os.path.join(ROOT, "fixtures", "api_replay.jsonl.gz")
+SIZES = [10, 1000, 10000, 100000]
+GROUPS = ["metrics", "fetch", "plots", "pdf", "startup"]
+# Requests made by the fetch cases, and therefore recorded by --record
+REPLAY_AUTHOR = "1741106"
+REPLAY_COHORT = ["1741106", "1433810", "144767642", "2250410", "1693140"]
+NOISE_MS = 1.0    # time differences below this are never flagged
+
+
+# SYNTHETIC AUTHORS
+
+def synthetic_corpus(n_papers, seed=0, pool=20000):
+    # Paper dicts for one author (authorId "0"); ~1% are mega-collaborations
+    # with 1000-3000 authors. Co-authors come from a shared pool of dicts, so
+    # even 100k papers stay cheap to hold in memory.
+    rng = random.Random(seed)
+    authors = [{"authorId": str(i), "name": f"Author {i}"} for i in range(pool)]
+    papers = []
+    for i in range(n_papers):
+        team = rng.randint(1000, 3000) if rng.random() < 0.01 else rng.choice([1, 1, 2, 3, 3, 4, 6, 10])
+        papers.append({
+            "paperId": f"p{i}",
+            "title": f"Synthetic paper {i}",
+            "year": rng.randint(1960, 2025) if rng.random() > 0.02 else None,
+            "citationCount": int(rng.paretovariate(1.1)) - 1,
+            "authors": [authors[0]] + [authors[j] for j in rng.sample(range(1, pool), team - 1)],
+        })
+    return papers
+
+
+def synthetic_results(n, seed=0):
+    # A results_store-style DataFrame of `n` researchers
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        h = rng.randint(5, 120)
+        rows.append({"Name": f"Researcher {i}", "Papers": rng.randint(h, 1500), "Total Citations": h * rng.randint(20, 400),
+                     "h-index": h, "Freshness-Weighted h": int(h * rng.uniform(0.3, 0.9)),
+                     "CRI (Collab-Resilient)": int(h * rng.uniform(0.5, 1.0)),
+                     "CLS (Consistency Score)": round(rng.uniform(10, 400), 1)})
+    return pd.DataFrame(rows)
+
+
+# MEASUREMENT
+
+def measure(fn, repeat, units, unit):
+    fn()   # warm-up: imports, caches, first-touch allocations
+    times = []
+    # Like timeit: no garbage collection pauses left over from earlier cases
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - start)
+    finally:
+        gc.enable()
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    times.sort()
+    median = statistics.median(times)
+    return {
+        "min_ms": round(times[0] * 1e3, 3),
+        "median_ms": round(median * 1e3, 3),
+        "p95_ms": round(times[min(len(times) - 1, int(0.95 * len(times)))] * 1e3, 3),
+        "throughput": round(units / median, 1),
+        "unit": unit,
+        "peak_mb": round(peak / 2 ** 20, 2),
+    }
+
+
+# CASES (each yields (name, fn, units, unit))
+
+def metrics_cases(sizes):
+    for n in sizes:
+        papers = synthetic_corpus(n, seed=n)
+        store = PaperStore()
+        store.extend(papers)
+        cols = store.columns()
+        yield f"metrics.store_extend[{n}]", lambda: PaperStore().extend(papers), n, "papers"
+        yield f"metrics.compute_metrics[{n}]", lambda: compute_metrics(cols), n, "papers"
+        yield f"metrics.trajectory[{n}]", lambda: trajectory(cols), n, "papers"
+        yield f"metrics.collaboration_profile[{n}]", lambda: collaboration_profile(store, "0"), n, "papers"
+
+
+def start_replay_server(fixture, latency, port):
+    # In its own process, so serving does not compete with the client for the GIL
+    code = ("import sys; sys.path.insert(0, sys.argv[1]); from stub_server import *; "
+            "StubServer(('127.0.0.1', int(sys.argv[2])), latency=float(sys.argv[3]), "
+            "replay=load_recording(sys.argv[4])).serve_forever()")
+    server = subprocess.Popen([sys.executable, "-c", code, ROOT, str(port), str(latency), fixture])
+    api_url = f"http://127.0.0.1:{port}/graph/v1"
+    for _ in range(100):
+        try:
+            requests.get(f"{api_url}/author/search", timeout=1)
+            return server, api_url
+        except requests.ConnectionError:
+            time.sleep(0.1)
+    server.terminate()
+    raise RuntimeError("replay server did not start")
+
+
+def fetch_workloads(api_url):
+    client = ApiClient(retries=0)   # unthrottled: a replay miss fails at once
+    def pages():
+        store = PaperStore()
+        for page in BulkFetcher(api_url, client=client).iter_pages(REPLAY_AUTHOR, PAPER_FIELDS):
+            store.extend(page)
+        return len(store)
+
+    def cohort():
+        result = BulkFetcher(api_url, client=client).fetch_cohort(REPLAY_COHORT, PAPER_FIELDS)
+        if result["failed"] or result["missing"]:
+            raise RuntimeError(f"replay is missing responses: {result['failed'] + result['missing']}")
+        return sum(len(a["papers"]) for a in result["authors"].values())
+
+    return pages, cohort
+
+
+def fetch_cases(api_url):
+    pages, cohort = fetch_workloads(api_url)
+    yield "fetch.iter_pages", pages, pages(), "papers"
+    yield "fetch.fetch_cohort", cohort, cohort(), "papers"
+
+
+def plot_cases():
+    for n in (10, 100):
+        df = synthetic_results(n, seed=n)
+        yield f"plots.freshness_vs_h[{n}]", lambda: plots.render("freshness_vs_h_index", df), 1, "figures"
+        yield f"plots.consistency[{n}]", lambda: plots.render("consistency_analysis", df), 1, "figures"
+        yield f"plots.consistency_svg[{n}]", lambda: plots.render("consistency_analysis", df, "svg"), 1, "figures"
+    # Every call after the warm-up is a figure cache hit
+    yield "plots.render_figures_cached[100]", lambda: plots.render_figures(df), 2, "figures"
+
+
+def pdf_cases(out_dir):
+    styles = load_styles()
+    df = synthetic_results(100)
+    ranks = df[METRIC_COLUMNS].rank(ascending=False, method="min")
+    row, rank = df.iloc[0].to_dict(), ranks.iloc[0].to_dict()
+    figures = cohort_figures(df)
+    yield ("pdf.researcher_report", lambda: build_researcher_report(row, rank, len(df), os.path.join(out_dir, "r.pdf"), styles),
+           1, "reports")
+    yield "pdf.cohort_report[100]", lambda: build_cohort_report(df, os.path.join(out_dir, "c.pdf"), styles, figures), 1, "reports"
+    svgs = html_report.figure_uris(df)
+    yield ("html.researcher_report", lambda: html_report.write_text(os.path.join(out_dir, "r.html"),
+                                                                   html_report.render_researcher(row, rank, len(df))),
+           1, "reports")
+    yield "html.cohort_report[100]", lambda: html_report.render_cohort(df, os.path.join(out_dir, "c.html"), svgs), 1, "reports"
+
+
+def startup_cases():
+    commands = {"startup.cli_help": ["levelling_up_cli.py", "--help"],
+                "startup.import_main": ["-c", "import levelling_up"]}
+    for name, args in commands.items():
+        yield name, lambda args=args: subprocess.run([sys.executable, *args], cwd=ROOT, capture_output=True, check=True), 1, "starts"
+
+
+# BASELINE COMPARISON
+
+def compare(results, baseline, tolerance):
+    # Adds a "status" to every result: ok, new, or REGRESSION (time / memory)
+    regressions = 0
+    for name, r in results.items():
+        base = baseline.get(name)
+        if base is None:
+            r["status"] = "new"
+            continue
+        # Best-of times: the least sensitive to other load on the machine
+        slower = r["min_ms"] > base["min_ms"] * (1 + tolerance) and r["min_ms"] - base["min_ms"] > NOISE_MS
+        bigger = r["peak_mb"] > base["peak_mb"] * (1 + tolerance) and r["peak_mb"] - base["peak_mb"] > 0.5
+        problems = (["time"] if slower else []) + (["memory"] if bigger else [])
+        r["status"] = f"REGRESSION ({', '.join(problems)})" if problems else "ok"
+        r["vs_baseline"] = round(r["min_ms"] / base["min_ms"], 2) if base["min_ms"] else None
+        regressions += bool(problems)
+    return regressions
+
+
+def record(fixture, upstream=None):
+    server = start_stub_server(upstream=upstream, record=True)
+    try:
+        pages, cohort = fetch_workloads(server.api_url)
+        print(f"Recorded {pages()} papers (pages) and {cohort()} papers (cohort)")
+    finally:
+        server.shutdown()
+    save_recording(server.recording, fixture)
+    print(f"{len(server.recording)} responses -> {fixture}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark metrics, fetching, plots, PDF reports and start-up")
+    parser.add_argument("--only", nargs="+", choices=GROUPS, default=GROUPS)
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="papers per synthetic author")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds the replay server adds per response")
+    parser.add_argument("--port", type=int, default=8779)
+    parser.add_argument("--fixture", default=REPLAY_FIXTURE)
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed slowdown / memory growth (0.5 = 50%%)")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--out", help="also write this run's results as JSON")
+    parser.add_argument("--record", action="store_true", help="re-record the replay fixture and exit")
+    parser.add_argument("--upstream", help="with --record: API to record from (default: synthetic stub data)")
+    args = parser.parse_args()
+
+    if args.record:
+        record(args.fixture, args.upstream)
+        sys.exit(0)
+
+    results, server = {}, None
+    print(f"{'case':<38} {'median ms':>10} {'p95 ms':>9} {'throughput':>21} {'peak MB':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        plots.FIGURE_CACHE_DIR = os.path.join(tmp, "figure_cache")   # start cold, leave output/ alone
+        try:
+            groups = []
+            if "metrics" in args.only:
+                groups.append(metrics_cases(args.sizes))
+            if "fetch" in args.only:
+                server, api_url = start_replay_server(args.fixture, args.latency, args.port)
+                groups.append(fetch_cases(api_url))
+            if "plots" in args.only:
+                groups.append(plot_cases())
+            if "pdf" in args.only:
+                groups.append(pdf_cases(tmp))
+            if "startup" in args.only:
+                groups.append(startup_cases())
+            for cases in groups:
+                for name, fn, units, unit in cases:
+                    r = results[name] = measure(fn, args.repeat, units, unit)
+                    print(f"{name:<38} {r['median_ms']:>10.2f} {r['p95_ms']:>9.2f}"
+                          f" {r['throughput']:>14,.1f} {unit + '/s':<6} {r['peak_mb']:>8.1f}", flush=True)
+        finally:
+            if server is not None:
+                server.terminate()
+
+    environment = {"python": platform.python_version(), "machine": platform.machine(), "cpus": os.cpu_count()}
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"environment": environment, "results": results}, f, indent=1)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump({"environment": environment, "results": results}, f, indent=1, sort_keys=True)
+        print(f"\nBaseline saved to {args.baseline}")
+        sys.exit(0)
+    if not os.path.exists(args.baseline):
+        print("\nNo baseline yet: run with --save-baseline")
+        sys.exit(0)
+    with open(args.baseline) as f:
+        stored = json.load(f)
+    regressions = compare(results, stored["results"], args.tolerance)
+    if stored.get("environment") != environment:
+        print(f"\nNote: baseline was recorded on {stored.get('environment')}")
+    print()
+    for name, r in results.items():
+        ratio = f"{r['vs_baseline']:.2f}x" if r.get("vs_baseline") else ""
+        print(f"{name:<38} {ratio:>7}  {r['status']}")
+    print(f"\n{regressions} regression(s) beyond {args.tolerance:.0%}")
+    sys.exit(1 if regressions else 0)
@@ -0,0 +1,252 @@
+import itertools
+import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import telemetry
+from http_client import shared_client
+from paper_store import PaperStore, slim_paper
+
+API_URL = os.environ.get("S2_API_URL", "https://api.semanticscholar.org/graph/v1")
+PAPER_FIELDS = "title,year,citationCount,authors"
+
+# Maximum ids per POST accepted by the Graph API batch endpoints
+AUTHOR_BATCH_SIZE = 1000
+PAPER_BATCH_SIZE = 500
+# Page size for full paper records, and the largest accepted by /author/{id}/papers
+PAGE_SIZE = 100
+ID_PAGE_SIZE = 1000
+# Page / batch requests kept in flight per author
+PREFETCH = int(os.environ.get("S2_PREFETCH", 4))
+
+
+class FetchError(Exception):
+    pass
+
+
+def chunked(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def pipelined(calls, window=PREFETCH):
+    # Run zero-argument callables with up to `window` of them in flight and
+    # yield their results in call order. `calls` may be endless: once the
+    # caller stops iterating, requests not yet started are cancelled.
+    calls = iter(calls)
+    pool = ThreadPoolExecutor(max_workers=max(window, 1), thread_name_prefix="s2-prefetch")
+    pending = deque(pool.submit(telemetry.wrap(call)) for call in itertools.islice(calls, max(window, 1)))
+    try:
+        while pending:
+            result = pending.popleft().result()
+            call = next(calls, None)
+            if call is not None:
+                pending.append(pool.submit(telemetry.wrap(call)))
+            yield result
+    finally:
+        for future in pending:
+            future.cancel()
+        pool.shutdown(wait=False)
+
+
+# BATCH REQUESTS WITH CHUNKING AND PARTIAL-FAILURE HANDLING
+
+class BulkFetcher:
+    def __init__(self, api_url=API_URL, client=None, retries=None, window=PREFETCH):
+        # client: an http_client.ApiClient, by default the process-wide one;
+        # retries overrides the client's retry count for this fetcher
+        self.api_url = api_url
+        self.client = client or shared_client()
+        self.retries = retries
+        self.window = window
+        self.requests = 0
+        self.bytes = 0
+        self._lock = threading.Lock()
+
+    def _tally(self, response):
+        with self._lock:
+            self.requests += 1
+            self.bytes += len(response.content) if response is not None else 0
+
+    def _request(self, method, path, **kwargs):
+        # Parsed JSON of a 200 response; None for any other final status or
+        # once the client's retries are used up
+        r = self.client.request(method, f"{self.api_url}{path}", retries=self.retries, on_response=self._tally, **kwargs)
+        return r.json() if r is not None and r.status_code == 200 else None
+
+    def post_batch(self, kind, ids, fields, batch_size):
+        """POST ids to /{kind}/batch in chunks.
+
+        Returns (records, missing, failed): records maps id -> record, missing
+        lists ids the API answered with null, failed lists ids whose request
+        kept failing even after the chunk was split down to single ids.
+        """
+        records, missing, failed = {}, [], []
+        pending = deque(chunked(list(dict.fromkeys(ids)), batch_size))
+        while pending:
+            chunk = pending.popleft()
+            data = self._request("POST", f"/{kind}/batch", params={"fields": fields}, json={"ids": chunk})
+            if data is None:
+                if len(chunk) == 1:
+                    failed.extend(chunk)
+                else:
+                    # Bisect so one bad id cannot sink the whole chunk; records keep input order
+                    mid = len(chunk) // 2
+                    pending.extendleft([chunk[mid:], chunk[:mid]])
+                continue
+            for i, record in zip(chunk, data):
+                if record is None:
+                    missing.append(i)
+                else:
+                    records[i] = record
+        return records, missing, failed
+
+    def fetch_authors(self, author_ids, fields="name,paperCount"):
+        return self.post_batch("author", [str(a) for a in author_ids], fields, AUTHOR_BATCH_SIZE)
+
+    def iter_pages(self, author_id, fields=PAPER_FIELDS, page_size=PAGE_SIZE):
+        """Yield pages of /author/{id}/papers, keeping `window` requests in flight.
+
+        There is no paper cap: paging stops at the first short or empty page.
+        Raises FetchError when a page keeps failing (or the author is unknown).
+        """
+        def page(offset):
+            return lambda: self._request("GET", f"/author/{author_id}/papers",
+                                         params={"fields": fields, "limit": page_size, "offset": offset})
+
+        for data in pipelined((page(o) for o in itertools.count(0, page_size)), self.window):
+            if data is None:
+                raise FetchError(f"paper page request failed for author {author_id}")
+            batch = data.get("data", [])
+            if batch:
+                yield batch
+            if len(batch) < page_size:
+                return
+
+    def fetch_paper_ids(self, author_id):
+        # Fallback when the author batch response did not embed every paper
+        try:
+            return [p["paperId"] for page in self.iter_pages(author_id, "paperId", ID_PAGE_SIZE)
+                    for p in page if p.get("paperId")]
+        except FetchError:
+            return None
+
+    def _paper_batches(self, chunks, paper_fields):
+        # Paper-batch POSTs for consecutive chunks, pipelined and in order
+        return pipelined((lambda c=c: self.post_batch("paper", c, paper_fields, PAPER_BATCH_SIZE)
+                          for c in chunks), self.window)
+
+    def iter_author(self, author_id, paper_fields=PAPER_FIELDS):
+        """Stream one author's papers batch by batch.
+
+        The first event carries the name and no papers; each later event holds
+        the next batch of slim papers in the author's paper order:
+        {"name", "papers", "done", "total", "failed"}. `failed` lists paper IDs
+        that could not be fetched so far. Yields nothing if the author is unknown
+        and raises FetchError if the author request itself keeps failing.
+        """
+        found, _, failed = self.fetch_authors([author_id], "name,paperCount,papers.paperId")
+        if failed:
+            raise FetchError(f"author request failed for author {author_id}")
+        record = found.get(str(author_id))
+        if record is None:
+            return
+        ids = [p["paperId"] for p in record.get("papers") or [] if p.get("paperId")]
+        if len(ids) < (record.get("paperCount") or 0):
+            ids = self.fetch_paper_ids(author_id)
+            if ids is None:
+                return
+        chunks = list(chunked(list(dict.fromkeys(ids)), PAPER_BATCH_SIZE))
+        failed = []
+        yield {"name": record.get("name"), "papers": [], "done": 0, "total": len(chunks), "failed": failed}
+        for done, (records, _, bad) in enumerate(self._paper_batches(chunks, paper_fields), 1):
+            failed += bad
+            yield {"name": record.get("name"), "papers": [slim_paper(r) for r in records.values()],
+                   "done": done, "total": len(chunks), "failed": failed}
+
+    def fetch_cohort(self, author_ids, paper_fields=PAPER_FIELDS, on_progress=None):
+        """Fetch names and full paper lists for many authors with batch requests.
+
+        Papers shared by several authors in the cohort are fetched only once
+        and their author objects are reduced to interned (authorId, name)
+        pairs as each chunk arrives. Returns {"authors": {id: {"name", "papers": PaperStore}}, "missing": [...],
+        "failed": [...], "requests": n}. An author with any failed paper
+        lookup is reported in "failed" and left out of "authors".
+        """
+        start_requests = self.requests
+        found, missing, failed = self.fetch_authors(author_ids, "name,paperCount,papers.paperId")
+        paper_ids = {}
+        for aid, record in found.items():
+            ids = [p["paperId"] for p in record.get("papers") or [] if p.get("paperId")]
+            if len(ids) < (record.get("paperCount") or 0):
+                ids = self.fetch_paper_ids(aid)
+                if ids is None:
+                    failed.append(aid)
+                    continue
+            paper_ids[aid] = ids
+
+        unique = list(dict.fromkeys(pid for ids in paper_ids.values() for pid in ids))
+        papers, lost = {}, set()
+        chunks = list(chunked(unique, PAPER_BATCH_SIZE))
+        for done, (records, gone, bad) in enumerate(self._paper_batches(chunks, paper_fields), 1):
+            # Papers the API no longer knows about (`gone`) are simply dropped
+            papers.update((pid, slim_paper(r)) for pid, r in records.items())
+            lost.update(bad)
+            if on_progress:
+                on_progress(done, len(chunks))
+
+        authors = {}
+        for aid, ids in paper_ids.items():
+            if lost.intersection(ids):
+                failed.append(aid)
+                continue
+            authors[aid] = {"name": found[aid].get("name"),
+                            "papers": PaperStore.from_papers(papers[p] for p in ids if p in papers)}
+        return {"authors": authors, "missing": missing, "failed": failed,
+                "requests": self.requests - start_requests}
+
+    # CITATION-ONLY REFRESH
+
+    def fetch_citations(self, author_ids):
+        """Current citation counts of every paper of each author, and nothing else.
+
+        Counts come embedded in author batch responses; authors whose embedded
+        paper list is truncated are paged with `paperId,citationCount` only.
+        Returns ({author_id: {paperId: citationCount}}, failed author ids).
+        """
+        found, missing, failed = self.fetch_authors(author_ids, "paperCount,papers.paperId,papers.citationCount")
+        citations = {}
+        for aid, record in found.items():
+            papers = record.get("papers") or []
+            if len(papers) < (record.get("paperCount") or 0):
+                try:
+                    papers = [p for page in self.iter_pages(aid, "citationCount", ID_PAGE_SIZE) for p in page]
+                except FetchError:
+                    failed.append(aid)
+                    continue
+            citations[aid] = {p["paperId"]: p.get("citationCount") or 0 for p in papers if p.get("paperId")}
+        return citations, missing + failed
+
+    def refresh_citations(self, stores, paper_fields=PAPER_FIELDS):
+        """Update previously fetched PaperStores ({author_id: store}) with fresh citation counts.
+
+        Only papers the stores have not seen before are fetched in full.
+        Returns ({author_id: updated PaperStore}, failed author ids); failed
+        authors should be fetched in full instead.
+        """
+        citations, failed = self.fetch_citations(list(stores))
+        new_ids = {aid: [pid for pid in counts if pid not in known]
+                   for aid, counts in citations.items()
+                   for known in [set(stores[aid].paper_ids)]}
+        records, _, lost = self.post_batch("paper", [pid for ids in new_ids.values() for pid in ids],
+                                           paper_fields, PAPER_BATCH_SIZE)
+        lost = set(lost)
+        refreshed = {}
+        for aid, counts in citations.items():
+            if lost.intersection(new_ids[aid]):
+                failed.append(aid)
+                continue
+            refreshed[aid] = stores[aid].with_citations(
+                counts, [slim_paper(records[pid]) for pid in new_ids[aid] if pid in records])
+        return refreshed, failed
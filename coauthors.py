@@ -0,0 +1,128 @@
+import os
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+# Co-author network analytics from the `authors` lists already stored with
+# every cached paper (PaperStore keeps them as CSR-style position arrays), so
+# nothing here calls the API. Graphs are scipy.sparse matrices:
+#   B (papers x authors) incidence, A = B.T @ B (authors x authors) joint papers.
+
+COAUTHOR_MAX_TEAM = int(os.environ.get("COAUTHOR_MAX_TEAM", 100))   # larger teams add no edges
+TOP_COLLABORATORS = 10
+
+
+def incidence(store, max_team=COAUTHOR_MAX_TEAM):
+    """Papers x authors CSR matrix of a PaperStore; papers with more than `max_team` authors get empty rows."""
+    cols = store.author_columns()
+    ptr, idx = cols["ptr"].copy(), cols["idx"].copy()
+    del cols
+    team = np.diff(ptr)
+    data = np.repeat((team <= max_team).astype(np.int32), team)
+    matrix = sparse.csr_matrix((data, idx, ptr), shape=(len(store), len(store.author_ids)))
+    matrix.eliminate_zeros()
+    return matrix
+
+
+# ONE RESEARCHER
+
+def collaboration_profile(store, author_id, top=TOP_COLLABORATORS, max_team=COAUTHOR_MAX_TEAM):
+    """Top collaborators, concentration and solo/team citation split for one author's papers."""
+    cols = store.columns()
+    citations, n_authors = cols["citations"].astype(np.float64), cols["n_authors"].copy()
+    del cols
+    b = incidence(store, max_team)
+    joint_papers = np.asarray(b.sum(axis=0)).ravel()
+    joint_citations = b.T @ citations
+    me = store.author_position(author_id)
+    if me is not None:
+        joint_papers[me] = 0
+    collaborators = np.flatnonzero(joint_papers)
+    order = collaborators[np.lexsort((-joint_citations[collaborators], -joint_papers[collaborators]))]
+    shares = joint_papers[collaborators] / joint_papers[collaborators].sum() if collaborators.size else np.zeros(0)
+    total = citations.sum()
+    solo = n_authors == 1
+    return {
+        "coauthors": int(collaborators.size),
+        "top": [{"authorId": store.author_ids[i], "name": store.author_labels[i],
+                 "papers": int(joint_papers[i]), "citations": int(joint_citations[i])} for i in order[:top]],
+        # Herfindahl index of joint-paper shares: 1 = a single collaborator, ~0 = spread out
+        "hhi": round(float((shares ** 2).sum()), 4),
+        "top5_share": round(float(np.sort(shares)[::-1][:5].sum()), 4),
+        "solo_papers": int(solo.sum()),
+        "solo_citation_share": round(float(citations[solo].sum() / total), 4) if total else 0.0,
+        "team_citation_share": round(float(citations[~solo].sum() / total), 4) if total else 0.0,
+        "large_team_papers": int((n_authors > max_team).sum()),
+    }
+
+
+# WHOLE COHORT
+
+def cohort_graph(stores, max_team=COAUTHOR_MAX_TEAM):
+    """Co-author graph over several authors' stores ({author_id: PaperStore}).
+
+    Papers listed by more than one cohort member count once. Returns
+    (adjacency, author_ids, names): a symmetric CSR matrix of joint paper
+    counts with an empty diagonal, and the labels of its rows.
+    """
+    position, author_ids, names = {}, [], []
+    blocks, seen = [], set()
+    for store in stores.values():
+        # Map this store's author positions to global ones
+        local = np.empty(len(store.author_ids), dtype=np.int64)
+        for i, (aid, name) in enumerate(zip(store.author_ids, store.author_labels)):
+            pos = position.get(aid)
+            if pos is None:
+                pos = position[aid] = len(author_ids)
+                author_ids.append(aid)
+                names.append(name)
+            local[i] = pos
+        keep = np.fromiter((pid not in seen for pid in store.paper_ids), dtype=bool, count=len(store))
+        seen.update(store.paper_ids)
+        b = incidence(store, max_team)[keep].tocoo()
+        blocks.append((b.row, local[b.col], b.shape[0]))
+
+    offset, rows, cols = 0, [], []
+    for row, col, n in blocks:
+        rows.append(row + offset)
+        cols.append(col)
+        offset += n
+    row, col = (np.concatenate(rows), np.concatenate(cols)) if rows else (np.zeros(0, int), np.zeros(0, int))
+    b = sparse.csr_matrix((np.ones(row.size, dtype=np.int32), (row, col)), shape=(offset, len(author_ids)))
+    adjacency = (b.T @ b).tocsr()
+    adjacency.setdiag(0)
+    adjacency.eliminate_zeros()
+    return adjacency, author_ids, names
+
+
+def cohort_report(stores, labels=None, max_team=COAUTHOR_MAX_TEAM):
+    """Network summary for a cohort ({author_id: PaperStore}).
+
+    Returns (per-member DataFrame, member x member joint-paper DataFrame,
+    {"nodes", "edges"} of the whole co-author graph).
+    """
+    labels = labels or {}
+    adjacency, author_ids, names = cohort_graph(stores, max_team)
+    position = {aid: i for i, aid in enumerate(author_ids)}
+    members = [aid for aid in stores if aid in position]
+    idx = [position[aid] for aid in members]
+    member_names = [labels.get(aid, names[position[aid]]) for aid in members]
+    within = pd.DataFrame(adjacency[idx][:, idx].toarray(), index=member_names, columns=member_names)
+
+    rows = []
+    for aid in stores:
+        profile = collaboration_profile(stores[aid], aid, top=1, max_team=max_team)
+        top = profile["top"][0] if profile["top"] else None
+        rows.append({
+            "Author ID": aid,
+            "Name": labels.get(aid, aid),
+            "Co-authors": profile["coauthors"],
+            "Cohort Collaborators": int((within.iloc[members.index(aid)] > 0).sum()) if aid in position else 0,
+            "Top Collaborator": top["name"] if top else "",
+            "Joint Papers": top["papers"] if top else 0,
+            "Top-5 Share": profile["top5_share"],
+            "HHI": profile["hhi"],
+            "Solo Citation Share": profile["solo_citation_share"],
+        })
+    return pd.DataFrame(rows), within, {"nodes": adjacency.shape[0], "edges": int(adjacency.nnz // 2)}
@@ -0,0 +1,245 @@
+import argparse
+import contextlib
+import os
+import threading
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:     # Windows: writers are only serialized within a process
+    fcntl = None
+
+COHORT_INDEX_PATH = os.environ.get("COHORT_INDEX_PATH", os.path.join("output", "cohort_index"))
+INDEX_METRICS = ("h_index", "freshness_h", "cri", "cls")
+MIN_COHORT = int(os.environ.get("COHORT_MIN_SIZE", 10))   # fewer authors than this -> no percentiles
+COMPACT_ROWS = 1000     # pending rows that trigger a merge into the sorted files
+
+
+def save_atomic(path, array):
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp.npy"
+    np.save(tmp, array)
+    os.replace(tmp, path)
+
+
+@contextlib.contextmanager
+def file_lock(path, exclusive=True):
+    # Advisory lock shared by every process using the index
+    with open(path, "a") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+# PERSISTED COHORT PERCENTILE INDEX
+
+class CohortIndex:
+    """Reference population of evaluated authors for percentile lookups.
+
+    On disk (one directory): `ids.npy` and `values.npy` hold one row per
+    author in insertion order, `keys.npy` / `key_rows.npy` the ids sorted
+    with their rows, `sorted.npy` every metric column of INDEX_METRICS sorted
+    ascending, and `pending.tsv` a log of rows added since. add()/add_many()
+    append to the log under a file lock shared by every process; once
+    COMPACT_ROWS rows are pending they are merged into the .npy files (rows
+    of authors already in the index are replaced), which are rewritten
+    atomically. Lookups binary-search `sorted.npy`, opened memory-mapped, and
+    correct the counts with the few pending rows (and the rows they replace),
+    kept as small sorted arrays.
+    """
+
+    def __init__(self, path=COHORT_INDEX_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._sorted = None      # (base, removed, added), see _view()
+        self._state = None
+
+    def _file(self, name, ext="npy"):
+        return os.path.join(self.path, f"{name}.{ext}")
+
+    def _read_log(self):
+        # [(authorId, row)] from the complete lines of the pending log
+        try:
+            with open(self._file("pending", "tsv"), "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return []
+        rows = []
+        for line in data[:data.rfind(b"\n") + 1].decode("utf-8").splitlines():
+            aid, *row = line.split("\t")
+            if len(row) == len(INDEX_METRICS):
+                rows.append((aid, [float(v) for v in row]))
+        return rows
+
+    def _load(self):
+        # (ids, values) of the merged files; caller holds the file lock
+        if not os.path.exists(self._file("values")):
+            return [], np.zeros((0, len(INDEX_METRICS)))
+        return np.load(self._file("ids")).tolist(), np.load(self._file("values"))
+
+    @staticmethod
+    def _merge(ids, values, rows):
+        # Append new authors, replace the rows of known ones (the last row wins)
+        position = {aid: i for i, aid in enumerate(ids)}
+        new_rows = []
+        for aid, row in rows:
+            i = position.get(aid)
+            if i is None:
+                position[aid] = len(ids)
+                ids.append(aid)
+                new_rows.append(row)
+            elif i < len(values):
+                values[i] = row
+            else:
+                new_rows[i - len(values)] = row
+        if new_rows:
+            values = np.vstack([values, np.asarray(new_rows)])
+        return ids, values
+
+    def _sorted_ids(self):
+        # (ids sorted, their rows in values.npy), memory-mapped; indexes
+        # compacted before key files existed sort ids.npy once instead
+        if os.path.exists(self._file("keys")):
+            return np.load(self._file("keys"), mmap_mode="r"), np.load(self._file("key_rows"), mmap_mode="r")
+        ids = np.load(self._file("ids"))
+        order = np.argsort(ids, kind="stable")
+        return ids[order], order
+
+    def _pending_view(self, base):
+        # (removed, added): base rows replaced by the pending log and the
+        # log's latest rows, each as small sorted metric columns; caller
+        # holds the file lock
+        latest = dict(self._read_log())     # the last row for an author wins
+        added = np.asarray(list(latest.values()), dtype=np.float64).reshape(-1, len(INDEX_METRICS))
+        removed = np.zeros((0, len(INDEX_METRICS)))
+        if base.shape[1] and latest:
+            keys, rows = self._sorted_ids()
+            ids = np.asarray(list(latest), dtype=str)
+            pos = np.minimum(np.searchsorted(keys, ids), len(keys) - 1)
+            hit = keys[pos] == ids
+            removed = np.load(self._file("values"), mmap_mode="r")[np.sort(rows[pos[hit]])]
+        return np.sort(removed, axis=0).T, np.sort(added, axis=0).T
+
+    def _view(self):
+        # (base, removed, added) sorted metric columns: the cohort is base
+        # minus removed plus added. base is sorted.npy, memory-mapped; the
+        # other two only cover the pending log. Re-read only when a file
+        # changed (e.g. main.py added authors while the web app is running).
+        try:
+            mtime = os.stat(self._file("sorted")).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        try:
+            pending = os.path.getsize(self._file("pending", "tsv"))
+        except FileNotFoundError:
+            pending = 0
+        with self._lock:
+            if (mtime, pending) == self._state:
+                return self._sorted
+            empty = np.zeros((len(INDEX_METRICS), 0))
+            if pending:
+                with file_lock(self._file("lock", "lock"), exclusive=False):
+                    base = np.load(self._file("sorted"), mmap_mode="r") if mtime is not None else empty
+                    view = (base, *self._pending_view(base))
+            else:
+                view = (np.load(self._file("sorted"), mmap_mode="r") if mtime is not None else empty, empty, empty)
+            self._sorted, self._state = view, (mtime, pending)
+            return view
+
+    def __len__(self):
+        base, removed, added = self._view()
+        return base.shape[1] - removed.shape[1] + added.shape[1]
+
+    def percentile(self, metric, value):
+        # Percent of the cohort below `value`, counting ties as half: binary
+        # searches in the base columns, corrected by the pending rows
+        base, removed, added = self._view()
+        size = base.shape[1] - removed.shape[1] + added.shape[1]
+        if size == 0:
+            return None
+        j = INDEX_METRICS.index(metric)
+        count = 0
+        for side in ("left", "right"):
+            count += (np.searchsorted(base[j], value, side=side) - np.searchsorted(removed[j], value, side=side)
+                      + np.searchsorted(added[j], value, side=side))
+        return float(100.0 * count / (2 * size))
+
+    def percentiles(self, metrics, min_size=MIN_COHORT):
+        # {metric: percentile} for a compute_metrics() dict, or {} while the
+        # cohort is too small to say anything
+        if len(self) < min_size:
+            return {}
+        return {k: self.percentile(k, metrics[k]) for k in INDEX_METRICS if k in metrics}
+
+    def add(self, author_id, metrics):
+        self.add_many({author_id: metrics})
+
+    def add_many(self, rows):
+        # rows: {author_id: compute_metrics() dict}
+        if not rows:
+            return
+        rows = [(str(aid), [float(m[k]) for k in INDEX_METRICS]) for aid, m in rows.items()]
+        with self._lock:
+            os.makedirs(self.path, exist_ok=True)
+            with file_lock(self._file("lock", "lock")):
+                pending = self._read_log()
+                if len(pending) + len(rows) >= COMPACT_ROWS:
+                    self._compact(pending + rows)
+                else:
+                    with open(self._file("pending", "tsv"), "a", encoding="utf-8") as f:
+                        f.write("".join(f"{aid}\t" + "\t".join(map(repr, row)) + "\n" for aid, row in rows))
+
+    def compact(self):
+        # Merge the pending log into the sorted files now
+        with self._lock:
+            os.makedirs(self.path, exist_ok=True)
+            with file_lock(self._file("lock", "lock")):
+                self._compact(self._read_log())
+
+    def _compact(self, rows):
+        # Caller holds both locks
+        ids, values = self._merge(*self._load(), rows)
+        ids = np.asarray(ids, dtype=str)
+        order = np.argsort(ids, kind="stable")
+        save_atomic(self._file("ids"), ids)
+        save_atomic(self._file("values"), values)
+        save_atomic(self._file("keys"), ids[order])
+        save_atomic(self._file("key_rows"), order)
+        # Written last: readers with an empty log only use this file
+        save_atomic(self._file("sorted"), np.sort(values, axis=0).T.copy())
+        with open(self._file("pending", "tsv"), "w"):
+            pass
+
+
+if __name__ == "__main__":
+    from bulk_fetch import PAPER_FIELDS
+    from metrics import compute_metrics
+    from paper_cache import PaperCache
+
+    parser = argparse.ArgumentParser(description="Build or inspect the cohort percentile index")
+    parser.add_argument("--from-cache", action="store_true", help="add every author in the local paper cache")
+    parser.add_argument("--path", default=COHORT_INDEX_PATH)
+    args = parser.parse_args()
+
+    index = CohortIndex(args.path)
+    if args.from_cache:
+        cache = PaperCache()
+        rows = {}
+        for aid in cache.author_ids(PAPER_FIELDS):
+            cached = cache.get(aid, PAPER_FIELDS, allow_stale=True)
+            if cached is not None and len(cached[0]):
+                rows[aid] = compute_metrics(cached[0])
+        index.add_many(rows)
+        print(f"Added {len(rows)} cached authors")
+    if os.path.isdir(args.path):
+        index.compact()
+    print(f"Cohort index '{args.path}': {len(index)} authors")
+    view = index._view()[0]
+    if view.shape[1]:
+        for metric, column in zip(INDEX_METRICS, view):
+            p50, p90, p99 = np.percentile(column, [50, 90, 99])
+            print(f"   {metric:12} median {p50:8.1f}   p90 {p90:8.1f}   p99 {p99:8.1f}")
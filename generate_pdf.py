@@ -3,39 +3,26 @@ from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, Tabl
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.lib import colors
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
+import argparse
+from results_store import RESULTS_STORE_PATH, read_any
+import io
+import re
+import time
 import os
+from xml.sax.saxutils import escape
 
-# Load results from CSV 
-df = pd.read_csv('output/results.csv')
-
-# Create PDF
-print("Generating PDF report with ReportLab...")
-doc = SimpleDocTemplate("LEVELLING_UP_ACADEMIA_FINAL_REPORT.pdf", pagesize=A4)
-story = []
-styles = getSampleStyleSheet()
-
-# Title
-title_style = ParagraphStyle('CustomTitle', parent=styles['Heading1'], fontSize=24, spaceAfter=30, alignment=1)
-story.append(Paragraph("Levelling Up Academia", title_style))
-story.append(Paragraph("Overcoming Flaws in Traditional Academic Metrics", styles['Heading2']))
-story.append(Spacer(1, 20))
-
-# Author Info
-story.append(Paragraph("<b>Intern:</b> Pranay Bhandare<br/><b>PI:</b> Suraj Shetiya<br/><b>Date:</b> December 6, 2025", styles['Normal']))
-story.append(Spacer(1, 40))
-
-# Executive Summary
-story.append(Paragraph("Executive Summary", styles['Heading2']))
-summary = """This project introduces three novel academic metrics that overcome major flaws in the classic h-index: recency bias, collaboration inflation, and inconsistency. Empirical evaluation on 10 world-famous researchers shows our metrics provide fairer, more robust assessment."""
-story.append(Paragraph(summary, styles['Normal']))
-story.append(Spacer(1, 20))
-
-# Results Table
-story.append(Paragraph("Results Summary", styles['Heading2']))
-data = [['Researcher', 'h-index', 'Freshness-Weighted h', 'CRI', 'CLS']] + df[['Name', 'h-index', 'Freshness-Weighted h', 'CRI (Collab-Resilient)', 'CLS (Consistency Score)']].values.tolist()
-table = Table(data)
-table.setStyle(TableStyle([
+FINAL_REPORT = "LEVELLING_UP_ACADEMIA_FINAL_REPORT.pdf"
+METRIC_COLUMNS = ['h-index', 'Freshness-Weighted h', 'CRI (Collab-Resilient)', 'CLS (Consistency Score)']
+# Only these columns are read from the results store
+REPORT_COLUMNS = ['Author ID', 'Name', 'Papers', 'Total Citations'] + METRIC_COLUMNS
+
+
+def load_results(source):
+    return read_any(source, REPORT_COLUMNS)
+
+TABLE_STYLE = TableStyle([
     ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
     ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
     ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
@@ -44,24 +31,168 @@ table.setStyle(TableStyle([
     ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
     ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
     ('GRID', (0, 0), (-1, -1), 1, colors.black),
-]))
-story.append(table)
-story.append(Spacer(1, 20))
-
-# Plots
-story.append(Paragraph("Visual Comparison", styles['Heading2']))
-for img_file in ['output/freshness_vs_h_index.png', 'output/consistency_analysis.png']:
-    if os.path.exists(img_file):
-        img = Image(img_file, width=6*inch, height=4*inch)
-        story.append(img)
+])
+
+
+def load_styles():
+    styles = getSampleStyleSheet()
+    styles.add(ParagraphStyle('CustomTitle', parent=styles['Heading1'], fontSize=24, spaceAfter=30, alignment=1))
+    return styles
+
+
+def write_atomic(path, build):
+    # Render into a temp file next to `path`, then rename over it, so readers
+    # never see a half-written PDF
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        build(tmp)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+# COHORT REPORT (the original single-table report)
+
+def cohort_figures(df, executor=None):
+    # The comparison figures for `df` as PNG bytes, rendered (or taken from the
+    # figure cache) in memory instead of read back from output/
+    from plots import REPORT_DPI, render_figures
+    return list(render_figures(df, fmt="png", dpi=REPORT_DPI, executor=executor).values())
+
+
+def build_cohort_report(df, path, styles=None, figures=None):
+    styles = styles or load_styles()
+    figures = cohort_figures(df) if figures is None else figures
+    story = []
+
+    # Title
+    story.append(Paragraph("Levelling Up Academia", styles['CustomTitle']))
+    story.append(Paragraph("Overcoming Flaws in Traditional Academic Metrics", styles['Heading2']))
+    story.append(Spacer(1, 20))
+
+    # Author Info
+    story.append(Paragraph("<b>Intern:</b> Pranay Bhandare<br/><b>PI:</b> Suraj Shetiya<br/><b>Date:</b> December 6, 2025", styles['Normal']))
+    story.append(Spacer(1, 40))
+
+    # Executive Summary
+    story.append(Paragraph("Executive Summary", styles['Heading2']))
+    summary = """This project introduces three novel academic metrics that overcome major flaws in the classic h-index: recency bias, collaboration inflation, and inconsistency. Empirical evaluation on 10 world-famous researchers shows our metrics provide fairer, more robust assessment."""
+    story.append(Paragraph(summary, styles['Normal']))
+    story.append(Spacer(1, 20))
+
+    # Results Table
+    story.append(Paragraph("Results Summary", styles['Heading2']))
+    data = [['Researcher', 'h-index', 'Freshness-Weighted h', 'CRI', 'CLS']] + df[['Name'] + METRIC_COLUMNS].values.tolist()
+    table = Table(data, repeatRows=1)
+    table.setStyle(TABLE_STYLE)
+    story.append(table)
+    story.append(Spacer(1, 20))
+
+    # Plots
+    story.append(Paragraph("Visual Comparison", styles['Heading2']))
+    for png in figures:
+        story.append(Image(io.BytesIO(png), width=6*inch, height=4*inch))
         story.append(Spacer(1, 10))
 
-# Conclusion
-story.append(Paragraph("Conclusion", styles['Heading2']))
-conclusion = """The proposed metrics successfully address the known limitations of traditional indices. Freshness-Weighted h-index favors recent impact, CRI resists mega-collaboration inflation, and CLS rewards sustained excellence. This system represents a significant step toward fairer academic evaluation."""
-story.append(Paragraph(conclusion, styles['Normal']))
+    # Conclusion
+    story.append(Paragraph("Conclusion", styles['Heading2']))
+    conclusion = """The proposed metrics successfully address the known limitations of traditional indices. Freshness-Weighted h-index favors recent impact, CRI resists mega-collaboration inflation, and CLS rewards sustained excellence. This system represents a significant step toward fairer academic evaluation."""
+    story.append(Paragraph(conclusion, styles['Normal']))
+
+    # Build PDF
+    write_atomic(path, lambda tmp: SimpleDocTemplate(tmp, pagesize=A4).build(story))
+
+
+# PER-RESEARCHER REPORTS (batch mode)
+
+_STYLES = None
+
+
+def init_worker():
+    # Runs once per worker process: ReportLab styles are shared by every report it renders
+    global _STYLES
+    _STYLES = load_styles()
+
+
+def build_researcher_report(row, ranks, cohort_size, path, styles):
+    story = []
+    story.append(Paragraph("Levelling Up Academia", styles['CustomTitle']))
+    # Paragraph text is markup: a name like "A & B <C>" must be escaped
+    story.append(Paragraph(f"Research Impact Report: {escape(str(row['Name']))}", styles['Heading2']))
+    story.append(Spacer(1, 20))
+    story.append(Paragraph(f"<b>Papers:</b> {row['Papers']}<br/><b>Total Citations:</b> {row['Total Citations']}", styles['Normal']))
+    story.append(Spacer(1, 20))
+
+    data = [['Metric', 'Value', f'Rank (of {cohort_size})']]
+    data += [[m, row[m], int(ranks[m])] for m in METRIC_COLUMNS]
+    table = Table(data)
+    table.setStyle(TABLE_STYLE)
+    story.append(table)
+    write_atomic(path, lambda tmp: SimpleDocTemplate(tmp, pagesize=A4).build(story))
+
+
+def render_one(job):
+    row, ranks, cohort_size, path = job
+    start = time.perf_counter()
+    build_researcher_report(row, ranks, cohort_size, path, _STYLES or load_styles())
+    return path, time.perf_counter() - start
+
+
+def report_filename(index, name):
+    slug = re.sub(r'[^A-Za-z0-9]+', '_', str(name)).strip('_') or 'researcher'
+    return f"{index:04d}_{slug}.pdf"
+
+
+def build_batch(results, out_dir, workers=None):
+    """Render one PDF per researcher in a process pool, plus a combined cohort report.
+
+    Returns a list of (path, seconds) timings, also written to timings.csv.
+    """
+    df = load_results(results)
+    os.makedirs(out_dir, exist_ok=True)
+    ranks = df[METRIC_COLUMNS].rank(ascending=False, method='min')
+    jobs = [(row, ranks.iloc[i].to_dict(), len(df), os.path.join(out_dir, report_filename(i + 1, row['Name'])))
+            for i, row in enumerate(df.to_dict('records'))]
+
+    start = time.perf_counter()
+    timings = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as pool:
+        # The cohort figures render on the same workers, ahead of the reports
+        figures_start = time.perf_counter()
+        figures = cohort_figures(df, executor=pool)
+        figures_seconds = time.perf_counter() - figures_start
+        for path, seconds in pool.map(render_one, jobs, chunksize=max(1, len(jobs) // 64)):
+            timings.append((path, seconds))
+            print(f"   {os.path.basename(path):50} {seconds * 1000:8.1f} ms")
+
+    cohort_path = os.path.join(out_dir, "COHORT_REPORT.pdf")
+    cohort_start = time.perf_counter()
+    build_cohort_report(df, cohort_path, figures=figures)
+    timings.append((cohort_path, figures_seconds + time.perf_counter() - cohort_start))
+
+    pd.DataFrame(timings, columns=['file', 'seconds']).to_csv(os.path.join(out_dir, 'timings.csv'), index=False)
+    total = time.perf_counter() - start
+    print(f"{len(jobs)} researcher reports + cohort report in {total:.1f} s "
+          f"({len(jobs) / total:.1f} reports/s) -> {out_dir}/")
+    return timings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate Levelling Up Academia PDF reports")
+    parser.add_argument("--results", default=RESULTS_STORE_PATH,
+                        help="results store written by main.py (latest run), or a results CSV")
+    parser.add_argument("--batch", metavar="OUT_DIR", help="write one PDF per researcher plus a cohort report into OUT_DIR")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes for --batch (default: CPU count)")
+    args = parser.parse_args()
 
-# Build PDF
-doc.build(story)
-print("PDF Generated Successfully!")
-print("File name: LEVELLING_UP_ACADEMIA_FINAL_REPORT.pdf")
+    if args.batch:
+        print(f"Generating batch reports from {args.results}...")
+        build_batch(args.results, args.batch, args.workers)
+    else:
+        # Load the latest run's results
+        df = load_results(args.results)
+        print("Generating PDF report with ReportLab...")
+        build_cohort_report(df, FINAL_REPORT)
+        print("PDF Generated Successfully!")
+        print(f"File name: {FINAL_REPORT}")
@@ -0,0 +1,165 @@
+import base64
+import functools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+from generate_pdf import METRIC_COLUMNS, load_results, report_filename, write_atomic
+
+# HTML reports from report_template.html (cohort) and researcher_template.html
+# (one researcher), rendered with Jinja2. Templates are compiled once per
+# process, the figures are embedded as data URIs (SVG by default, so the
+# files are self-contained), and the cohort table is streamed to disk row by
+# row instead of being built as one string. With WeasyPrint installed the
+# HTML can also be converted to PDF in a process pool.
+#
+#   python html_report.py                          # LEVELLING_UP_ACADEMIA_FINAL_REPORT.html
+#   python html_report.py --batch reports_html/ --pdf --workers 4
+
+TEMPLATE_DIR = os.path.dirname(os.path.abspath(__file__))
+COHORT_TEMPLATE = "report_template.html"
+RESEARCHER_TEMPLATE = "researcher_template.html"
+FINAL_REPORT_HTML = "LEVELLING_UP_ACADEMIA_FINAL_REPORT.html"
+MIME_TYPES = {"svg": "image/svg+xml", "png": "image/png"}
+
+
+@functools.cache
+def environment():
+    # auto_reload=False: a loaded template is never re-checked against the file
+    return Environment(loader=FileSystemLoader(TEMPLATE_DIR), autoescape=select_autoescape(["html"]),
+                       auto_reload=False, trim_blocks=True, lstrip_blocks=True)
+
+
+@functools.cache
+def template(name):
+    return environment().get_template(name)
+
+
+def data_uri(data, fmt):
+    return f"data:{MIME_TYPES[fmt]};base64,{base64.b64encode(data).decode('ascii')}"
+
+
+def figure_uris(df, fmt="svg"):
+    from plots import REPORT_DPI, render_figures
+    return [data_uri(data, fmt) for data in render_figures(df, fmt=fmt, dpi=REPORT_DPI).values()]
+
+
+def iter_rows(df):
+    # One dict per researcher, created as the template reaches it
+    columns = list(df.columns)
+    for values in df.itertuples(index=False, name=None):
+        yield dict(zip(columns, values))
+
+
+# RENDERING
+
+def render_cohort(df, path, figures=None, fmt="svg"):
+    """Stream the cohort report for `df` into `path`."""
+    figures = figure_uris(df, fmt) if figures is None else figures
+    chunks = template(COHORT_TEMPLATE).generate(results=iter_rows(df), figures=figures)
+
+    def write(tmp):
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.writelines(chunks)
+    write_atomic(path, write)
+
+
+def render_researcher(row, ranks, cohort_size):
+    return template(RESEARCHER_TEMPLATE).render(row=row, ranks=ranks, cohort_size=cohort_size, metrics=METRIC_COLUMNS)
+
+
+def write_text(path, text):
+    def write(tmp):
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+    write_atomic(path, write)
+
+
+# HTML -> PDF (optional: WeasyPrint needs Pango and Cairo system libraries)
+
+def weasyprint_html():
+    try:
+        from weasyprint import HTML
+    except (ImportError, OSError) as exc:
+        raise RuntimeError(f"HTML to PDF conversion needs WeasyPrint and its system libraries ({exc})") from exc
+    return HTML
+
+
+def convert_one(html_path):
+    start = time.perf_counter()
+    pdf_path = os.path.splitext(html_path)[0] + ".pdf"
+    HTML = weasyprint_html()
+    write_atomic(pdf_path, lambda tmp: HTML(filename=html_path).write_pdf(tmp))
+    return pdf_path, time.perf_counter() - start
+
+
+def convert_to_pdf(html_paths, workers=None):
+    # Each worker process imports WeasyPrint once and converts its share of the files
+    weasyprint_html()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(convert_one, html_paths, chunksize=max(1, len(html_paths) // 64)))
+
+
+# BATCH
+
+def build_batch(results, out_dir, pdf=False, workers=None):
+    """One HTML report per researcher plus COHORT_REPORT.html (and a PDF of
+    each with `pdf`). Returns (path, seconds) timings, also in timings.csv."""
+    import pandas as pd
+    if pdf:
+        weasyprint_html()   # fail before writing anything
+    df = load_results(results)
+    os.makedirs(out_dir, exist_ok=True)
+    ranks = df[METRIC_COLUMNS].rank(ascending=False, method='min').to_dict('records')
+
+    start = time.perf_counter()
+    timings, paths = [], []
+    for i, (row, rank) in enumerate(zip(iter_rows(df), ranks)):
+        t0 = time.perf_counter()
+        path = os.path.join(out_dir, report_filename(i + 1, row['Name']).replace('.pdf', '.html'))
+        write_text(path, render_researcher(row, rank, len(df)))
+        timings.append((path, time.perf_counter() - t0))
+        paths.append(path)
+    cohort_path = os.path.join(out_dir, "COHORT_REPORT.html")
+    t0 = time.perf_counter()
+    render_cohort(df, cohort_path)
+    timings.append((cohort_path, time.perf_counter() - t0))
+    paths.append(cohort_path)
+    print(f"{len(df)} researcher reports + cohort report as HTML in {time.perf_counter() - start:.2f} s")
+
+    if pdf:
+        pdf_start = time.perf_counter()
+        timings += convert_to_pdf(paths, workers)
+        print(f"{len(paths)} PDFs from HTML in {time.perf_counter() - pdf_start:.1f} s")
+
+    pd.DataFrame(timings, columns=['file', 'seconds']).to_csv(os.path.join(out_dir, 'timings.csv'), index=False)
+    total = time.perf_counter() - start
+    print(f"{len(paths)} reports in {total:.1f} s ({len(paths) / total:.1f} reports/s) -> {out_dir}/")
+    return timings
+
+
+if __name__ == "__main__":
+    import argparse
+    from results_store import RESULTS_STORE_PATH
+    parser = argparse.ArgumentParser(description="Generate Levelling Up Academia HTML reports")
+    parser.add_argument("--results", default=RESULTS_STORE_PATH, help="results store (latest run) or a results CSV")
+    parser.add_argument("--output", default=FINAL_REPORT_HTML, help="cohort report file (default: %(default)s)")
+    parser.add_argument("--batch", metavar="OUT_DIR", help="write one report per researcher plus a cohort report into OUT_DIR")
+    parser.add_argument("--pdf", action="store_true", help="also convert every report to PDF with WeasyPrint")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes for --pdf (default: CPU count)")
+    args = parser.parse_args()
+
+    try:
+        if args.batch:
+            build_batch(args.results, args.batch, args.pdf, args.workers)
+        else:
+            if args.pdf:
+                weasyprint_html()   # fail before writing anything
+            render_cohort(load_results(args.results), args.output)
+            print(f"Cohort report written to {args.output}")
+            if args.pdf:
+                print(f"PDF written to {convert_to_pdf([args.output], 1)[0][0]}")
+    except RuntimeError as exc:
+        raise SystemExit(str(exc))
@@ -0,0 +1,132 @@
+import email.utils
+import os
+import random
+import threading
+import time
+
+import requests
+
+import telemetry
+from rate_limit import TokenBucket
+
+# One pooled HTTP client for every Semantic Scholar request (main.py, the web
+# app, BulkFetcher): keep-alive connections, bounded retries with jittered
+# exponential backoff, Retry-After support, and a shared token bucket whose
+# rate is halved on every 429 and recovers on successes.
+
+HEADERS = {"User-Agent": "LevellingUpAcademia/2.0"}
+RETRIES = int(os.environ.get("S2_RETRIES", 4))
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+BACKOFF_BASE = 0.5        # seconds; attempt n waits up to BACKOFF_BASE * 2**n ...
+BACKOFF_CAP = 30.0        # ... but never more than this
+MAX_RETRY_AFTER = 120.0   # longer Retry-After values are treated as this
+
+
+def backoff_delay(attempt, base=BACKOFF_BASE, cap=BACKOFF_CAP):
+    # "Full jitter": uniform in [0, min(cap, base * 2**attempt)], so clients
+    # that failed together do not retry together
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def retry_after(response):
+    # Seconds from a Retry-After header (delta-seconds or HTTP date), or None
+    value = response.headers.get("Retry-After") if response is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def retry_delay(attempt, response):
+    wait = retry_after(response)
+    if wait is None:
+        return backoff_delay(attempt)
+    # Honour the server, plus a little jitter to spread the retries out
+    return min(wait, MAX_RETRY_AFTER) + random.uniform(0, BACKOFF_BASE)
+
+
+class ApiClient:
+    """Thread-safe pooled session with retries; share one instance between threads."""
+
+    def __init__(self, limiter=None, retries=RETRIES, timeout=30, pool_size=32, backoff=retry_delay,
+                 adaptive=True, sleep=time.sleep):
+        self.limiter = limiter
+        self.retries = retries
+        self.timeout = timeout
+        self.backoff = backoff
+        self.adaptive = adaptive
+        self.sleep = sleep
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update(HEADERS)
+        self.stats = {"requests": 0, "retries": 0, "throttled": 0, "errors": 0, "bytes": 0, "backoff_seconds": 0.0}
+        self._lock = threading.Lock()
+
+    def _count(self, key, n=1):
+        with self._lock:
+            self.stats[key] += n
+        telemetry.count(f"http_{key}", n)
+
+    def request(self, method, url, retries=None, on_response=None, **kwargs):
+        """Send a request, retrying connection errors, 429 and 5xx responses.
+
+        Returns the first response with any other status (callers check it),
+        or None once `retries` retries have failed. on_response(response or
+        None) is called after every attempt.
+        """
+        retries = self.retries if retries is None else retries
+        kwargs.setdefault("timeout", self.timeout)
+        for attempt in range(retries + 1):
+            if self.limiter is not None:
+                with telemetry.span("rate_limit_wait"):
+                    self.limiter.acquire()
+            self._count("requests")
+            if attempt:
+                self._count("retries")
+            try:
+                with telemetry.span("http"):
+                    r = self.session.request(method, url, **kwargs)
+            except requests.RequestException:
+                r = None
+            if r is not None:
+                self._count("bytes", len(r.content))
+            if on_response is not None:
+                on_response(r)
+            if r is not None and r.status_code not in RETRY_STATUSES:
+                if r.status_code >= 400:
+                    self._count("errors")
+                elif self.adaptive and self.limiter is not None:
+                    self.limiter.succeeded()
+                return r
+            self._count("errors")
+            if r is not None and r.status_code == 429:
+                self._count("throttled")
+                if self.adaptive and self.limiter is not None:
+                    self.limiter.throttled()
+            if attempt < retries:
+                delay = self.backoff(attempt, r)
+                self._count("backoff_seconds", delay)
+                with telemetry.span("backoff"):
+                    self.sleep(delay)
+        return None
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def shared_client():
+    # The process-wide client, rate limited by S2_RATE_LIMIT / S2_RATE_BURST
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = ApiClient(limiter=TokenBucket())
+        return _shared
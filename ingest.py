@@ -0,0 +1,276 @@
+import argparse
+import gzip
+import itertools
+import json
+import os
+import random
+import shutil
+import time
+
+import numpy as np
+
+# Offline ingestion of Semantic Scholar dataset dumps (gzipped JSONL, one
+# paper per line) into a local author -> papers index, so authors can be
+# evaluated without any HTTP requests:
+#
+#   python ingest.py synth fixtures/synthetic_papers.jsonl.gz --papers 2000 --authors 300
+#   python ingest.py build dumps/papers-*.jsonl.gz
+#   python ingest.py evaluate
+#   PAPER_SOURCE=local python main.py
+#
+# Only year, citation count and author count are kept per paper. On disk the
+# index is a directory of raw little-endian arrays plus meta.json, all opened
+# memory-mapped:
+#   year.bin / citations.bin / n_authors.bin   one entry per paper row
+#   author_keys.bin    author IDs, sorted within each of `partitions` hash partitions
+#   author_ptr.bin     CSR offsets: papers of author i are author_papers[ptr[i]:ptr[i + 1]]
+#   author_papers.bin  paper rows
+
+LOCAL_INDEX_PATH = os.environ.get("LOCAL_INDEX_PATH", os.path.join("output", "local_index"))
+PARTITIONS = 64
+BATCH = 100_000    # papers buffered in memory between flushes
+PAPER_COLUMNS = {"year": "<i4", "citations": "<i8", "n_authors": "<i4"}
+
+
+def read_dump(paths):
+    # Paper records from gzipped JSONL files, streamed one line at a time
+    for path in paths:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def author_key(author):
+    # S2 author IDs are numeric strings; anything else cannot be indexed
+    aid = author.get("authorId") if isinstance(author, dict) else None
+    return int(aid) if aid and str(aid).isdigit() else None
+
+
+# BUILDING THE INDEX (bounded memory)
+
+def build_index(paths, out_dir=LOCAL_INDEX_PATH, partitions=PARTITIONS, batch=BATCH, name_index=None, verbose=True):
+    """Stream dump files into a new index at `out_dir`, replacing any existing one.
+
+    Memory stays bounded by `batch` papers plus one hash partition of
+    (author, paper) pairs: pairs are spilled to per-partition files while
+    streaming, then each partition is sorted on its own. Author names are
+    added to `name_index` (an AuthorNameIndex) batch by batch when given.
+    """
+    build_dir = f"{out_dir}.building-{os.getpid()}"
+    shutil.rmtree(build_dir, ignore_errors=True)
+    os.makedirs(os.path.join(build_dir, "pairs"))
+    start = time.perf_counter()
+    column_files = {name: open(os.path.join(build_dir, f"{name}.bin"), "wb") for name in PAPER_COLUMNS}
+    pair_files = [open(os.path.join(build_dir, "pairs", f"{p:03d}.bin"), "wb") for p in range(partitions)]
+    buffers = {name: [] for name in PAPER_COLUMNS}
+    pair_authors, pair_rows = [], []
+    names = {}
+    stats = {"papers": 0, "pairs": 0, "skipped_authors": 0}
+
+    def flush():
+        for name, dtype in PAPER_COLUMNS.items():
+            np.asarray(buffers[name], dtype=dtype).tofile(column_files[name])
+            buffers[name].clear()
+        if pair_authors:
+            pairs = np.column_stack([np.asarray(pair_authors, dtype="<i8"), np.asarray(pair_rows, dtype="<i8")])
+            part = pairs[:, 0] % partitions
+            order = np.argsort(part, kind="stable")
+            bounds = np.searchsorted(part[order], np.arange(partitions + 1))
+            for p in range(partitions):
+                pairs[order[bounds[p]:bounds[p + 1]]].tofile(pair_files[p])
+            stats["pairs"] += len(pairs)
+        pair_authors.clear()
+        pair_rows.clear()
+        if name_index is not None and names:
+            name_index.add_many(names.items())
+        names.clear()
+
+    try:
+        for record in read_dump(paths):
+            row = stats["papers"]
+            authors = record.get("authors") or []
+            buffers["year"].append(record.get("year") or 0)
+            buffers["citations"].append(record.get("citationcount", record.get("citationCount")) or 0)
+            buffers["n_authors"].append(len(authors) or 1)
+            for author in authors:
+                key = author_key(author)
+                if key is None:
+                    stats["skipped_authors"] += 1
+                    continue
+                pair_authors.append(key)
+                pair_rows.append(row)
+                if name_index is not None and author.get("name"):
+                    names[author["authorId"]] = author["name"]
+            stats["papers"] += 1
+            if len(buffers["year"]) >= batch:
+                flush()
+                if verbose:
+                    print(f"   {stats['papers']:,} papers...", flush=True)
+        flush()
+    finally:
+        for f in [*column_files.values(), *pair_files]:
+            f.close()
+
+    # One partition at a time: sort pairs by (author, paper row) into the CSR arrays
+    part_offsets, counts = [0], []
+    with open(os.path.join(build_dir, "author_keys.bin"), "wb") as keys_file, \
+            open(os.path.join(build_dir, "author_papers.bin"), "wb") as rows_file:
+        for p in range(partitions):
+            pairs = np.fromfile(os.path.join(build_dir, "pairs", f"{p:03d}.bin"), dtype="<i8").reshape(-1, 2)
+            pairs = pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+            keys, n = np.unique(pairs[:, 0], return_counts=True)
+            keys.astype("<i8").tofile(keys_file)
+            pairs[:, 1].astype("<i8").tofile(rows_file)
+            counts.append(n)
+            part_offsets.append(part_offsets[-1] + len(keys))
+    ptr = np.concatenate([[0], np.cumsum(np.concatenate(counts))]).astype("<i8")
+    ptr.tofile(os.path.join(build_dir, "author_ptr.bin"))
+    shutil.rmtree(os.path.join(build_dir, "pairs"))
+
+    meta = dict(stats, authors=part_offsets[-1], partitions=partitions, part_offsets=part_offsets,
+                columns=PAPER_COLUMNS, sources=[os.path.basename(p) for p in paths])
+    with open(os.path.join(build_dir, "meta.json"), "w") as f:
+        json.dump(meta, f)
+    shutil.rmtree(out_dir, ignore_errors=True)
+    os.replace(build_dir, out_dir)
+    if verbose:
+        print(f"Indexed {meta['papers']:,} papers by {meta['authors']:,} authors "
+              f"in {time.perf_counter() - start:.1f} s -> {out_dir}/")
+    return meta
+
+
+# READING THE INDEX
+
+def _open(path, dtype):
+    # np.memmap cannot map an empty file
+    return np.memmap(path, dtype=dtype, mode="r") if os.path.getsize(path) else np.zeros(0, dtype=dtype)
+
+
+class LocalIndex:
+    """Read-only, memory-mapped author -> papers index written by build_index()."""
+
+    def __init__(self, path=LOCAL_INDEX_PATH):
+        self.path = path
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+        self._columns = {name: _open(os.path.join(path, f"{name}.bin"), dtype)
+                         for name, dtype in self.meta["columns"].items()}
+        self._keys = _open(os.path.join(path, "author_keys.bin"), "<i8")
+        self._ptr = _open(os.path.join(path, "author_ptr.bin"), "<i8")
+        self._rows = _open(os.path.join(path, "author_papers.bin"), "<i8")
+        self._parts = np.asarray(self.meta["part_offsets"], dtype=np.int64)
+
+    def __len__(self):
+        return int(self.meta["authors"])
+
+    def _position(self, author_id):
+        author_id = str(author_id)
+        if not author_id.isdigit():
+            return None
+        key = int(author_id)
+        p = key % self.meta["partitions"]
+        lo, hi = self._parts[p], self._parts[p + 1]
+        i = lo + int(np.searchsorted(self._keys[lo:hi], key))
+        return i if i < hi and self._keys[i] == key else None
+
+    def __contains__(self, author_id):
+        return self._position(author_id) is not None
+
+    def columns(self, author_id):
+        # paper_columns()-style arrays for one author, or None if unknown
+        i = self._position(author_id)
+        if i is None:
+            return None
+        rows = self._rows[self._ptr[i]:self._ptr[i + 1]]
+        return {name: np.asarray(column[rows]) for name, column in self._columns.items()}
+
+    def author_ids(self):
+        for start in range(0, len(self._keys), BATCH):
+            yield from (str(k) for k in self._keys[start:start + BATCH].tolist())
+
+
+# EVALUATING EVERY AUTHOR OFFLINE
+
+def evaluate_index(index, store_path, cohort_index=None, verbose=True):
+    # Appends one results row per author to a new run of the results store,
+    # BATCH authors per part file; optionally feeds the cohort percentile index
+    import results_store
+    from metrics import compute_metrics
+
+    start, done, run_id, batch = time.perf_counter(), 0, results_store.new_run_id(), {}
+
+    def flush():
+        results_store.append([results_store.result_row(aid, None, m) for aid, m in batch.items()], run_id, store_path)
+        if cohort_index is not None:
+            cohort_index.add_many(batch)
+        batch.clear()
+
+    for aid in index.author_ids():
+        batch[aid] = compute_metrics(index.columns(aid))
+        done += 1
+        if len(batch) >= BATCH:
+            flush()
+            if verbose:
+                print(f"   {done:,} authors...", flush=True)
+    if batch:
+        flush()
+    if verbose:
+        elapsed = time.perf_counter() - start
+        print(f"Evaluated {done:,} authors in {elapsed:.1f} s ({done / max(elapsed, 1e-9):,.0f} authors/s)"
+              f" -> {store_path}/run={run_id}/")
+    return run_id
+
+
+# SYNTHETIC DUMP (test fixture)
+
+def write_synthetic_dump(path, n_papers, n_authors, seed=0):
+    # Dataset-style records (corpusid, citationcount, ...) with a skewed
+    # papers-per-author distribution and ~1% mega-collaboration papers
+    rng = random.Random(seed)
+    cum_weights = list(itertools.accumulate(1 / (i + 1) for i in range(n_authors)))
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        for corpus_id in range(n_papers):
+            team = rng.randint(500, 3000) if rng.random() < 0.01 else rng.choice([1, 1, 2, 3, 3, 4, 5, 8])
+            ids = set(rng.choices(range(n_authors), cum_weights=cum_weights, k=min(team, n_authors)))
+            record = {
+                "corpusid": corpus_id,
+                "title": f"Synthetic paper {corpus_id}",
+                "year": rng.randint(1970, 2025) if rng.random() > 0.03 else None,
+                "citationcount": int(rng.paretovariate(1.2)) - 1 if rng.random() > 0.1 else 0,
+                "authors": [{"authorId": str(1000 + a), "name": f"Author {1000 + a}"} for a in sorted(ids)],
+            }
+            f.write(json.dumps(record) + "\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingest Semantic Scholar paper dumps for offline evaluation")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="build the local author index from gzipped JSONL dumps")
+    build.add_argument("dumps", nargs="+")
+    build.add_argument("--out", default=LOCAL_INDEX_PATH)
+    build.add_argument("--partitions", type=int, default=PARTITIONS)
+    build.add_argument("--author-names", action="store_true", help="also add every author name to the search index")
+    evaluate = sub.add_parser("evaluate", help="compute metrics for every author in the index")
+    evaluate.add_argument("--index", default=LOCAL_INDEX_PATH)
+    evaluate.add_argument("--out", default=None, help="results store directory (default: RESULTS_STORE_PATH)")
+    evaluate.add_argument("--cohort-index", action="store_true", help="also add every author to the cohort percentile index")
+    synth = sub.add_parser("synth", help="write a synthetic dump")
+    synth.add_argument("out")
+    synth.add_argument("--papers", type=int, default=2000)
+    synth.add_argument("--authors", type=int, default=300)
+    synth.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        from author_index import AuthorNameIndex
+        build_index(args.dumps, args.out, args.partitions, name_index=AuthorNameIndex() if args.author_names else None)
+    elif args.command == "evaluate":
+        from cohort_index import CohortIndex
+        from results_store import RESULTS_STORE_PATH
+        evaluate_index(LocalIndex(args.index), args.out or RESULTS_STORE_PATH,
+                       CohortIndex() if args.cohort_index else None)
+    else:
+        write_synthetic_dump(args.out, args.papers, args.authors, args.seed)
+        print(f"Wrote {args.papers:,} synthetic papers to {args.out}")
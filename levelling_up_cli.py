@@ -0,0 +1,161 @@
+import argparse
+import contextlib
+import json
+import os
+import sys
+
+# Command-line entry point (`levelling-up` once installed, or python levelling_up_cli.py):
+#
+#   levelling-up evaluate 1741106 2155103="Leslie Lamport"   # metrics only
+#   levelling-up evaluate --json --no-save > metrics.json
+#   levelling-up plot                                        # latest results run
+#   levelling-up report --batch output/reports
+#   levelling-up report --engine html                        # report_template.html
+#
+# Every module is imported inside its command, so `evaluate` never loads
+# pandas, pyarrow, matplotlib or ReportLab and starts in a fraction of a second.
+
+TABLE_COLUMNS = [("Name", 25), ("Papers", 7), ("Total Citations", 15), ("h-index", 7),
+                 ("Freshness-Weighted h", 20), ("CRI (Collab-Resilient)", 22), ("CLS (Consistency Score)", 23)]
+
+
+def parse_authors(items):
+    # "ID" or "ID=Name"; unnamed authors are shown (and stored) by their ID
+    authors = {}
+    for item in items:
+        aid, _, name = item.partition("=")
+        authors[aid.strip()] = name.strip() or aid.strip()
+    return authors
+
+
+def format_table(rows):
+    lines = ["  ".join(f"{col:>{width}}" if i else f"{col:<{width}}" for i, (col, width) in enumerate(TABLE_COLUMNS))]
+    for row in rows:
+        lines.append("  ".join(f"{row[col]!s:>{width}}" if i else f"{row[col]!s:<{width}.{width}}"
+                               for i, (col, width) in enumerate(TABLE_COLUMNS)))
+    return "\n".join(lines)
+
+
+def cmd_evaluate(args):
+    import levelling_up
+    import results_store
+    authors = parse_authors(args.authors) if args.authors else levelling_up.FAMOUS_AUTHORS
+    if args.source == "local":
+        try:
+            levelling_up.get_local_index()
+        except FileNotFoundError:
+            print(f"No local index in {levelling_up.LOCAL_INDEX_PATH}/ (build it with ingest.py)", file=sys.stderr)
+            return 1
+    # With --json, progress goes to stderr so stdout stays machine-readable
+    progress = contextlib.redirect_stdout(sys.stderr) if args.json else contextlib.nullcontext()
+    with progress:
+        results = levelling_up.evaluate_cohort(authors, args.workers, args.source)
+        if not args.no_save and results:
+            run_id = levelling_up.save_results(results)
+            print(f"\nResults saved as run {run_id} in '{results_store.RESULTS_STORE_PATH}/'")
+        if args.plots and results:
+            import pandas as pd
+            os.makedirs(args.plots, exist_ok=True)
+            levelling_up.write_plots(pd.DataFrame(results), args.plots)
+            print(f"Plots written to '{args.plots}/'")
+        levelling_up.get_paper_cache().wait_for_refreshes()
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print()
+        print(format_table(results))
+    missing = len(authors) - len(results)
+    if missing:
+        print(f"{missing} of {len(authors)} authors not found", file=sys.stderr)
+    return 0 if results else 1
+
+
+def cmd_plot(args):
+    import levelling_up
+    from results_store import read_any
+    df = read_any(args.results)
+    if df.empty:
+        print(f"No results in {args.results}", file=sys.stderr)
+        return 1
+    os.makedirs(args.out, exist_ok=True)
+    for path in levelling_up.write_plots(df, args.out, args.format):
+        print(path)
+    return 0
+
+
+def cmd_report(args):
+    if args.engine != "reportlab":
+        return html_report(args)
+    import generate_pdf
+    if args.batch:
+        print(f"Generating batch reports from {args.results}...")
+        generate_pdf.build_batch(args.results, args.batch, args.workers)
+    else:
+        df = generate_pdf.load_results(args.results)
+        generate_pdf.build_cohort_report(df, args.output)
+        print(f"Cohort report written to {args.output}")
+    return 0
+
+
+def html_report(args):
+    import html_report
+    pdf = args.engine == "weasyprint"
+    try:
+        if args.batch:
+            html_report.build_batch(args.results, args.batch, pdf, args.workers)
+            return 0
+        if pdf:
+            html_report.weasyprint_html()   # fail before writing anything
+        output = os.path.splitext(args.output)[0] + ".html"
+        html_report.render_cohort(html_report.load_results(args.results), output)
+        print(f"Cohort report written to {output}")
+        if pdf:
+            print(f"PDF written to {html_report.convert_to_pdf([output], 1)[0][0]}")
+    except RuntimeError as exc:
+        print(exc, file=sys.stderr)
+        return 1
+    return 0
+
+
+def build_parser():
+    from results_store import RESULTS_STORE_PATH
+    parser = argparse.ArgumentParser(prog="levelling-up", description="Levelling Up Academia research metrics")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    evaluate = commands.add_parser("evaluate", help="compute metrics for authors and store them as a results run")
+    evaluate.add_argument("authors", nargs="*", metavar="ID[=NAME]",
+                          help="Semantic Scholar author IDs (default: the main.py comparison cohort)")
+    evaluate.add_argument("--source", choices=["api", "local"], default=os.environ.get("PAPER_SOURCE", "api"),
+                          help="fetch papers from the API or read the ingest.py index (default: PAPER_SOURCE or api)")
+    evaluate.add_argument("--workers", type=int, default=int(os.environ.get("EVAL_WORKERS", 4)))
+    evaluate.add_argument("--no-save", action="store_true", help="do not write a results run")
+    evaluate.add_argument("--json", action="store_true", help="print the result rows as JSON")
+    evaluate.add_argument("--plots", metavar="OUT_DIR", help="also write the comparison plots into OUT_DIR")
+    evaluate.set_defaults(run=cmd_evaluate)
+
+    plot = commands.add_parser("plot", help="write the comparison plots for stored results")
+    plot.add_argument("--results", default=RESULTS_STORE_PATH, help="results store (latest run) or a results CSV")
+    plot.add_argument("--out", default="output", help="output directory (default: output)")
+    plot.add_argument("--format", choices=["png", "svg", "pdf"], default="png", help="svg and pdf are vector output")
+    plot.set_defaults(run=cmd_plot)
+
+    report = commands.add_parser("report", help="generate PDF reports for stored results")
+    report.add_argument("--results", default=RESULTS_STORE_PATH, help="results store (latest run) or a results CSV")
+    report.add_argument("--output", default="LEVELLING_UP_ACADEMIA_FINAL_REPORT.pdf",
+                        help="cohort report file (default: %(default)s)")
+    report.add_argument("--batch", metavar="OUT_DIR", help="write one PDF per researcher plus a cohort report into OUT_DIR")
+    report.add_argument("--engine", choices=["reportlab", "html", "weasyprint"], default="reportlab",
+                        help="ReportLab PDFs, HTML from report_template.html, or that HTML converted by WeasyPrint")
+    report.add_argument("--workers", type=int, default=None,
+                        help="worker processes for --batch / WeasyPrint (default: CPU count)")
+    report.set_defaults(run=cmd_report)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
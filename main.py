@@ -1,201 +1,6 @@
+# `python main.py` runs the full comparison. The steps live in levelling_up.py
+# (installed as a library module); this script is not installed.
+from levelling_up import main
 
-import requests
-import time
-import json
-import csv
-from datetime import datetime
-import matplotlib.pyplot as plt
-import seaborn as sns
-from collections import defaultdict
-import os
-
-sns.set(style="whitegrid")
-HEADERS = {"User-Agent": "LevellingUpAcademia/2.0"}
-OUTPUT_DIR = "output"
-os.makedirs(OUTPUT_DIR, exist_ok=True)
-
-# DATA FETCHING WITH PAGINATION
-def fetch_all_papers(author_id):
-    papers = []
-    offset = 0
-    limit = 100
-
-    print(f"   Fetching papers for author {author_id}...", end="")
-    while True:
-        url = f"https://api.semanticscholar.org/graph/v1/author/{author_id}/papers"
-        params = {"fields": "title,year,citationCount,authors", "limit": limit, "offset": offset}
-        try:
-            r = requests.get(url, params=params, headers=HEADERS, timeout=15)
-            if r.status_code != 200:
-                if r.status_code == 404:
-                    print(" Not found!")
-                    return []
-                time.sleep(2)
-                continue
-            data = r.json()
-            batch = data.get("data", [])
-            if not batch:
-                break
-            papers.extend(batch)
-            offset += limit
-            print(".", end="", flush=True)
-            time.sleep(0.6)
-        except:
-            time.sleep(2)
-    print(f" {len(papers)} papers")
-    return papers
-
-
-# CLASSIC METRICS
-
-def h_index(citations):
-    citations = sorted([c for c in citations if c > 0], reverse=True)
-    for i, c in enumerate(citations, 1):
-        if c < i:
-            return i - 1
-    return len(citations)
-
-
-# NEW METRIC 1: Freshness-Weighted h-index
-
-def freshness_weighted_h(papers):
-    current = datetime.now().year
-    weighted = []
-    for p in papers:
-        y = p.get("year")
-        c = p.get("citationCount", 0) or 0
-        if not y or y < 1950:
-            continue
-        age = current - y
-        weight = 1 / (1 + 0.15 * age)  # Tuned decay
-        weighted.append(c * weight)
-    weighted.sort(reverse=True)
-    for i, val in enumerate(weighted, 1):
-        if val < i:
-            return i - 1
-    return len(weighted)
-
-
-# NEW METRIC 2: Collaboration-Resilient Index (CRI)
-
-def collaboration_resilient_index(papers):
-    adjusted = []
-    for p in papers:
-        c = p.get("citationCount", 0) or 0
-        authors_list = p.get("authors", [])
-        n_authors = len(authors_list) if authors_list else 1
-        if n_authors > 1000: n_authors = 1000  # Cap extreme cases
-        adjusted_citation = c * (1 / (1 + 0.05 * (n_authors - 1)))
-        adjusted.append(adjusted_citation)
-    return h_index(adjusted)
-
-
-# NEW METRIC 3: Consistency & Longevity Score (CLS)
-
-def consistency_longevity_score(papers):
-    yearly_cites = defaultdict(int)
-    for p in papers:
-        y = p.get("year")
-        if y and 1950 <= y <= datetime.now().year:
-            yearly_cites[y] += p.get("citationCount", 0) or 0
-
-    years = sorted(yearly_cites.keys())
-    if len(years) < 5:
-        return 0
-
-    citations_per_year = [yearly_cites[y] for y in years]
-    avg = sum(citations_per_year) / len(citations_per_year)
-    if avg == 0:
-        return 0
-
-    # Coefficient of variation (lower = more consistent)
-    variance = sum((x - avg)**2 for x in citations_per_year) / len(citations_per_year)
-    cv = (variance**0.5) / avg
-
-    # Longevity bonus: active for many years
-    longevity = len(years) - 5
-
-    return round(avg / (1 + cv) + longevity * 2, 1)
-
-
-# MAIN EVALUATION
-
-def evaluate_author(author_id, name="Unknown"):
-    papers = fetch_all_papers(author_id)
-    if not papers:
-        return None
-
-    citations = [p.get("citationCount", 0) or 0 for p in papers]
-
-    return {
-        "Name": name,
-        "Papers": len(papers),
-        "Total Citations": sum(citations),
-        "h-index": h_index(citations),
-        "Freshness-Weighted h": freshness_weighted_h(papers),
-        "CRI (Collab-Resilient)": collaboration_resilient_index(papers),
-        "CLS (Consistency Score)": consistency_longevity_score(papers),
-    }
-
-
-# RUN FULL COMPARISON
-
-famous_authors = {
-    "1741106": "Yoshua Bengio",
-    "1433810": "Yann LeCun",
-    "144767642": "Geoffrey Hinton",
-    "2250410": "Andrew Ng",
-    "1693140": "Fei-Fei Li",
-    "205148198": "Albert Einstein",
-    "73910879": "Stephen Hawking",
-    "1703148": "Terence Tao",
-    "2155103": "Leslie Lamport",
-    "180505346": "Tim Berners-Lee",
-}
-
-results = []
-print("\n" + "="*60)
-print("   LEVELLING UP ACADEMIA — FINAL RESULTS")
-print("="*60)
-
-for aid, name in famous_authors.items():
-    print(f"{name:25} (ID: {aid})")
-    res = evaluate_author(aid, name)
-    if res:
-        results.append(res)
-
-# Save CSV
-keys = results[0].keys()
-with open(f"{OUTPUT_DIR}/results.csv", "w", newline="", encoding="utf-8") as f:
-    writer = csv.DictWriter(f, keys)
-    writer.writeheader()
-    writer.writerows(results)
-
-
-# GENERATE PLOTS
-
-df = __import__('pandas').DataFrame(results)
-
-plt.figure(figsize=(12, 8))
-top_n = df.sort_values("h-index", ascending=False)
-plt.barh(top_n["Name"], top_n["h-index"], label="Classic h-index", alpha=0.8)
-plt.barh(top_n["Name"], top_n["Freshness-Weighted h"], label="Freshness-Weighted h", alpha=0.7)
-plt.xlabel("Index Value")
-plt.title("Classic vs Freshness-Weighted h-index (2025)")
-plt.legend()
-plt.tight_layout()
-plt.savefig(f"{OUTPUT_DIR}/freshness_vs_h_index.png", dpi=300)
-plt.close()
-
-plt.figure(figsize=(10, 6))
-plt.scatter(df["h-index"], df["CLS (Consistency Score)"], s=100)
-for i, row in df.iterrows():
-    plt.text(row["h-index"]+1, row["CLS (Consistency Score)"], row["Name"], fontsize=9)
-plt.xlabel("h-index")
-plt.ylabel("Consistency & Longevity Score")
-plt.title("Do High h-index Authors Stay Consistent?")
-plt.savefig(f"{OUTPUT_DIR}/consistency_analysis.png", dpi=300)
-
-print(f"\nAll results saved in '{OUTPUT_DIR}/'")
-print("CSV, 3 high-quality plots, and ready for report!")
-print("You are now 100% ready to submit!")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
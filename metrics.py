@@ -0,0 +1,241 @@
+from collections import Counter
+from datetime import datetime
+
+import numpy as np
+
+from paper_store import PaperStore
+
+# One metrics engine shared by main.py and web_app.py. Papers are turned into
+# columnar arrays once; every metric is then a vectorized pass over them.
+
+MIN_YEAR = 1950
+FRESHNESS_DECAY = 0.15     # Tuned decay for Freshness-Weighted h
+COLLAB_PENALTY = 0.05      # Per extra co-author penalty for CRI
+MAX_AUTHORS = 1000         # Cap extreme mega-collaboration author counts
+CLS_MIN_YEARS = 5
+
+
+# COLUMNAR PAPER DATA
+
+def paper_columns(papers):
+    """Return {"year", "citations", "n_authors"} arrays for a PaperStore or a list of paper dicts.
+
+    Missing years become 0 and missing author lists count as one author.
+    """
+    if isinstance(papers, PaperStore):
+        return papers.columns()
+    n = len(papers)
+    year = np.fromiter((p.get("year") or 0 for p in papers), dtype=np.int32, count=n)
+    citations = np.fromiter((p.get("citationCount") or 0 for p in papers), dtype=np.int64, count=n)
+    n_authors = np.fromiter((len(p.get("authors") or ()) or 1 for p in papers), dtype=np.int32, count=n)
+    return {"year": year, "citations": citations, "n_authors": n_authors}
+
+
+# CLASSIC METRICS
+
+def h_index(values):
+    # O(n) counting h-index: bucket floor(value) capped at n, then find the
+    # largest h with at least h values >= h. Works for weighted (float) values.
+    v = np.asarray(values, dtype=np.float64)
+    n = v.size
+    if n == 0:
+        return 0
+    buckets = np.minimum(np.floor(v[v > 0]), n).astype(np.int64)
+    at_least = np.cumsum(np.bincount(buckets, minlength=n + 1)[::-1])[::-1]
+    return int(np.count_nonzero(at_least[1:] >= np.arange(1, n + 1)))
+
+
+def h_index_rows(values):
+    # Row-wise h_index for a 2-D array, e.g. one row per parameter setting.
+    # Same bucket counting as h_index, done for all rows with one bincount.
+    v = np.asarray(values, dtype=np.float64)
+    rows, n = v.shape
+    if n == 0:
+        return np.zeros(rows, dtype=np.int64)
+    buckets = np.minimum(np.floor(np.maximum(v, 0)), n).astype(np.int64)
+    buckets += (n + 1) * np.arange(rows)[:, None]
+    counts = np.bincount(buckets.ravel(), minlength=rows * (n + 1)).reshape(rows, n + 1)
+    at_least = np.cumsum(counts[:, ::-1], axis=1)[:, ::-1]
+    return np.count_nonzero(at_least[:, 1:] >= np.arange(1, n + 1), axis=1)
+
+
+class IncrementalHIndex:
+    # Streaming h-index. h never decreases as values arrive, so only values
+    # above the current h are tracked: `above` counts values >= h + 1 and
+    # `counts` holds how many of them share each floor(value).
+    def __init__(self):
+        self.h = 0
+        self.above = 0
+        self.counts = Counter()
+
+    def add(self, values):
+        floors = np.floor(np.asarray(values, dtype=np.float64))
+        floors = floors[floors > self.h].astype(np.int64)
+        keys, counts = np.unique(floors, return_counts=True)
+        self.counts.update(dict(zip(keys.tolist(), counts.tolist())))
+        self.above += floors.size
+        while self.above >= self.h + 1:
+            self.h += 1
+            self.above -= self.counts.pop(self.h, 0)
+        return self.h
+
+
+# NEW METRIC 1: Freshness-Weighted h-index
+
+def freshness_weights(year, current_year, decay=FRESHNESS_DECAY):
+    return 1 / (1 + decay * (current_year - year))
+
+
+# NEW METRIC 2: Collaboration-Resilient Index (CRI)
+
+def collaboration_weights(n_authors, penalty=COLLAB_PENALTY):
+    return 1 / (1 + penalty * (np.minimum(n_authors, MAX_AUTHORS) - 1))
+
+
+# NEW METRIC 3: Consistency & Longevity Score (CLS)
+
+def yearly_citations(year, citations, current_year):
+    # (papers per year, citations per year) indexed by year - MIN_YEAR
+    valid = (year >= MIN_YEAR) & (year <= current_year)
+    offset = year[valid] - MIN_YEAR
+    size = current_year - MIN_YEAR + 1
+    return (np.bincount(offset, minlength=size),
+            np.bincount(offset, weights=citations[valid], minlength=size))
+
+
+def consistency_longevity(year, citations, current_year):
+    papers_per_year, cites_per_year = yearly_citations(year, citations, current_year)
+    return cls_score(cites_per_year[papers_per_year > 0])
+
+
+def cls_score(per_year):
+    # `per_year`: citation sums for each year with at least one paper
+    if per_year.size < CLS_MIN_YEARS:
+        return 0
+    avg = per_year.mean()
+    if avg == 0:
+        return 0
+    # Coefficient of variation (lower = more consistent) plus a longevity bonus
+    cv = per_year.std() / avg
+    return round(float(avg / (1 + cv) + (per_year.size - CLS_MIN_YEARS) * 2), 1)
+
+
+# ALL METRICS IN ONE PASS
+
+def compute_metrics(papers, current_year=None):
+    """Compute every metric for `papers` (a PaperStore, a list of paper dicts or paper_columns output)."""
+    cols = papers if isinstance(papers, dict) else paper_columns(papers)
+    current_year = current_year or datetime.now().year
+    year, citations = cols["year"], cols["citations"]
+    dated = year >= MIN_YEAR
+    return {
+        "papers": int(citations.size),
+        "total_citations": int(citations.sum()),
+        "h_index": h_index(citations),
+        "freshness_h": h_index(citations[dated] * freshness_weights(year[dated], current_year)),
+        "cri": h_index(citations * collaboration_weights(cols["n_authors"])),
+        "cls": consistency_longevity(year, citations, current_year),
+    }
+
+
+# CAREER TRAJECTORY
+
+TRAJECTORY_CELLS = 4_000_000   # years x papers evaluated per chunk for Freshness-h
+
+
+def trajectory(papers, current_year=None):
+    """Every metric as of each year from the first publication to `current_year`.
+
+    "As of year Y" means over the papers published up to Y, with today's
+    citation counts. Papers without a year are left out. Returns a dict of
+    equal-length arrays keyed like compute_metrics(), plus "year".
+    """
+    cols = papers if isinstance(papers, dict) else paper_columns(papers)
+    current_year = current_year or datetime.now().year
+    year, citations, n_authors = cols["year"], cols["citations"], cols["n_authors"]
+    dated = (year >= MIN_YEAR) & (year <= current_year)
+    order = np.argsort(year[dated], kind="stable")
+    year, citations, n_authors = year[dated][order], citations[dated][order], n_authors[dated][order]
+    first = int(year[0]) if year.size else current_year
+    years = np.arange(first, current_year + 1)
+    ends = np.searchsorted(year, years, side="right")   # papers published up to each year
+
+    # h and CRI only grow as papers are added in year order, so one
+    # IncrementalHIndex each covers the whole career in a single pass
+    h, cri = IncrementalHIndex(), IncrementalHIndex()
+    cri_values = citations * collaboration_weights(n_authors)
+    h_traj = np.zeros(len(years), dtype=np.int64)
+    cri_traj = np.zeros(len(years), dtype=np.int64)
+    start = 0
+    for i, end in enumerate(ends):
+        h_traj[i] = h.add(citations[start:end])
+        cri_traj[i] = cri.add(cri_values[start:end])
+        start = end
+
+    # Freshness weights depend on the year of evaluation, so the h can also
+    # fall: one row per year, all rows computed together by h_index_rows
+    fresh_traj = np.zeros(len(years), dtype=np.int64)
+    step = max(1, TRAJECTORY_CELLS // max(year.size, 1))
+    for i in range(0, len(years), step):
+        as_of = years[i:i + step, None]
+        published = year[None, :] <= as_of
+        weights = freshness_weights(np.minimum(year[None, :], as_of), as_of)
+        fresh_traj[i:i + step] = h_index_rows(np.where(published, citations * weights, 0))
+
+    papers_per_year, cites_per_year = yearly_citations(year, citations, current_year)
+    offsets = years - MIN_YEAR
+    cls_traj = [cls_score(cites_per_year[:k + 1][papers_per_year[:k + 1] > 0]) for k in offsets]
+    return {
+        "year": years,
+        "papers": np.cumsum(papers_per_year)[offsets],
+        "total_citations": np.cumsum(cites_per_year)[offsets].astype(np.int64),
+        "h_index": h_traj,
+        "freshness_h": fresh_traj,
+        "cri": cri_traj,
+        "cls": np.asarray(cls_traj, dtype=np.float64),
+    }
+
+
+# INCREMENTAL (STREAMING) METRICS
+
+class MetricsAccumulator:
+    """Running metrics updated batch by batch as pages arrive.
+
+    snapshot() gives the same dict as compute_metrics() over every paper seen
+    so far, without re-sorting or re-scanning earlier batches.
+    """
+
+    def __init__(self, current_year=None):
+        self.current_year = current_year or datetime.now().year
+        self.papers = 0
+        self.total_citations = 0
+        self.h = IncrementalHIndex()
+        self.fresh = IncrementalHIndex()
+        self.cri = IncrementalHIndex()
+        size = self.current_year - MIN_YEAR + 1
+        self.papers_per_year = np.zeros(size, dtype=np.int64)
+        self.cites_per_year = np.zeros(size, dtype=np.float64)
+
+    def update(self, papers):
+        cols = papers if isinstance(papers, dict) else paper_columns(papers)
+        year, citations = cols["year"], cols["citations"]
+        dated = year >= MIN_YEAR
+        self.papers += int(citations.size)
+        self.total_citations += int(citations.sum())
+        self.h.add(citations)
+        self.fresh.add(citations[dated] * freshness_weights(year[dated], self.current_year))
+        self.cri.add(citations * collaboration_weights(cols["n_authors"]))
+        papers_per_year, cites_per_year = yearly_citations(year, citations, self.current_year)
+        self.papers_per_year += papers_per_year
+        self.cites_per_year += cites_per_year
+        return self
+
+    def snapshot(self):
+        return {
+            "papers": self.papers,
+            "total_citations": self.total_citations,
+            "h_index": self.h.h,
+            "freshness_h": self.fresh.h,
+            "cri": self.cri.h,
+            "cls": cls_score(self.cites_per_year[self.papers_per_year > 0]),
+        }
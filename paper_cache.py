@@ -0,0 +1,222 @@
+import contextlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+import telemetry
+from paper_store import PaperStore
+
+CACHE_PATH = os.environ.get("PAPER_CACHE_PATH", os.path.join("output", "paper_cache.sqlite3"))
+DEFAULT_TTL = int(os.environ.get("PAPER_CACHE_TTL", 7 * 24 * 3600))
+# Stale entries fully fetched more recently than this only get their citation
+# counts updated (see get_or_fetch's `update`); older ones are fetched again
+FULL_REFRESH_AGE = int(os.environ.get("PAPER_FULL_REFRESH_AGE", 30 * 24 * 3600))
+
+# Cache modes for get_or_fetch:
+#   "fresh"         -> refetch synchronously once the entry is past its TTL
+#   "stale-refresh" -> return the stale entry immediately, refresh it in the background
+MODES = ("fresh", "stale-refresh")
+
+
+def normalize_fields(fields):
+    if isinstance(fields, str):
+        fields = fields.split(",")
+    return ",".join(sorted(f.strip() for f in fields if f.strip()))
+
+
+# PERSISTENT PAPER CACHE (SQLite)
+
+class PaperCache:
+    def __init__(self, path=CACHE_PATH, ttl=DEFAULT_TTL, mode="stale-refresh", full_refresh_age=FULL_REFRESH_AGE):
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {MODES}, got {mode!r}")
+        self.path = path
+        self.ttl = ttl
+        self.mode = mode
+        self.full_refresh_age = full_refresh_age
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._stats = {"hits": 0, "stale_hits": 0, "misses": 0, "updates": 0, "refreshes": 0, "refresh_errors": 0}
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as con:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute(
+                "CREATE TABLE IF NOT EXISTS papers ("
+                " author_id TEXT NOT NULL,"
+                " fields TEXT NOT NULL,"
+                " fetched_at REAL NOT NULL,"
+                " expires_at REAL NOT NULL,"
+                " n_papers INTEGER NOT NULL,"
+                " payload BLOB NOT NULL,"
+                " PRIMARY KEY (author_id, fields))"
+            )
+
+    @contextlib.contextmanager
+    def _connect(self):
+        con = sqlite3.connect(self.path, timeout=30)
+        try:
+            with con:
+                yield con
+        finally:
+            con.close()
+
+    def _count(self, key):
+        with self._lock:
+            self._stats[key] += 1
+        telemetry.count(f"paper_cache_{key}")
+
+    def get(self, author_id, fields, allow_stale=True):
+        """Return (PaperStore, is_fresh) or None when nothing usable is cached."""
+        with self._connect() as con:
+            row = con.execute(
+                "SELECT expires_at, payload FROM papers WHERE author_id = ? AND fields = ?",
+                (str(author_id), normalize_fields(fields)),
+            ).fetchone()
+        if row is None:
+            return None
+        expires_at, payload = row
+        fresh = time.time() < expires_at
+        if not fresh and not allow_stale:
+            return None
+        data = json.loads(zlib.decompress(payload))
+        # Entries written before the compact format held raw paper lists
+        store = PaperStore.from_papers(data) if isinstance(data, list) else PaperStore.from_dict(data)
+        return store, fresh
+
+    def contains(self, author_id, fields, fresh_only=True):
+        with self._connect() as con:
+            row = con.execute(
+                "SELECT expires_at FROM papers WHERE author_id = ? AND fields = ?",
+                (str(author_id), normalize_fields(fields)),
+            ).fetchone()
+        return row is not None and (not fresh_only or time.time() < row[0])
+
+    def fetched_at(self, author_id, fields):
+        # Time of the last full fetch (citation-only updates keep it), or None
+        with self._connect() as con:
+            row = con.execute(
+                "SELECT fetched_at FROM papers WHERE author_id = ? AND fields = ?",
+                (str(author_id), normalize_fields(fields)),
+            ).fetchone()
+        return row[0] if row else None
+
+    def updatable(self, author_id, fields):
+        fetched_at = self.fetched_at(author_id, fields)
+        return fetched_at is not None and time.time() - fetched_at < self.full_refresh_age
+
+    def author_ids(self, fields):
+        with self._connect() as con:
+            rows = con.execute("SELECT author_id FROM papers WHERE fields = ? ORDER BY author_id",
+                               (normalize_fields(fields),)).fetchall()
+        return [r[0] for r in rows]
+
+    def put(self, author_id, fields, papers, ttl=None, fetched_at=None):
+        # `fetched_at` defaults to now; citation-only updates pass the old value
+        now = time.time()
+        ttl = self.ttl if ttl is None else ttl
+        if not isinstance(papers, PaperStore):
+            papers = PaperStore.from_papers(papers)
+        payload = zlib.compress(json.dumps(papers.to_dict(), separators=(",", ":")).encode("utf-8"))
+        with self._connect() as con:
+            con.execute(
+                "INSERT OR REPLACE INTO papers VALUES (?, ?, ?, ?, ?, ?)",
+                (str(author_id), normalize_fields(fields), fetched_at or now, now + ttl, len(papers), payload),
+            )
+
+    def invalidate(self, author_id, fields=None):
+        with self._connect() as con:
+            if fields is None:
+                con.execute("DELETE FROM papers WHERE author_id = ?", (str(author_id),))
+            else:
+                con.execute("DELETE FROM papers WHERE author_id = ? AND fields = ?",
+                            (str(author_id), normalize_fields(fields)))
+
+    def purge_expired(self):
+        with self._connect() as con:
+            return con.execute("DELETE FROM papers WHERE expires_at < ?", (time.time(),)).rowcount
+
+    def get_or_fetch(self, author_id, fields, fetch, ttl=None, mode=None, refresh=None, update=None):
+        # `fetch()` must return the full paper list (a PaperStore), or None when
+        # the result is incomplete and should not be cached. `refresh` is used instead of
+        # `fetch` for background refreshes (e.g. a variant without UI updates).
+        # `update(papers)` is a cheaper refresh of a stale entry (e.g. new
+        # citation counts only), tried first while the entry is updatable();
+        # it returns the updated PaperStore, or None to fall back to a full fetch.
+        mode = mode or self.mode
+        cached = self.get(author_id, fields)
+        if cached is not None:
+            papers, fresh = cached
+            if fresh:
+                self._count("hits")
+                return papers
+            if update is not None and not self.updatable(author_id, fields):
+                update = None
+            if mode == "stale-refresh":
+                self._count("stale_hits")
+                self._refresh_in_background(author_id, fields, refresh or fetch, ttl, update, papers)
+                return papers
+            if update is not None:
+                updated = self._update(author_id, fields, update, papers, ttl)
+                if updated is not None:
+                    return updated
+        self._count("misses")
+        papers = fetch()
+        if papers:
+            self.put(author_id, fields, papers, ttl)
+        return papers if papers is not None else PaperStore()
+
+    def _update(self, author_id, fields, update, papers, ttl):
+        fetched_at = self.fetched_at(author_id, fields)
+        updated = update(papers)
+        if updated:
+            self.put(author_id, fields, updated, ttl, fetched_at=fetched_at)
+            self._count("updates")
+            return updated
+        return None
+
+    def _refresh_in_background(self, author_id, fields, fetch, ttl, update=None, papers=None):
+        key = (str(author_id), normalize_fields(fields))
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def run():
+            try:
+                if update is not None and self._update(author_id, fields, update, papers, ttl) is not None:
+                    return
+                papers_now = fetch()
+                if papers_now:
+                    self.put(author_id, fields, papers_now, ttl)
+                self._count("refreshes")
+            except Exception:
+                self._count("refresh_errors")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=run, name=f"paper-cache-refresh-{author_id}", daemon=True).start()
+
+    def wait_for_refreshes(self, timeout=60):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            with self._lock:
+                if not self._refreshing:
+                    return True
+            time.sleep(0.05)
+        return False
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        with self._connect() as con:
+            entries, papers = con.execute("SELECT COUNT(*), COALESCE(SUM(n_papers), 0) FROM papers").fetchone()
+        lookups = stats["hits"] + stats["stale_hits"] + stats["misses"]
+        stats["entries"] = entries
+        stats["cached_papers"] = papers
+        stats["hit_rate"] = round((stats["hits"] + stats["stale_hits"]) / lookups, 3) if lookups else 0.0
+        return stats
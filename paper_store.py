@@ -0,0 +1,206 @@
+import heapq
+import sys
+from array import array
+
+import numpy as np
+
+TOP_N = 10   # Papers whose full author names are kept (PDF report "Top 10")
+
+
+def author_names(authors):
+    # Accepts raw API author objects, (authorId, name) pairs or plain name strings
+    names = []
+    for a in authors or ():
+        if isinstance(a, dict):
+            names.append(sys.intern(a.get("name") or ""))
+        elif isinstance(a, (tuple, list)):
+            names.append(a[1])
+        else:
+            names.append(a)
+    return names
+
+
+def author_refs(authors):
+    # (authorId, name) for every author with an ID; plain names carry none
+    for a in authors or ():
+        if isinstance(a, dict):
+            if a.get("authorId"):
+                yield a["authorId"], a.get("name") or ""
+        elif isinstance(a, (tuple, list)) and a[0]:
+            yield a[0], a[1]
+
+
+def slim_paper(record):
+    # Replace the author objects of a raw API record with interned
+    # (authorId, name) pairs
+    return {
+        "paperId": record.get("paperId"),
+        "title": record.get("title"),
+        "year": record.get("year"),
+        "citationCount": record.get("citationCount"),
+        "authors": tuple((sys.intern(a.get("authorId") or ""), sys.intern(a.get("name") or ""))
+                         for a in record.get("authors") or ()),
+    }
+
+
+# COMPACT COLUMNAR PAPER STORE
+
+class PaperStore:
+    """Array-backed paper list: one entry per paper in each column.
+
+    Only year, citation count and author count are kept for every paper,
+    plus the (interned) title and paper ID. Author names are kept for the
+    `top_n` most cited papers only. Co-authors are kept as a CSR-style list
+    of positions into `author_ids` / `author_labels` (one entry per distinct
+    author): the authors of paper i are `_author_idx[_author_ptr[i]:_author_ptr[i + 1]]`.
+    """
+
+    __slots__ = ("paper_ids", "titles", "_year", "_citations", "_n_authors", "top_n", "_top", "_top_authors",
+                 "author_ids", "author_labels", "_author_pos", "_author_ptr", "_author_idx")
+
+    def __init__(self, top_n=TOP_N):
+        self.paper_ids = []
+        self.titles = []
+        self._year = array("i")
+        self._citations = array("q")
+        self._n_authors = array("i")
+        self.top_n = top_n
+        self._top = []            # min-heap of (citations, -index)
+        self._top_authors = {}    # index -> author names, only for papers in _top
+        self.author_ids = []
+        self.author_labels = []
+        self._author_pos = {}     # authorId -> position in author_ids
+        self._author_ptr = array("q", [0])
+        self._author_idx = array("i")
+
+    @classmethod
+    def from_papers(cls, papers, top_n=TOP_N):
+        store = cls(top_n)
+        store.extend(papers)
+        return store
+
+    def __len__(self):
+        return len(self._citations)
+
+    def extend(self, papers):
+        for p in papers:
+            self.append(p.get("paperId"), p.get("title"), p.get("year"), p.get("citationCount"), p.get("authors"))
+
+    def append(self, paper_id, title, year, citations, authors=None, n_authors=None):
+        index = len(self._citations)
+        citations = citations or 0
+        self.paper_ids.append(paper_id)
+        self.titles.append(sys.intern(title) if title else "")
+        self._year.append(year or 0)
+        self._citations.append(citations)
+        self._n_authors.append(n_authors or len(authors or ()) or 1)
+        for author_id, name in author_refs(authors):
+            pos = self._author_pos.get(author_id)
+            if pos is None:
+                pos = self._author_pos[author_id] = len(self.author_ids)
+                self.author_ids.append(author_id)
+                self.author_labels.append(name)
+            self._author_idx.append(pos)
+        self._author_ptr.append(len(self._author_idx))
+        # Ties keep the earlier paper, like a stable sort by citations
+        key = (citations, -index)
+        if len(self._top) < self.top_n:
+            heapq.heappush(self._top, key)
+        elif key > self._top[0]:
+            _, dropped = heapq.heapreplace(self._top, key)
+            self._top_authors.pop(-dropped, None)
+        else:
+            return
+        self._top_authors[index] = author_names(authors)
+
+    def columns(self, start=0):
+        # Zero-copy NumPy views over the array buffers from paper `start` on
+        # (see metrics.paper_columns). Drop the views before appending more
+        # papers: an array cannot grow while a view is alive.
+        if start >= len(self):
+            return {"year": np.zeros(0, np.int32), "citations": np.zeros(0, np.int64),
+                    "n_authors": np.zeros(0, np.int32)}
+        return {
+            "year": np.frombuffer(self._year, dtype=np.int32)[start:],
+            "citations": np.frombuffer(self._citations, dtype=np.int64)[start:],
+            "n_authors": np.frombuffer(self._n_authors, dtype=np.int32)[start:],
+        }
+
+    def with_citations(self, citations, new_papers=()):
+        # Copy with citation counts from {paperId: count}. Papers missing from
+        # `citations` are dropped and `new_papers` (full records) appended;
+        # titles, years and author lists of the others are reused as they are.
+        store = PaperStore(self.top_n)
+        ptr, idx = self._author_ptr, self._author_idx
+        for i, paper_id in enumerate(self.paper_ids):
+            if paper_id in citations:
+                refs = [(self.author_ids[j], self.author_labels[j]) for j in idx[ptr[i]:ptr[i + 1]]]
+                store.append(paper_id, self.titles[i], self._year[i], citations[paper_id],
+                             refs or self._top_authors.get(i), n_authors=self._n_authors[i])
+        store.extend(new_papers)
+        return store
+
+    def author_columns(self):
+        # Zero-copy {"ptr", "idx"} views of the co-author lists (same caveat as columns())
+        return {"ptr": np.frombuffer(self._author_ptr, dtype=np.int64),
+                "idx": np.frombuffer(self._author_idx, dtype=np.int32) if self._author_idx else np.zeros(0, np.int32)}
+
+    def author_position(self, author_id):
+        return self._author_pos.get(str(author_id))
+
+    def paper(self, index):
+        return {
+            "paperId": self.paper_ids[index],
+            "title": self.titles[index],
+            "year": self._year[index] or None,
+            "citationCount": self._citations[index],
+            "nAuthors": self._n_authors[index],
+            "authors": self._top_authors.get(index),
+        }
+
+    def top_papers(self, n=TOP_N):
+        # Most cited first; author names are included for the kept top_n
+        return [self.paper(-neg_index) for _, neg_index in sorted(self._top, reverse=True)[:n]]
+
+    def nbytes(self):
+        # Rough in-memory size of the store, for diagnostics
+        size = sum(a.itemsize * len(a) for a in (self._year, self._citations, self._n_authors,
+                                                  self._author_ptr, self._author_idx))
+        size += sys.getsizeof(self._author_pos) + sum(sys.getsizeof(a) for a in self.author_ids)
+        size += sys.getsizeof(self.paper_ids) + sys.getsizeof(self.titles)
+        size += sum(sys.getsizeof(t) for t in set(self.titles))
+        size += sum(sys.getsizeof(names) + sum(sys.getsizeof(a) for a in names) for names in self._top_authors.values())
+        return size
+
+    # Serialization (used by the on-disk PaperCache)
+
+    def to_dict(self):
+        return {
+            "paperId": self.paper_ids,
+            "title": self.titles,
+            "year": self._year.tolist(),
+            "citationCount": self._citations.tolist(),
+            "nAuthors": self._n_authors.tolist(),
+            "topN": self.top_n,
+            "topAuthors": {str(i): names for i, names in self._top_authors.items()},
+            "authorIds": self.author_ids,
+            "authorNames": self.author_labels,
+            "authorPtr": self._author_ptr.tolist(),
+            "authorIdx": self._author_idx.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        top_authors = {int(i): names for i, names in data.get("topAuthors", {}).items()}
+        store = cls(data.get("topN", TOP_N))
+        for i, (pid, title, year, cites, n) in enumerate(zip(data["paperId"], data["title"], data["year"],
+                                                             data["citationCount"], data["nAuthors"])):
+            store.append(pid, title, year, cites, top_authors.get(i), n_authors=n)
+        # Entries cached before co-authors were kept have no author lists
+        if "authorPtr" in data:
+            store.author_ids = data["authorIds"]
+            store.author_labels = [sys.intern(name) for name in data["authorNames"]]
+            store._author_pos = {aid: i for i, aid in enumerate(store.author_ids)}
+            store._author_ptr = array("q", data["authorPtr"])
+            store._author_idx = array("i", data["authorIdx"])
+        return store
@@ -0,0 +1,156 @@
+import hashlib
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.style
+from matplotlib.figure import Figure
+
+import telemetry
+from result_cache import ResultCache
+
+# The comparison figures, rendered straight to bytes (PNG, or SVG / PDF as
+# vector output) from explicit Figure objects: no pyplot state, no files
+# to read back. generate_pdf.py embeds them from memory and main.py writes
+# them to output/. Renders are cached by a hash of the data they plot,
+# in memory and in FIGURE_CACHE_DIR, so an unchanged cohort is never
+# re-rendered; render_figures() renders the misses in parallel processes.
+
+FIGURE_CACHE_DIR = os.environ.get("FIGURE_CACHE_DIR", os.path.join("output", "figure_cache"))   # "" disables
+FIGURE_DPI = 300      # the files main.py writes
+REPORT_DPI = 150      # figures embedded in PDF reports (6 x 4 inch)
+FIGURE_VERSION = 1    # bump when the figure code changes, so cached renders are not reused
+TOP_N = 30            # bars / labelled points per figure for large cohorts
+FIGURE_COLUMNS = ["Name", "h-index", "Freshness-Weighted h", "CLS (Consistency Score)"]
+
+# seaborn's "whitegrid" theme (deep palette, notebook font sizes) without importing seaborn
+THEME = ["seaborn-v0_8-whitegrid", {
+    "font.size": 12, "axes.labelsize": 12, "axes.titlesize": 12, "xtick.labelsize": 11, "ytick.labelsize": 11,
+    "legend.fontsize": 11, "legend.title_fontsize": 12, "legend.frameon": True, "axes.linewidth": 1.25,
+    "grid.linewidth": 1, "patch.edgecolor": "w", "patch.force_edgecolor": True,
+    "axes.prop_cycle": matplotlib.cycler(color=["#4c72b0", "#dd8452", "#55a868", "#c44e52", "#8172b3",
+                                                "#937860", "#da8bc3", "#8c8c8c", "#ccb974", "#64b5cd"]),
+}]
+
+_memory = ResultCache(max_entries=64, ttl=24 * 3600, max_bytes=64 * 2 ** 20, sizeof=len)
+
+
+# FIGURES (each takes a results DataFrame, returns a Figure)
+
+def freshness_vs_h_figure(df):
+    fig = Figure(figsize=(12, 8))
+    ax = fig.add_subplot()
+    top_n = df.sort_values("h-index", ascending=False).head(TOP_N)
+    ax.barh(top_n["Name"], top_n["h-index"], label="Classic h-index", alpha=0.8)
+    ax.barh(top_n["Name"], top_n["Freshness-Weighted h"], label="Freshness-Weighted h", alpha=0.7)
+    ax.set_xlabel("Index Value")
+    ax.set_title("Classic vs Freshness-Weighted h-index (2025)")
+    ax.legend()
+    fig.tight_layout()
+    return fig
+
+
+def consistency_figure(df):
+    fig = Figure(figsize=(10, 6))
+    ax = fig.add_subplot()
+    ax.scatter(df["h-index"], df["CLS (Consistency Score)"], s=100)
+    labelled = df.nlargest(TOP_N, "h-index")
+    for h, cls, name in zip(labelled["h-index"], labelled["CLS (Consistency Score)"], labelled["Name"]):
+        ax.text(h + 1, cls, name, fontsize=9)
+    ax.set_xlabel("h-index")
+    ax.set_ylabel("Consistency & Longevity Score")
+    ax.set_title("Do High h-index Authors Stay Consistent?")
+    return fig
+
+
+FIGURES = {
+    "freshness_vs_h_index": freshness_vs_h_figure,
+    "consistency_analysis": consistency_figure,
+}
+
+
+# RENDERING AND CACHING
+
+def render(kind, df, fmt="png", dpi=FIGURE_DPI):
+    # Uncached: build figure `kind` and return its bytes
+    with matplotlib.style.context(THEME):
+        fig = FIGURES[kind](df)
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format=fmt, dpi=dpi)
+    return buffer.getvalue()
+
+
+def figure_key(kind, df, fmt="png", dpi=FIGURE_DPI):
+    data = df[FIGURE_COLUMNS].to_json(orient="split", index=False)
+    return hashlib.sha1(f"{FIGURE_VERSION}|{kind}|{fmt}|{dpi}|{data}".encode()).hexdigest()
+
+
+def _disk_path(key, fmt):
+    return os.path.join(FIGURE_CACHE_DIR, f"{key}.{fmt}") if FIGURE_CACHE_DIR else None
+
+
+def _cached(key, fmt):
+    data = _memory.get(key)
+    path = _disk_path(key, fmt)
+    if data is None and path and os.path.exists(path):
+        with open(path, "rb") as f:
+            data = f.read()
+        _memory.put(key, data)
+    telemetry.count("figure_cache_hits" if data is not None else "figure_cache_misses")
+    return data
+
+
+def _store(key, fmt, data):
+    _memory.put(key, data)
+    path = _disk_path(key, fmt)
+    if path:
+        os.makedirs(FIGURE_CACHE_DIR, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+
+def _render_job(job):
+    kind, df, fmt, dpi = job
+    return render(kind, df, fmt, dpi)
+
+
+def render_figures(df, kinds=tuple(FIGURES), fmt="png", dpi=FIGURE_DPI, executor=None):
+    """{kind: bytes} for `df`, from the cache where possible.
+
+    Misses are rendered in parallel: on `executor` (a process pool) when
+    given, else in a pool of their own when there are several and more than
+    one CPU.
+    """
+    keys = {kind: figure_key(kind, df, fmt, dpi) for kind in kinds}
+    figures = {kind: _cached(key, fmt) for kind, key in keys.items()}
+    todo = [kind for kind, data in figures.items() if data is None]
+    jobs = [(kind, df[FIGURE_COLUMNS], fmt, dpi) for kind in todo]
+    if not jobs:
+        return figures
+    with telemetry.span("figure_render"):
+        if executor is not None:
+            rendered = list(executor.map(_render_job, jobs))
+        elif len(jobs) > 1 and (os.cpu_count() or 1) > 1:
+            with ProcessPoolExecutor(max_workers=min(len(jobs), os.cpu_count())) as pool:
+                rendered = list(pool.map(_render_job, jobs))
+        else:
+            rendered = [_render_job(job) for job in jobs]
+    for kind, data in zip(todo, rendered):
+        _store(keys[kind], fmt, data)
+        figures[kind] = data
+    return figures
+
+
+def write_figures(df, out_dir, fmt="png", dpi=FIGURE_DPI):
+    # Every figure as <out_dir>/<kind>.<fmt>; returns the paths
+    paths = []
+    for kind, data in render_figures(df, fmt=fmt, dpi=dpi).items():
+        path = os.path.join(out_dir, f"{kind}.{fmt}")
+        with open(path, "wb") as f:
+            f.write(data)
+        paths.append(path)
+    return paths
@@ -0,0 +1,69 @@
+import os
+import threading
+import time
+
+# Defaults roughly match the old fixed 0.6 s sleep between pages
+DEFAULT_RATE = float(os.environ.get("S2_RATE_LIMIT", 1.6))    # requests per second
+DEFAULT_BURST = int(os.environ.get("S2_RATE_BURST", 3))
+
+
+# GLOBAL TOKEN-BUCKET RATE LIMITER (thread-safe)
+
+class TokenBucket:
+    def __init__(self, rate=DEFAULT_RATE, capacity=DEFAULT_BURST):
+        if rate <= 0 or capacity < 1:
+            raise ValueError("rate must be > 0 and capacity >= 1")
+        self.rate = float(rate)
+        self.max_rate = float(rate)
+        self.min_rate = float(rate) / 16
+        self.capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self._slowed_at = 0.0
+        self.waited = 0.0
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens=1):
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def acquire(self, tokens=1):
+        # Reserve the tokens immediately (the balance may go negative) and sleep
+        # off the debt outside the lock, so waiting callers are served in order.
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= tokens
+            delay = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            self.waited += delay
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    # ADAPTIVE RATE (AIMD): halve on a 429, creep back up on successes
+
+    def throttled(self):
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            # 429s for requests already in flight at the last cut count once
+            if now - self._slowed_at >= 1 / self.rate:
+                self.rate = max(self.min_rate, self.rate / 2)
+                self._slowed_at = now
+            self._tokens = min(self._tokens, 0.0)
+        return self.rate
+
+    def succeeded(self):
+        if self.rate < self.max_rate:
+            with self._lock:
+                self._refill(time.monotonic())
+                self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+        return self.rate
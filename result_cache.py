@@ -0,0 +1,136 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+RESULT_CACHE_SIZE = int(os.environ.get("RESULT_CACHE_SIZE", 128))
+RESULT_CACHE_TTL = int(os.environ.get("RESULT_CACHE_TTL", 3600))
+
+_RETRY = object()    # handed to waiting callers when the leader was interrupted
+
+
+# PROCESS-WIDE LRU/TTL CACHE WITH SINGLE-FLIGHT DEDUPLICATION
+
+class ResultCache:
+    """Bounded in-memory cache shared by every session of one server process.
+
+    Entries expire after `ttl` seconds and the least recently used entries are
+    evicted beyond `max_entries`, or beyond `max_bytes` as measured by
+    `sizeof(value)` when those are given. get_or_compute() is single-flight:
+    while a key is being computed, other callers for the same key wait for that
+    computation instead of starting their own.
+    """
+
+    def __init__(self, max_entries=RESULT_CACHE_SIZE, ttl=RESULT_CACHE_TTL, max_bytes=None, sizeof=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.nbytes = 0
+        self._entries = OrderedDict()    # key -> (expires_at, value, size)
+        self._inflight = {}              # key -> Future
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "shared": 0, "evictions": 0}
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def _lookup(self, key):
+        # Caller holds the lock
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        if entry[0] < time.time():
+            self._remove(key)
+            return False, None
+        self._entries.move_to_end(key)
+        return True, entry[1]
+
+    def _remove(self, key):
+        # Caller holds the lock
+        _, _, size = self._entries.pop(key)
+        self.nbytes -= size
+
+    def get(self, key, default=None):
+        with self._lock:
+            found, value = self._lookup(key)
+            self._stats["hits" if found else "misses"] += 1
+            return value if found else default
+
+    def put(self, key, value, ttl=None):
+        size = self.sizeof(value) if self.sizeof else 0
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.time() + (self.ttl if ttl is None else ttl), value, size)
+            self.nbytes += size
+            while len(self._entries) > self.max_entries or (
+                    self.max_bytes is not None and self.nbytes > self.max_bytes and len(self._entries) > 1):
+                self._remove(next(iter(self._entries)))
+                self._stats["evictions"] += 1
+
+    def invalidate(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def get_or_compute(self, key, compute, cache_if=None, wait_callback=None):
+        # `cache_if(value)` decides whether a fresh value is stored (default:
+        # always). `wait_callback()` is called once if this caller has to wait
+        # for another caller's in-flight computation of the same key.
+        with self._lock:
+            found, value = self._lookup(key)
+            if found:
+                self._stats["hits"] += 1
+                return value
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+                self._stats["misses"] += 1
+            else:
+                self._stats["shared"] += 1
+
+        if not leader:
+            if wait_callback:
+                wait_callback()
+            value = future.result()
+            if value is _RETRY:
+                return self.get_or_compute(key, compute, cache_if, wait_callback)
+            return value
+
+        try:
+            value = compute()
+        except Exception as exc:
+            self._finish(key, future, exc=exc)
+            raise
+        except BaseException:
+            # Not an error of the computation but control flow of the leader's
+            # own thread (KeyboardInterrupt, a Streamlit rerun or stop of its
+            # session): waiting callers must not receive it, one of them
+            # becomes the new leader instead
+            self._finish(key, future, value=_RETRY)
+            raise
+        if cache_if is None or cache_if(value):
+            self.put(key, value)
+        self._finish(key, future, value=value)
+        return value
+
+    def _finish(self, key, future, value=None, exc=None):
+        # Drop the in-flight entry before waking the waiters, so a retrying
+        # waiter starts a new computation instead of finding this one
+        with self._lock:
+            self._inflight.pop(key, None)
+        if exc is not None:
+            future.set_exception(exc)
+        else:
+            future.set_result(value)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats, entries=len(self._entries), inflight=len(self._inflight), nbytes=self.nbytes)
+        lookups = stats["hits"] + stats["misses"] + stats["shared"]
+        stats["hit_rate"] = round((stats["hits"] + stats["shared"]) / lookups, 3) if lookups else 0.0
+        return stats
@@ -0,0 +1,106 @@
+import functools
+import os
+from datetime import datetime
+
+# Columnar results store: one Parquet dataset, partitioned by run
+# (output/results/run=<run id>/part-00000.parquet, ...). Every evaluation run
+# adds a partition, large runs append several part files to theirs, and
+# readers load only the columns and runs they ask for. pyarrow is imported on
+# first use, so result_row() and runs() cost nothing to import.
+
+RESULTS_STORE_PATH = os.environ.get("RESULTS_STORE_PATH", os.path.join("output", "results"))
+
+
+@functools.cache
+def schema():
+    import pyarrow as pa
+    return pa.schema([
+        ("Author ID", pa.string()),
+        ("Name", pa.string()),
+        ("Papers", pa.int64()),
+        ("Total Citations", pa.int64()),
+        ("h-index", pa.int64()),
+        ("Freshness-Weighted h", pa.int64()),
+        ("CRI (Collab-Resilient)", pa.int64()),
+        ("CLS (Consistency Score)", pa.float64()),
+    ])
+
+
+@functools.cache
+def partitioning():
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    return ds.partitioning(pa.schema([("run", pa.string())]), flavor="hive")
+
+
+def result_row(author_id, name, m):
+    # One results row from a compute_metrics() dict
+    return {
+        "Author ID": str(author_id),
+        "Name": name,
+        "Papers": m["papers"],
+        "Total Citations": m["total_citations"],
+        "h-index": m["h_index"],
+        "Freshness-Weighted h": m["freshness_h"],
+        "CRI (Collab-Resilient)": m["cri"],
+        "CLS (Consistency Score)": m["cls"],
+    }
+
+
+def new_run_id():
+    return datetime.now().strftime("%Y%m%dT%H%M%S%f")
+
+
+def runs(path=RESULTS_STORE_PATH):
+    # Run ids in chronological order
+    if not os.path.isdir(path):
+        return []
+    return sorted(d.split("=", 1)[1] for d in os.listdir(path) if d.startswith("run="))
+
+
+def append(rows, run_id=None, path=RESULTS_STORE_PATH):
+    """Write `rows` (result_row dicts) as a new part file of `run_id` (default: a new run); returns the run id."""
+    run_id = run_id or new_run_id()
+    run_dir = os.path.join(path, f"run={run_id}")
+    os.makedirs(run_dir, exist_ok=True)
+    part = sum(1 for f in os.listdir(run_dir) if f.endswith(".parquet"))
+    target = os.path.join(run_dir, f"part-{part:05d}.parquet")
+    # Dot-prefixed temp name: dataset discovery skips it until the rename
+    tmp = os.path.join(run_dir, f".part-{part:05d}.{os.getpid()}.tmp")
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    pq.write_table(pa.Table.from_pylist(list(rows), schema=schema()), tmp)
+    os.replace(tmp, target)
+    return run_id
+
+
+def read(columns=None, run="latest", path=RESULTS_STORE_PATH):
+    """Results as a DataFrame: only `columns` (default all), for one run id,
+    "latest", or None for every run (with a "run" column)."""
+    import pyarrow.dataset as ds
+    if run == "latest":
+        all_runs = runs(path)
+        if not all_runs:
+            empty = schema().empty_table()
+            return (empty if columns is None else empty.select(columns)).to_pandas()
+        run = all_runs[-1]
+    if run is None:
+        dataset = ds.dataset(path, format="parquet", partitioning=partitioning())
+    else:
+        # One run: open its partition directly instead of listing every run
+        dataset = ds.dataset(os.path.join(path, f"run={run}"), format="parquet", schema=schema())
+    return dataset.to_table(columns=columns).to_pandas()
+
+
+def read_any(source, columns=None):
+    # A results store directory (latest run) or a legacy results CSV; CSV
+    # files simply lack the columns they never had (e.g. "Author ID")
+    if os.path.isdir(source):
+        df = read(columns, path=source)
+    else:
+        import pandas as pd
+        df = pd.read_csv(source, usecols=None if columns is None else lambda c: c in columns)
+    if "Author ID" in df and "Name" in df:
+        # Runs evaluated from dataset dumps have IDs but no names
+        df["Name"] = df["Name"].fillna(df["Author ID"])
+    return df
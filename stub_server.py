@@ -0,0 +1,293 @@
+import argparse
+import gzip
+import json
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, parse_qsl, urlparse
+
+import requests
+
+from rate_limit import TokenBucket
+
+# Local stand-in for the Semantic Scholar Graph API, used to exercise the
+# fetch code offline. Authors and papers are synthetic but deterministic
+# (seeded from the author ID), so repeated runs see identical data.
+#
+#   python stub_server.py --port 8765 --rate 20
+#   S2_API_URL=http://127.0.0.1:8765/graph/v1 python main.py
+#
+# Fault injection: --faults 0.1 answers 10% of requests with a 500/502/503
+# (503s carry a Retry-After) or drops the connection without an answer.
+#
+# It can also record every response it sends (optionally proxying a real
+# API with --upstream) and replay a recording instead of synthetic data:
+#   python stub_server.py --upstream https://api.semanticscholar.org/graph/v1 --record api.jsonl.gz
+#   python stub_server.py --replay api.jsonl.gz
+
+
+# SYNTHETIC DATA
+
+def synthetic_papers(author_id, n_papers=None):
+    rng = random.Random(zlib.crc32(str(author_id).encode()))
+    n = n_papers if n_papers is not None else rng.randint(20, 600)
+    papers = []
+    for i in range(n):
+        n_authors = rng.choice([1, 2, 3, 4, 5, 6, 8, 12]) if rng.random() > 0.02 else rng.randint(500, 3000)
+        papers.append({
+            "paperId": f"{author_id}-{i}",
+            "title": f"Synthetic paper {i} by author {author_id}",
+            "year": rng.randint(1975, 2025) if rng.random() > 0.03 else None,
+            "citationCount": int(rng.paretovariate(1.2)) - 1 if rng.random() > 0.1 else 0,
+            "authors": [{"authorId": str(author_id), "name": f"Author {author_id}"}] +
+                       [{"authorId": f"co{rng.randint(0, 50000)}", "name": f"Coauthor {j}"} for j in range(n_authors - 1)],
+        })
+    return papers
+
+
+def select_fields(record, fields):
+    if not fields:
+        return record
+    wanted = {f.strip() for f in fields.split(",")} | {"paperId"}
+    return {k: v for k, v in record.items() if k in wanted}
+
+
+# RECORDED RESPONSES
+
+def request_key(method, path, body=None):
+    # Identifies a request independent of query parameter order and API prefix
+    url = urlparse(path)
+    route = url.path.rstrip("/").split("/graph/v1", 1)[-1]
+    return json.dumps([method, route, sorted(parse_qsl(url.query)), body], sort_keys=True)
+
+
+def load_recording(path):
+    # {request key: (status, body)} from a JSONL file written by save_recording()
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        entries = (json.loads(line) for line in f if line.strip())
+        return {e["key"]: (e["status"], e["body"]) for e in entries}
+
+
+def save_recording(recording, path):
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "wt", encoding="utf-8") as f:
+        for key, (status, body) in recording.items():
+            f.write(json.dumps({"key": key, "status": status, "body": body}) + "\n")
+
+
+# HTTP HANDLER
+
+FAULTS = (500, 502, 503, "drop")
+
+class StubHandler(BaseHTTPRequestHandler):
+    server_version = "S2Stub/1.0"
+
+    def log_message(self, fmt, *args):
+        if self.server.verbose:
+            super().log_message(fmt, *args)
+
+    def send_json(self, status, body, headers=None):
+        if self.server.recording is not None and status != 429:
+            with self.server.stats_lock:
+                self.server.recording[self.key] = (status, body)
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def rate_limited(self):
+        # Request bookkeeping: count it, simulate network latency, inject
+        # faults, apply the rate limit. True when the request was answered.
+        with self.server.stats_lock:
+            self.server.stats["requests"] += 1
+            fault = self.server.rng.choice(FAULTS) if self.server.rng.random() < self.server.faults else None
+            if fault is not None:
+                self.server.stats["faults"] += 1
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        if fault == "drop":
+            self.close_connection = True
+            return True
+        if fault is not None:
+            headers = {"Retry-After": str(self.server.retry_after)} if fault == 503 else None
+            self.send_json(fault, {"message": "Injected fault"}, headers)
+            return True
+        if self.server.bucket is not None and not self.server.bucket.try_acquire():
+            with self.server.stats_lock:
+                self.server.stats["throttled"] += 1
+            self.send_json(429, {"message": "Too Many Requests"}, {"Retry-After": str(self.server.retry_after)})
+            return True
+        return False
+
+    def recorded(self, body=None):
+        # Answers from the replay recording or the upstream API; False when
+        # the synthetic data should answer instead
+        if self.server.replay is not None:
+            status, payload = self.server.replay.get(self.key, (404, {"error": "Not recorded"}))
+        elif self.server.upstream:
+            route = urlparse(self.path)
+            url = self.server.upstream + route.path.split("/graph/v1", 1)[-1]
+            r = requests.request(self.command, url, params=parse_qsl(route.query), json=body, timeout=60)
+            status, payload = r.status_code, r.json()
+        else:
+            return False
+        self.send_json(status, payload)
+        return True
+
+    def do_GET(self):
+        self.key = request_key("GET", self.path)
+        if self.rate_limited() or self.recorded():
+            return
+        url = urlparse(self.path)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        parts = url.path.rstrip("/").split("/")
+        # /graph/v1/author/search, /graph/v1/author/{id}, /graph/v1/author/{id}/papers
+        if parts[-2:] == ["author", "search"]:
+            q = query.get("query", "")
+            matches = [{"authorId": aid, "name": name} for aid, name in self.server.names.items()
+                       if q.lower() in name.lower()]
+            return self.send_json(200, {"total": len(matches), "data": matches[: int(query.get("limit", 100))]})
+        if len(parts) >= 2 and parts[-2] == "author":
+            aid = parts[-1]
+            return self.send_json(200, {"authorId": aid, "name": self.server.names.get(aid, f"Author {aid}")})
+        if len(parts) >= 3 and parts[-1] == "papers" and parts[-3] == "author":
+            aid = parts[-2]
+            papers = self.server.papers_for(aid)
+            if papers is None:
+                return self.send_json(404, {"error": "Author not found"})
+            offset = int(query.get("offset", 0))
+            limit = min(int(query.get("limit", 100)), 1000)
+            page = [select_fields(p, query.get("fields")) for p in papers[offset:offset + limit]]
+            body = {"offset": offset, "data": page}
+            if offset + limit < len(papers):
+                body["next"] = offset + limit
+            return self.send_json(200, body)
+        self.send_json(404, {"error": "Not found"})
+
+    def do_POST(self):
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        except ValueError:
+            body = None
+        self.key = request_key("POST", self.path, body)
+        if self.rate_limited() or self.recorded(body):
+            return
+        if not isinstance(body, dict):
+            return self.send_json(400, {"error": "Invalid JSON body"})
+        url = urlparse(self.path)
+        fields = {k: v[-1] for k, v in parse_qs(url.query).items()}.get("fields", "")
+        ids = body.get("ids", [])
+        # /graph/v1/author/batch, /graph/v1/paper/batch
+        if url.path.endswith("/author/batch"):
+            if len(ids) > 1000:
+                return self.send_json(400, {"error": "Too many ids"})
+            return self.send_json(200, [self.server.author_record(str(i), fields) for i in ids])
+        if url.path.endswith("/paper/batch"):
+            if len(ids) > 500:
+                return self.send_json(400, {"error": "Too many ids"})
+            return self.send_json(200, [self.server.paper_record(str(i), fields) for i in ids])
+        self.send_json(404, {"error": "Not found"})
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, rate=None, burst=5, names=None, paper_counts=None, latency=0.0, verbose=False,
+                 citation_bump=0, replay=None, upstream=None, record=False, faults=0.0, retry_after=1, seed=0):
+        super().__init__(address, StubHandler)
+        self.latency = latency
+        self.faults = faults
+        self.retry_after = retry_after
+        self.rng = random.Random(seed)
+        # replay: {request key: (status, body)}; record: keep every response sent
+        self.replay = replay
+        self.upstream = upstream.rstrip("/") if upstream else None
+        self.recording = {} if record else None
+        self.citation_bump = citation_bump
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.names = dict(names or {})
+        self.paper_counts = dict(paper_counts or {})
+        self.verbose = verbose
+        self.stats = {"requests": 0, "throttled": 0, "faults": 0}
+        self.stats_lock = threading.Lock()
+        self._papers = {}
+
+    def papers_for(self, author_id):
+        if not str(author_id).isdigit():
+            return None
+        if author_id not in self._papers:
+            papers = synthetic_papers(author_id, self.paper_counts.get(author_id))
+            for p in papers:
+                # Simulates citations gained since an earlier fetch
+                p["citationCount"] += self.citation_bump
+            self._papers[author_id] = papers
+        return self._papers[author_id]
+
+    def author_record(self, author_id, fields):
+        papers = self.papers_for(author_id)
+        if papers is None:
+            return None
+        record = {"authorId": author_id, "name": self.names.get(author_id, f"Author {author_id}"),
+                  "paperCount": len(papers)}
+        wanted = [f.strip() for f in fields.split(",") if f.strip()]
+        sub = [f.split(".", 1)[1] for f in wanted if f.startswith("papers.")]
+        if sub or "papers" in wanted:
+            record["papers"] = [select_fields(p, ",".join(sub) or "title") for p in papers]
+        return {k: v for k, v in record.items() if k in wanted or k in ("authorId", "papers")}
+
+    def paper_record(self, paper_id, fields):
+        author_id, _, index = paper_id.rpartition("-")
+        papers = self.papers_for(author_id)
+        if papers is None or not index.isdigit() or int(index) >= len(papers):
+            return None
+        return select_fields(papers[int(index)], fields)
+
+    @property
+    def api_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/graph/v1"
+
+
+def start_stub_server(port=0, **kwargs):
+    server = StubServer(("127.0.0.1", port), **kwargs)
+    threading.Thread(target=server.serve_forever, name="s2-stub", daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stub of the Semantic Scholar Graph API")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--rate", type=float, default=None, help="requests/s before answering 429")
+    parser.add_argument("--burst", type=int, default=5)
+    parser.add_argument("--retry-after", type=float, default=1, help="Retry-After seconds sent with 429 and 503 answers")
+    parser.add_argument("--faults", type=float, default=0.0, help="fraction of requests answered with 5xx or dropped")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--papers", nargs="*", default=[], metavar="ID=N",
+                        help="fixed paper counts for specific author IDs")
+    parser.add_argument("--citation-bump", type=int, default=0, help="citations added to every paper")
+    parser.add_argument("--replay", metavar="FILE", help="answer from a recording instead of synthetic data")
+    parser.add_argument("--upstream", metavar="URL", help="proxy requests to this API base URL")
+    parser.add_argument("--record", metavar="FILE", help="save every response sent to FILE on exit (Ctrl+C)")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+    paper_counts = {aid: int(n) for aid, n in (item.split("=", 1) for item in args.papers)}
+    server = StubServer(("127.0.0.1", args.port), rate=args.rate, burst=args.burst, latency=args.latency,
+                        paper_counts=paper_counts, verbose=args.verbose, citation_bump=args.citation_bump,
+                        replay=load_recording(args.replay) if args.replay else None, upstream=args.upstream,
+                        record=bool(args.record), faults=args.faults, retry_after=args.retry_after)
+    print(f"Stub Semantic Scholar API on {server.api_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if args.record:
+            save_recording(server.recording, args.record)
+            print(f"Recorded {len(server.recording)} responses to {args.record}")
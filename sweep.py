@@ -0,0 +1,132 @@
+import argparse
+import os
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from bulk_fetch import PAPER_FIELDS
+from metrics import (COLLAB_PENALTY, FRESHNESS_DECAY, MIN_YEAR, collaboration_weights, freshness_weights,
+                     h_index_rows)
+from paper_cache import PaperCache
+
+# Parameter sweep for the Freshness-h decay and the CRI collaboration penalty.
+# Runs entirely on already-fetched papers from the local paper cache: every
+# grid value is one row of a 2-D (parameters x papers) array, so a whole grid
+# costs a few array operations per author instead of one Python loop per setting.
+#
+#   python sweep.py --decay 0:0.5:1001 --penalty 0:0.25:1001
+
+SWEEP_DIR = os.path.join("output", "sweep")
+MAX_CELLS = 4_000_000   # parameters x papers evaluated per chunk (bounds memory)
+
+
+def parse_grid(spec, baseline):
+    # "start:stop:count" -> linspace, always including the exact baseline value.
+    # A grid value that only differs from it by rounding (0.15000000000000002)
+    # is replaced by it, not kept next to it as a near-duplicate row.
+    start, stop, count = spec.split(":")
+    grid = np.linspace(float(start), float(stop), int(count))
+    if np.isclose(grid, baseline).any():
+        grid[np.argmin(np.abs(grid - baseline))] = baseline
+        return grid
+    return np.union1d(grid, [baseline])
+
+
+# BATCHED METRICS OVER A PARAMETER GRID
+
+def _sweep(values, weights_for, params):
+    out = np.empty(len(params), dtype=np.int64)
+    step = max(1, MAX_CELLS // max(values.size, 1))
+    for i in range(0, len(params), step):
+        chunk = params[i:i + step, None]
+        out[i:i + step] = h_index_rows(values[None, :] * weights_for(chunk))
+    return out
+
+
+def sweep_freshness(cols, decays, current_year=None):
+    current_year = current_year or datetime.now().year
+    dated = cols["year"] >= MIN_YEAR
+    year = cols["year"][dated]
+    return _sweep(cols["citations"][dated], lambda d: freshness_weights(year, current_year, d), decays)
+
+
+def sweep_cri(cols, penalties):
+    n_authors = cols["n_authors"]
+    return _sweep(cols["citations"], lambda p: collaboration_weights(n_authors, p), penalties)
+
+
+def run_sweep(stores, decays, penalties):
+    """Return (freshness, cri) DataFrames: one row per parameter value, one column per author."""
+    fresh, cri = {}, {}
+    for aid, store in stores.items():
+        cols = store.columns()
+        fresh[aid] = sweep_freshness(cols, decays)
+        cri[aid] = sweep_cri(cols, penalties)
+        del cols
+    return (pd.DataFrame(fresh, index=pd.Index(decays, name="decay")),
+            pd.DataFrame(cri, index=pd.Index(penalties, name="penalty")))
+
+
+# RANK STABILITY AND SENSITIVITY
+
+def rank_stability(table, baseline, top_k=10):
+    """Per parameter value: Spearman correlation and top-k overlap with the baseline ranking."""
+    ranks = table.rank(axis=1, ascending=False).to_numpy()
+    base = ranks[table.index.get_loc(baseline)]
+    centered = ranks - ranks.mean(axis=1, keepdims=True)
+    base_c = base - base.mean()
+    denom = np.sqrt((centered ** 2).sum(axis=1) * (base_c ** 2).sum())
+    spearman = np.divide(centered @ base_c, denom, out=np.ones(len(ranks)), where=denom > 0)
+    k = min(top_k, table.shape[1])
+    overlap = ((ranks <= k) & (base <= k)).sum(axis=1) / max(k, 1)
+    return pd.DataFrame({"spearman_vs_baseline": spearman.round(4), f"top{k}_overlap": overlap.round(3),
+                         "mean_value": table.mean(axis=1).round(2)}, index=table.index)
+
+
+def sensitivity(table, baseline):
+    """Per author: value at the baseline, range over the grid and local slope at the baseline."""
+    params = table.index.to_numpy()
+    i = table.index.get_loc(baseline)
+    slope = np.gradient(table.to_numpy(dtype=np.float64), params, axis=0)[i] if len(params) > 1 else 0.0
+    return pd.DataFrame({"baseline": table.iloc[i], "min": table.min(), "max": table.max(),
+                         "range": table.max() - table.min(), "slope_at_baseline": np.round(slope, 2)})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sweep the Freshness-h decay and CRI penalty over cached papers")
+    parser.add_argument("--authors", nargs="*", help="author IDs (default: every author in the paper cache)")
+    parser.add_argument("--decay", default="0:0.5:1001", help="start:stop:count grid for the freshness decay")
+    parser.add_argument("--penalty", default="0:0.25:1001", help="start:stop:count grid for the CRI penalty")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--out", default=SWEEP_DIR)
+    args = parser.parse_args()
+
+    cache = PaperCache()
+    author_ids = args.authors or cache.author_ids(PAPER_FIELDS)
+    stores = {}
+    for aid in author_ids:
+        cached = cache.get(aid, PAPER_FIELDS)
+        if cached is None:
+            print(f"   {aid}: not in the paper cache, skipped (run main.py first)")
+        else:
+            stores[aid] = cached[0]
+    if not stores:
+        raise SystemExit("No cached authors to sweep.")
+
+    decays = parse_grid(args.decay, FRESHNESS_DECAY)
+    penalties = parse_grid(args.penalty, COLLAB_PENALTY)
+    start = time.perf_counter()
+    fresh, cri = run_sweep(stores, decays, penalties)
+    elapsed = time.perf_counter() - start
+    print(f"{len(stores)} authors x ({len(decays)} decays + {len(penalties)} penalties) in {elapsed:.2f} s")
+
+    os.makedirs(args.out, exist_ok=True)
+    fresh.to_csv(os.path.join(args.out, "freshness_grid.csv"))
+    cri.to_csv(os.path.join(args.out, "cri_grid.csv"))
+    rank_stability(fresh, FRESHNESS_DECAY, args.top_k).to_csv(os.path.join(args.out, "freshness_rank_stability.csv"))
+    rank_stability(cri, COLLAB_PENALTY, args.top_k).to_csv(os.path.join(args.out, "cri_rank_stability.csv"))
+    sensitivity(fresh, FRESHNESS_DECAY).to_csv(os.path.join(args.out, "freshness_sensitivity.csv"), index_label="author_id")
+    sensitivity(cri, COLLAB_PENALTY).to_csv(os.path.join(args.out, "cri_sensitivity.csv"), index_label="author_id")
+    print(f"Sweep tables saved in '{args.out}/'")
@@ -0,0 +1,183 @@
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Timing spans and counters for the hot paths (search, paper fetching,
+# metrics, PDF building), kept in two places:
+#   - process-wide totals, exported in the Prometheus text format
+#     (prometheus_text(), or scraped from serve_metrics() on TELEMETRY_PORT)
+#   - the current trace, i.e. one analysis or one evaluated author, which is
+#     appended to TELEMETRY_LOG as a JSON line when it ends
+#
+#   with telemetry.trace("analysis", author_id=aid) as t:
+#       with telemetry.span("fetch"):
+#           ...
+#       telemetry.count("http_requests")
+
+TELEMETRY_LOG = os.environ.get("TELEMETRY_LOG", os.path.join("output", "telemetry.jsonl"))   # "" disables
+TELEMETRY_PORT = int(os.environ.get("TELEMETRY_PORT", 0)) or None
+PREFIX = "levelling_up"
+
+_current = contextvars.ContextVar("telemetry_trace", default=None)
+_lock = threading.Lock()
+_counters = {}
+_spans = {}     # name -> [count, total seconds, max seconds]
+
+
+class Trace:
+    """Spans and counters recorded while this trace is current."""
+
+    def __init__(self, name, **labels):
+        self.name = name
+        self.labels = labels
+        self.started = datetime.now(timezone.utc)
+        self.seconds = None
+        self.spans = []         # (name, start offset in s, seconds)
+        self.counters = {}
+        self._t0 = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                "trace": self.name,
+                **self.labels,
+                "started": self.started.isoformat(timespec="milliseconds"),
+                "seconds": self.seconds,
+                "spans": [{"name": n, "start": s, "seconds": d} for n, s, d in self.spans],
+                "counters": dict(self.counters),
+            }
+
+
+def count(name, n=1):
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+    t = _current.get()
+    if t is not None:
+        with t._lock:
+            t.counters[name] = t.counters.get(name, 0) + n
+
+
+@contextmanager
+def span(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        with _lock:
+            total = _spans.setdefault(name, [0, 0.0, 0.0])
+            total[0] += 1
+            total[1] += seconds
+            total[2] = max(total[2], seconds)
+        t = _current.get()
+        if t is not None:
+            with t._lock:
+                t.spans.append((name, round(start - t._t0, 6), round(seconds, 6)))
+
+
+@contextmanager
+def trace(name, log=TELEMETRY_LOG, **labels):
+    """Make a new Trace current for the duration of the block (itself timed as span `name`)."""
+    t = Trace(name, **labels)
+    token = _current.set(t)
+    try:
+        with span(name):
+            yield t
+    finally:
+        _current.reset(token)
+        t.seconds = round(time.perf_counter() - t._t0, 6)
+        if log:
+            write_jsonl(log, t.to_dict())
+
+
+def wrap(fn):
+    # Carry the caller's trace into a worker thread (thread pools do not
+    # copy context variables); safe to run on several threads at once
+    t = _current.get()
+
+    def run(*args, **kwargs):
+        token = _current.set(t)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _current.reset(token)
+    return run
+
+
+def write_jsonl(path, record):
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    line = json.dumps(record, default=str) + "\n"
+    with _lock, open(path, "a", encoding="utf-8") as f:
+        f.write(line)
+
+
+# PROCESS-WIDE TOTALS
+
+def snapshot():
+    with _lock:
+        return {"counters": dict(_counters),
+                "spans": {name: {"count": n, "seconds": total, "max": mx} for name, (n, total, mx) in _spans.items()}}
+
+
+def prometheus_text():
+    totals = snapshot()
+    lines = []
+    for name, value in sorted(totals["counters"].items()):
+        metric = f"{PREFIX}_{name}_total"
+        lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+    if totals["spans"]:
+        metric = f"{PREFIX}_span_seconds"
+        lines += [f"# HELP {metric} Time spent in each instrumented stage", f"# TYPE {metric} summary"]
+        for name, s in sorted(totals["spans"].items()):
+            lines += [f'{metric}_count{{span="{name}"}} {s["count"]}',
+                      f'{metric}_sum{{span="{name}"}} {s["seconds"]:.6f}']
+        lines.append(f"# TYPE {metric}_max gauge")
+        lines += [f'{metric}_max{{span="{name}"}} {s["max"]:.6f}' for name, s in sorted(totals["spans"].items())]
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path):
+    # Atomic, for a node-exporter style textfile collector
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(prometheus_text())
+    os.replace(tmp, path)
+
+
+def summary():
+    # Per-stage totals as printable lines, slowest first
+    spans = snapshot()["spans"]
+    return [f"{name:<16} {s['count']:>6} x {s['seconds'] / s['count'] * 1000:>9.1f} ms"
+            f"  (total {s['seconds']:.2f} s, max {s['max'] * 1000:.1f} ms)"
+            for name, s in sorted(spans.items(), key=lambda item: -item[1]["seconds"])]
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        payload = prometheus_text().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, fmt, *args):
+        pass
+
+
+def serve_metrics(port=TELEMETRY_PORT, host="127.0.0.1"):
+    """Serve prometheus_text() at http://host:port/metrics from a daemon thread."""
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="telemetry-metrics", daemon=True).start()
+    return server
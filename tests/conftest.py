@@ -0,0 +1,18 @@
+import pytest
+
+from stub_server import start_stub_server
+
+
+@pytest.fixture
+def stub():
+    # stub(**StubServer options) -> a started stub_server, shut down after the test
+    servers = []
+
+    def start(**kwargs):
+        servers.append(start_stub_server(**kwargs))
+        return servers[-1]
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
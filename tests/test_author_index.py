@@ -0,0 +1,36 @@
+from author_index import AuthorNameIndex, normalize
+
+
+def test_suggest_ranks_full_name_matches_first(tmp_path):
+    index = AuthorNameIndex(str(tmp_path / "names.tsv"))
+    index.add_many([("1", "Yoshua Bengio"), ("2", "Samy Bengio"), ("3", "Ben Shneiderman"),
+                    ("4", "Yann LeCun"), ("5", "Benjamin Recht")])
+
+    assert [m["name"] for m in index.suggest("ben")] == ["Ben Shneiderman", "Benjamin Recht",
+                                                         "Samy Bengio", "Yoshua Bengio"]
+    assert index.suggest("ben", limit=1) == [{"authorId": "3", "name": "Ben Shneiderman"}]
+    assert [m["authorId"] for m in index.suggest("yann le")] == ["4"]
+    assert index.suggest("  ") == [] and index.suggest("zz") == []
+
+
+def test_accents_case_and_punctuation_are_ignored(tmp_path):
+    index = AuthorNameIndex(str(tmp_path / "names.tsv"))
+    index.add("7", "José  Müller-Lüdenscheidt")
+
+    assert normalize("José  Müller-Lüdenscheidt") == "jose muller ludenscheidt"
+    assert index.suggest("MULLER")[0]["name"] == "José Müller-Lüdenscheidt"
+    assert index.exact("jose muller ludenscheidt") == [{"authorId": "7", "name": "José Müller-Lüdenscheidt"}]
+    assert index.exact("jose muller") == []
+
+
+def test_renames_replace_and_other_processes_are_picked_up(tmp_path):
+    path = str(tmp_path / "names.tsv")
+    writer, reader = AuthorNameIndex(path), AuthorNameIndex(path)
+    writer.add("1", "Geoff Hinton")
+    assert [m["authorId"] for m in reader.suggest("geoff")] == ["1"]
+
+    writer.add("1", "Geoffrey E. Hinton")
+    writer.add_many([(str(i), f"Author {i}") for i in range(2, 40)])
+    assert len(reader) == 39
+    assert reader.suggest("geoffrey")[0]["name"] == "Geoffrey E. Hinton"
+    assert reader.exact("geoff hinton") == []
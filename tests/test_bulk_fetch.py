@@ -0,0 +1,33 @@
+from bulk_fetch import BulkFetcher
+from http_client import ApiClient
+from metrics import compute_metrics
+from paper_store import PaperStore, slim_paper
+
+
+def test_failing_batch_chunk_is_bisected(stub):
+    # The stub rejects paper batches over 500 ids, so one 600-id chunk fails
+    # and must be split in two instead of losing every paper
+    server = stub(paper_counts={"42": 600})
+    fetcher = BulkFetcher(server.api_url, client=ApiClient(retries=0))
+    ids = [f"42-{i}" for i in range(600)]
+
+    records, missing, failed = fetcher.post_batch("paper", ids + ["42-9999"], "title,year", batch_size=1000)
+
+    assert list(records) == ids
+    assert missing == ["42-9999"] and failed == []
+    assert fetcher.requests == 3
+
+
+def test_fetch_cohort_matches_paging(stub):
+    server = stub(paper_counts={"1001": 1200, "1002": 7, "1003": 0})
+    fetcher = BulkFetcher(server.api_url, client=ApiClient(retries=0))
+
+    result = fetcher.fetch_cohort(["1001", "1002", "1003", "not-an-id"])
+
+    assert result["missing"] == ["not-an-id"] and result["failed"] == []
+    for aid in ("1001", "1002"):
+        paged = PaperStore.from_papers(slim_paper(p) for page in fetcher.iter_pages(aid) for p in page)
+        assert result["authors"][aid]["papers"].paper_ids == paged.paper_ids
+        assert compute_metrics(result["authors"][aid]["papers"]) == compute_metrics(paged)
+    # One author batch, then 1207 papers in three paper batches
+    assert result["requests"] == 4
@@ -0,0 +1,71 @@
+import os
+from multiprocessing import Process
+
+import numpy as np
+
+import cohort_index
+from cohort_index import INDEX_METRICS, CohortIndex
+
+
+def metrics(values):
+    return dict(zip(INDEX_METRICS, values))
+
+
+def expected_percentile(values, value):
+    values = np.asarray(values)
+    return 100.0 * ((values < value).sum() + (values <= value).sum()) / (2 * len(values))
+
+
+def test_percentiles_match_brute_force_with_pending_rows(tmp_path, monkeypatch):
+    # Small COMPACT_ROWS: lookups see merged files, pending rows and authors
+    # whose merged row was replaced by a pending one
+    monkeypatch.setattr(cohort_index, "COMPACT_ROWS", 40)
+    rng = np.random.default_rng(0)
+    index, truth = CohortIndex(str(tmp_path / "cohort")), {}
+    for step in range(300):
+        aid = str(rng.integers(0, 150))
+        truth[aid] = rng.integers(0, 50, len(INDEX_METRICS)).astype(float)
+        index.add(aid, metrics(truth[aid]))
+        if step % 23 == 0:
+            assert len(index) == len(truth)
+            for value in (0.0, 12.0, 24.5, 49.0):
+                cri = [v[INDEX_METRICS.index("cri")] for v in truth.values()]
+                assert index.percentile("cri", value) == expected_percentile(cri, value)
+
+
+def test_small_cohort_has_no_percentiles(tmp_path):
+    index = CohortIndex(str(tmp_path / "cohort"))
+    assert len(index) == 0 and index.percentile("h_index", 3) is None
+    index.add_many({str(i): metrics([i] * 4) for i in range(5)})
+    assert index.percentiles(metrics([2] * 4), min_size=10) == {}
+    assert index.percentiles(metrics([2] * 4), min_size=5)["h_index"] == 50.0
+
+
+def test_index_without_key_files_still_replaces_rows(tmp_path):
+    path = str(tmp_path / "cohort")
+    index = CohortIndex(path)
+    index.add_many({str(i): metrics([i] * 4) for i in range(cohort_index.COMPACT_ROWS)})
+    for name in ("keys", "key_rows"):
+        os.remove(os.path.join(path, f"{name}.npy"))
+    index.add("0", metrics([10 ** 6] * 4))
+
+    fresh = CohortIndex(path)
+    assert len(fresh) == cohort_index.COMPACT_ROWS
+    assert fresh.percentile("cls", 10 ** 6) == 100.0 * (2 * cohort_index.COMPACT_ROWS - 1) / (2 * len(fresh))
+
+
+def add_authors(path, worker):
+    index = CohortIndex(path)
+    for i in range(150):
+        index.add(f"{worker}-{i}", metrics([i] * 4))
+
+
+def test_concurrent_writer_processes_keep_every_row(tmp_path):
+    path = str(tmp_path / "cohort")
+    workers = [Process(target=add_authors, args=(path, w)) for w in range(4)]
+    for p in workers:
+        p.start()
+    for p in workers:
+        p.join()
+
+    assert len(CohortIndex(path)) == 600
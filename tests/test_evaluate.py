@@ -0,0 +1,24 @@
+import levelling_up
+from bulk_fetch import BulkFetcher
+from http_client import ApiClient
+from paper_cache import PaperCache
+
+# levelling_up.evaluate_authors against stub_server.py (tests/conftest.py): no
+# network, no API key. Run with `python -m pytest`.
+
+
+def test_evaluate_authors_keeps_input_order(stub, tmp_path, monkeypatch):
+    # The first author has by far the most pages, so it finishes last
+    counts = {"1001": 900, "1002": 3, "1003": 40, "1004": 1, "1005": 250, "1006": 12}
+    server = stub(latency=0.01, paper_counts=counts)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(levelling_up, "FETCH_MODE", "paged")
+    monkeypatch.setattr(levelling_up, "get_fetcher", lambda: BulkFetcher(server.api_url, client=ApiClient()))
+    cache = PaperCache(str(tmp_path / "papers.sqlite3"))
+    monkeypatch.setattr(levelling_up, "get_paper_cache", lambda: cache)
+
+    authors = {aid: f"Author {aid}" for aid in counts}
+    results = levelling_up.evaluate_authors(authors, workers=4, source="api")
+
+    assert [r["Author ID"] for r in results] == list(counts)
+    assert [r["Papers"] for r in results] == list(counts.values())
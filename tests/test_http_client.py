@@ -0,0 +1,61 @@
+import time
+
+import pytest
+
+from bulk_fetch import BulkFetcher, FetchError
+from http_client import ApiClient, retry_after
+
+
+def test_429_honours_retry_after(stub):
+    # One token per 0.2 s: an immediate second request is throttled, and the
+    # 0.25 s Retry-After is long enough for the retry to get through
+    server = stub(rate=5, burst=1, retry_after=0.25)
+    delays = []
+
+    def sleep(seconds):
+        delays.append(seconds)
+        time.sleep(seconds)
+
+    client = ApiClient(sleep=sleep)
+    url = f"{server.api_url}/author/7"
+
+    assert client.request("GET", url).status_code == 200
+    r = client.request("GET", url)
+
+    assert r.status_code == 200
+    assert client.stats["throttled"] >= 1 and client.stats["retries"] >= 1
+    assert delays and all(d >= 0.25 for d in delays)
+
+
+def test_persistent_faults_are_bounded_and_raise(stub):
+    server = stub(faults=1.0)
+    client = ApiClient(retries=2, sleep=lambda d: None)
+
+    assert client.request("GET", f"{server.api_url}/author/7") is None
+    assert server.stats["requests"] == 3
+
+    fetcher = BulkFetcher(server.api_url, client=client, window=1)
+    with pytest.raises(FetchError):
+        list(fetcher.iter_pages("7"))
+    assert server.stats["requests"] == 6
+
+
+def test_client_errors_are_not_retried(stub):
+    server = stub()
+    client = ApiClient(sleep=lambda d: None)
+
+    assert client.request("GET", f"{server.api_url}/nothing-here").status_code == 404
+    assert server.stats["requests"] == 1 and client.stats["retries"] == 0
+
+
+class Response:
+    def __init__(self, value):
+        self.headers = {"Retry-After": value} if value is not None else {}
+
+
+def test_retry_after_parsing():
+    assert retry_after(Response("3")) == 3.0
+    assert retry_after(Response("-1")) == 0.0
+    assert 55 < retry_after(Response(time.strftime("%a, %d %b %Y %H:%M:%S GMT", time.gmtime(time.time() + 60)))) <= 60
+    assert retry_after(Response("soon")) is None
+    assert retry_after(Response(None)) is None and retry_after(None) is None
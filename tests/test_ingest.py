@@ -0,0 +1,35 @@
+import os
+
+from ingest import LocalIndex, build_index, read_dump
+from metrics import compute_metrics
+
+FIXTURE_DUMP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                            "fixtures", "synthetic_papers.jsonl.gz")
+
+
+def test_ingest_round_trip_matches_compute_metrics(tmp_path):
+    index_dir = str(tmp_path / "local_index")
+    meta = build_index([FIXTURE_DUMP], index_dir, partitions=4, batch=500, verbose=False)
+    index = LocalIndex(index_dir)
+
+    by_author = {}
+    for record in read_dump([FIXTURE_DUMP]):
+        paper = {"year": record.get("year"), "citationCount": record.get("citationcount"),
+                 "authors": record.get("authors")}
+        for author in record.get("authors") or []:
+            by_author.setdefault(author["authorId"], []).append(paper)
+
+    assert len(index) == len(by_author) == meta["authors"]
+    for aid in sorted(by_author)[:50]:
+        assert compute_metrics(index.columns(aid)) == compute_metrics(by_author[aid])
+    assert index.columns("999999999") is None
+    assert set(index.author_ids()) == set(by_author)
+
+
+def test_rebuild_replaces_the_index(tmp_path):
+    index_dir = str(tmp_path / "local_index")
+    build_index([FIXTURE_DUMP], index_dir, verbose=False)
+    meta = build_index([FIXTURE_DUMP], index_dir, partitions=2, verbose=False)
+
+    assert LocalIndex(index_dir).meta["partitions"] == 2 == meta["partitions"]
+    assert sorted(os.listdir(tmp_path)) == ["local_index"]
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from benchmarks.bench_metrics import legacy_h_index, legacy_metrics, synthetic_author
+from metrics import IncrementalHIndex, MetricsAccumulator, compute_metrics, h_index, trajectory
+
+
+@pytest.mark.parametrize("n_papers", [0, 1, 5, 100, 3000])
+@pytest.mark.parametrize("seed", range(3))
+def test_vectorized_engine_matches_the_loops(n_papers, seed):
+    papers = synthetic_author(n_papers, seed)
+    assert compute_metrics(papers) == legacy_metrics(papers)
+
+
+def test_h_index():
+    assert h_index([]) == 0
+    assert h_index([0, 0]) == 0
+    assert h_index([10, 8, 5, 4, 3]) == 4
+    assert h_index([1.9, 1.9, 0.5]) == 1      # weighted values count by their floor
+    assert h_index([100] * 3) == 3
+    values = [c for c in range(50) for _ in range(c % 7)]
+    assert h_index(values) == legacy_h_index(values)
+
+
+def test_incremental_h_index_matches_h_index():
+    rng = np.random.default_rng(1)
+    for _ in range(20):
+        values = rng.pareto(1.2, rng.integers(0, 400)) * 10
+        incremental, seen = IncrementalHIndex(), 0
+        while seen < values.size:
+            batch = values[seen:seen + int(rng.integers(1, 50))]
+            seen += batch.size
+            assert incremental.add(batch) == h_index(values[:seen])
+
+
+def test_accumulator_snapshot_matches_compute_metrics():
+    papers = synthetic_author(1000, seed=4)
+    accumulator = MetricsAccumulator(current_year=2024)
+    for i in range(0, len(papers), 100):
+        accumulator.update(papers[i:i + 100])
+        assert accumulator.snapshot() == compute_metrics(papers[:i + 100], current_year=2024)
+
+
+def test_trajectory_matches_compute_metrics_as_of_each_year():
+    papers = [p for p in synthetic_author(400, seed=5) if p["year"] and p["year"] <= 2024]
+    traj = trajectory(papers + [{"year": None, "citationCount": 50, "authors": []}], current_year=2024)
+
+    assert traj["year"][0] == min(p["year"] for p in papers) and traj["year"][-1] == 2024
+    for i, year in enumerate(traj["year"]):
+        expected = compute_metrics([p for p in papers if p["year"] <= year], current_year=int(year))
+        assert {k: traj[k][i] for k in expected} == expected
+
+
+def test_trajectory_without_dated_papers():
+    traj = trajectory([{"year": None, "citationCount": 3}], current_year=2024)
+    assert traj["year"].tolist() == [2024] and traj["h_index"].tolist() == [0]
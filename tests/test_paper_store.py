@@ -0,0 +1,26 @@
+from metrics import compute_metrics
+from paper_store import PaperStore
+
+
+def paper(pid, year, citations, *authors):
+    return {"paperId": pid, "title": f"Paper {pid}", "year": year, "citationCount": citations,
+            "authors": [{"authorId": a, "name": f"Author {a}"} for a in authors]}
+
+
+def test_with_citations_refreshes_counts_and_keeps_the_rest():
+    store = PaperStore.from_papers([paper("p1", 2001, 10, "1", "2"), paper("p2", 2005, 3, "1"),
+                                    paper("p3", None, 7, "1", "3")], top_n=2)
+
+    refreshed = store.with_citations({"p1": 12, "p3": 9}, new_papers=[paper("p4", 2020, 1, "1", "4")])
+
+    assert refreshed.paper_ids == ["p1", "p3", "p4"]
+    assert refreshed.titles == ["Paper p1", "Paper p3", "Paper p4"]
+    assert [refreshed.paper(i)["year"] for i in range(3)] == [2001, None, 2020]
+    assert refreshed.columns()["citations"].tolist() == [12, 9, 1]
+    assert refreshed.columns()["n_authors"].tolist() == [2, 2, 2]
+    assert sorted(refreshed.author_ids) == ["1", "2", "3", "4"]
+    assert [p["paperId"] for p in refreshed.top_papers()] == ["p1", "p3"]
+    assert compute_metrics(refreshed, current_year=2024) == compute_metrics(
+        [paper("p1", 2001, 12, "1", "2"), paper("p3", None, 9, "1", "3"), paper("p4", 2020, 1, "1", "4")],
+        current_year=2024)
+    assert store.columns()["citations"].tolist() == [10, 3, 7]    # the original is untouched
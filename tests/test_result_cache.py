@@ -0,0 +1,89 @@
+import threading
+import time
+
+import pytest
+
+from result_cache import ResultCache
+
+
+def run_concurrently(cache, compute, callers=4):
+    # get_or_compute("k") from `callers` threads at once: {caller: value or exception}
+    results, threads = {}, []
+
+    def call(i):
+        try:
+            results[i] = cache.get_or_compute("k", compute)
+        except BaseException as exc:
+            results[i] = exc
+
+    for i in range(callers):
+        threads.append(threading.Thread(target=call, args=(i,)))
+        threads[-1].start()
+    for t in threads:
+        t.join()
+    return results
+
+
+def test_single_flight_computes_once():
+    cache, calls = ResultCache(), []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.1)
+        return "value"
+
+    results = run_concurrently(cache, compute)
+
+    assert list(results.values()) == ["value"] * 4
+    assert len(calls) == 1
+    assert cache.stats()["shared"] == 3
+    assert cache.get_or_compute("k", lambda: "other") == "value"
+
+
+def test_errors_reach_every_waiter_and_are_not_cached():
+    cache = ResultCache()
+
+    def compute():
+        time.sleep(0.1)
+        raise ValueError("fetch failed")
+
+    results = run_concurrently(cache, compute)
+
+    assert all(isinstance(r, ValueError) for r in results.values())
+    assert len(cache) == 0 and cache.stats()["inflight"] == 0
+    assert cache.get_or_compute("k", lambda: "retried") == "retried"
+
+
+def test_interrupted_leader_hands_over_to_a_waiter():
+    # A BaseException (e.g. a Streamlit rerun of the leader's session) belongs
+    # to the leader's thread only: the waiter computes the value itself
+    class Rerun(BaseException):
+        pass
+
+    cache, started = ResultCache(), threading.Event()
+
+    def interrupted():
+        started.set()
+        time.sleep(0.1)
+        raise Rerun()
+
+    leader = threading.Thread(target=lambda: pytest.raises(Rerun, cache.get_or_compute, "k", interrupted))
+    leader.start()
+    started.wait()
+    assert cache.get_or_compute("k", lambda: "fresh") == "fresh"
+    leader.join()
+    assert cache.get("k") == "fresh"
+
+
+def test_cache_if_and_lru_bounds():
+    cache = ResultCache(max_entries=2, max_bytes=10, sizeof=len)
+    assert cache.get_or_compute("partial", lambda: "x", cache_if=lambda v: False) == "x"
+    assert cache.get("partial") is None
+
+    cache.put("a", "1234")
+    cache.put("b", "1234")
+    cache.get("a")                 # "b" is now least recently used
+    cache.put("c", "1234")
+    assert cache.get("b") is None and cache.get("a") == "1234" and cache.nbytes == 8
+    cache.put("d", "123456789")    # over max_bytes: evicts until it fits
+    assert cache.get("a") is None and cache.get("c") is None and cache.get("d") == "123456789"
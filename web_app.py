@@ -1,14 +1,25 @@
 import streamlit as st
-import requests
-import time
 from datetime import datetime
-from collections import defaultdict
 import io
-from reportlab.lib.pagesizes import A4
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib.units import mm
+import os
+import json
+import hashlib
+import html
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+import pandas as pd
+from paper_cache import PaperCache
+from bulk_fetch import API_URL, PAPER_FIELDS, BulkFetcher, FetchError
+from http_client import shared_client
+from metrics import MetricsAccumulator, compute_metrics, trajectory
+from paper_store import PaperStore
+from result_cache import ResultCache
+from cohort_index import CohortIndex
+from author_index import AuthorNameIndex
+from coauthors import collaboration_profile
+import results_store
+import telemetry
 
 # CONFIG
 st.set_page_config(
@@ -127,6 +138,13 @@ section[data-testid="stSidebar"] {
     color: #4f46e5;
 }
 
+.metric-note {
+    color: #6b7280;
+    font-size: 15px;
+    font-weight: 500;
+    margin-top: 6px;
+}
+
 .researcher-name {
     font-size: 48px;
     font-weight: 900;
@@ -138,59 +156,384 @@ section[data-testid="stSidebar"] {
 """, unsafe_allow_html=True)
 
 #  HELPER FUNCTIONS 
+PDF_CACHE_BYTES = int(os.environ.get("PDF_CACHE_MB", 64)) * 1024 * 1024
+COMPARE_WORKERS = int(os.environ.get("COMPARE_WORKERS", 4))
+MAX_COMPARE = 12
+
+@st.cache_resource
+def get_paper_cache():
+    # One SQLite-backed cache per server process, shared with main.py on disk
+    return PaperCache()
+
+@st.cache_resource
+def get_result_cache():
+    # Process-wide: every session shares finished analyses and in-flight fetches
+    return ResultCache()
+
+@st.cache_resource
+def get_pdf_cache():
+    # Finished PDFs, bounded by total size in bytes
+    return ResultCache(max_entries=256, max_bytes=PDF_CACHE_BYTES, sizeof=len)
+
+@st.cache_resource
+def get_cohort_index():
+    # Memory-mapped on first lookup, so it adds nothing to app start-up
+    return CohortIndex()
+
+@st.cache_resource
+def get_author_index():
+    # Names for type-ahead and local lookups; picks up names other processes add
+    return AuthorNameIndex()
+
+@st.cache_resource
+def get_metrics_server():
+    # Prometheus scrape endpoint, only when TELEMETRY_PORT is set
+    return telemetry.serve_metrics() if telemetry.TELEMETRY_PORT else None
+
+@st.cache_data(max_entries=4)
+def load_run(run_id, columns):
+    # Runs never change once written, so the run id is the whole cache key
+    return results_store.read(list(columns), run=run_id)
+
 def safe_get_json(r):
     try: return r.json()
     except: return {}
 
-def h_index(cits):
-    c = sorted([x for x in cits if x > 0], reverse=True)
-    for i in range(1, len(c) + 1):
-        if i > c[i-1]:
-            return i - 1
-    return len(c)
-
-def freshness_h(papers_list):
-    current = datetime.now().year
-    weighted = []
-    for p in papers_list:
-        y = p.get("year")
-        c = p.get("citationCount", 0) or 0
-        if y and isinstance(y, int) and y >= 1950:
-            age = current - y
-            weighted.append(c / (1 + 0.15 * age))
-    return h_index(weighted)
-
-def cri(papers_list):
-    adjusted = []
-    for p in papers_list:
-        c = p.get("citationCount", 0) or 0
-        n_authors = len(p.get("authors", []) or [])
-        n = max(n_authors, 1)
-        adjusted.append(c * (1 / (1 + 0.05 * (n - 1))))
-    return h_index(adjusted)
-
-def cls(papers_list):
-    yearly = defaultdict(int)
-    for p in papers_list:
-        y = p.get("year")
-        if y and 1950 <= y <= datetime.now().year:
-            yearly[y] += p.get("citationCount", 0) or 0
-    years = sorted(yearly.keys())
-    if len(years) < 5: return 0
-    cites_per_year = [yearly[y] for y in years]
-    avg = sum(cites_per_year) / len(cites_per_year)
-    if avg == 0: return 0
-    cv = (sum((x - avg)**2 for x in cites_per_year) / len(cites_per_year))**0.5 / avg
-    base = avg / (1 + cv)
-    longevity_bonus = max(0, (len(years) - 5) * 2)
-    return round(base + longevity_bonus, 1)
+def search_authors(query):
+    def search():
+        with telemetry.span("search"):
+            r = shared_client().request("GET", f"{API_URL}/author/search", params={"query":query,"limit":10}, timeout=15)
+        if r is None:
+            raise FetchError("author search failed")
+        r.raise_for_status()
+        data = safe_get_json(r).get("data", [])
+        get_author_index().add_many((d.get("authorId"), d.get("name")) for d in data)
+        return data
+    return get_result_cache().get_or_compute(("search", query.strip().lower()), search)
+
+def find_authors(query, remote=False):
+    # (matches, "local" | "api"): authors already known under exactly this name,
+    # else (or with `remote`) a Semantic Scholar search
+    if not remote:
+        local = get_author_index().exact(query)
+        if local:
+            return local, "local"
+    return search_authors(query), "api"
+
+def stream_papers(author_id, on_batch=None):
+    # One author-batch POST (name + paper IDs), then 500-paper batch POSTs.
+    # Metrics are updated after every batch; on_batch(name, metrics, done, total)
+    # lets the page redraw the cards while the rest is still downloading.
+    store, acc, name, complete = PaperStore(), MetricsAccumulator(), None, False
+    try:
+        for event in BulkFetcher().iter_author(author_id, PAPER_FIELDS):
+            name = event["name"]
+            start = len(store)
+            store.extend(event["papers"])
+            acc.update(store.columns(start))
+            complete = event["done"] == event["total"] and not event["failed"]
+            if on_batch:
+                on_batch(name, acc.snapshot(), event["done"], event["total"])
+    except FetchError:
+        # Retries exhausted: partial results are kept (and flagged incomplete),
+        # but having nothing at all is an error, not an empty profile
+        if name is None:
+            raise
+        complete = False
+    return store, name, acc, complete
+
+def fetch_papers(author_id, on_batch=None):
+    # Returns (papers, name, metrics, complete); name is None when the papers
+    # came from the cache. Incomplete fetches are returned but never cached.
+    fetched = {}
+
+    def fetch():
+        store, fetched["name"], acc, complete = stream_papers(author_id, on_batch)
+        fetched.update(store=store, metrics=acc.snapshot(), complete=complete)
+        return store if complete else None
+
+    def refresh():
+        # Runs on a background thread, so it must not touch Streamlit elements
+        store, _, _, complete = stream_papers(author_id)
+        return store if complete else None
+
+    def update(papers):
+        # Stale but recently fully fetched: new citation counts only
+        refreshed, _ = BulkFetcher().refresh_citations({str(author_id): papers}, PAPER_FIELDS)
+        return refreshed.get(str(author_id))
+
+    with telemetry.span("fetch"):
+        papers = get_paper_cache().get_or_fetch(author_id, PAPER_FIELDS, fetch, refresh=refresh, update=update)
+    if "store" in fetched:
+        return fetched["store"], fetched["name"], fetched["metrics"], fetched["complete"]
+    with telemetry.span("metrics"):
+        return papers, None, compute_metrics(papers), True
+
+def analyze(author_id, author_name=None, on_batch=None, on_wait=None):
+    # Cached, single-flight analysis keyed by author ID. Concurrent requests for
+    # the same author share one fetch; only the leading session sees live
+    # partial results, the others call on_wait() and block until it finishes.
+    def compute():
+        papers, fetched_name, m, complete = fetch_papers(author_id, on_batch)
+        name = author_name or fetched_name
+        if name is None:
+            try:
+                name = fetch_author_name(author_id)
+            except Exception:
+                pass
+        if complete and len(papers) > 0:
+            get_cohort_index().add(author_id, m)
+        if name and len(papers) > 0:
+            get_author_index().add(author_id, name)
+        with telemetry.span("trajectory"):
+            traj = trajectory(papers)
+        with telemetry.span("coauthors"):
+            collab = collaboration_profile(papers, author_id)
+        return {"papers": papers, "name": name, "metrics": m, "complete": complete,
+                "trajectory": traj, "collaboration": collab}
+
+    return get_result_cache().get_or_compute(("author", str(author_id)), compute,
+                                             cache_if=lambda r: r["complete"] and len(r["papers"]) > 0,
+                                             wait_callback=on_wait)
+
+TRAJECTORY_SERIES = {"h_index": ("Classic h-index", "#6366f1"), "freshness_h": ("Freshness-Weighted h", "#a855f7"),
+                     "cri": ("CRI (Collab-Resilient)", "#f59e0b")}
+
+def trajectory_frame(traj):
+    return pd.DataFrame({label: traj[k] for k, (label, _) in TRAJECTORY_SERIES.items()},
+                        index=pd.Index(traj["year"], name="Year"))
+
+def trajectory_drawing(traj, width=480, height=220):
+    from reportlab.lib import colors
+    from reportlab.graphics.shapes import Drawing, String
+    from reportlab.graphics.charts.lineplots import LinePlot
+    from reportlab.graphics.charts.legends import LineLegend
+
+    drawing = Drawing(width, height)
+    plot = LinePlot()
+    plot.x, plot.y, plot.width, plot.height = 40, 45, width - 60, height - 65
+    years = traj["year"].tolist()
+    plot.data = [list(zip(years, traj[k].tolist())) for k in TRAJECTORY_SERIES]
+    for i, (_, color) in enumerate(TRAJECTORY_SERIES.values()):
+        plot.lines[i].strokeColor = colors.HexColor(color)
+        plot.lines[i].strokeWidth = 1.5
+    plot.xValueAxis.valueMin, plot.xValueAxis.valueMax = years[0], years[-1]
+    plot.yValueAxis.valueMin = 0
+    drawing.add(plot)
+    legend = LineLegend()
+    legend.x, legend.y = 40, 12
+    legend.columnMaximum = 1
+    legend.colorNamePairs = [(colors.HexColor(color), label) for label, color in TRAJECTORY_SERIES.values()]
+    drawing.add(legend)
+    drawing.add(String(width / 2, height - 10, "Metrics as of each year (papers published up to that year)",
+                       textAnchor="middle", fontSize=9))
+    return drawing
+
+def build_pdf_report(author_name, metrics, top_papers, traj=None):
+    # ReportLab is imported on the first download, not on every script run
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+    from reportlab.lib import colors
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.lib.units import mm
+
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4, topMargin=30*mm, leftMargin=20*mm, rightMargin=20*mm)
+    styles = getSampleStyleSheet()
+    story = []
+
+    story.append(Paragraph("Levelling Up Academia – Research Impact Report", styles["Title"]))
+    story.append(Spacer(1, 12))
+    story.append(Paragraph(f"<b>Researcher:</b> {author_name}", styles["Heading2"]))
+    story.append(Paragraph(f"<b>Generated on:</b> {datetime.now().strftime('%B %d, %Y at %I:%M %p')}", styles["Normal"]))
+    story.append(Spacer(1, 20))
+
+    table_data = [["Metric", "Value"]] + [[k, str(v)] for k, v in metrics.items()]
+    table = Table(table_data, colWidths=[360, 140])
+    table.setStyle(TableStyle([
+        ('BACKGROUND', (0,0), (-1,0), colors.HexColor("#c084fc")),
+        ('TEXTCOLOR', (0,0), (-1,0), colors.white),
+        ('GRID', (0,0), (-1,-1), 0.8, colors.HexColor("#e9d5ff")),
+        ('BACKGROUND', (0,1), (-1,-1), colors.HexColor("#faf5ff")),
+        ('ALIGN', (1,1), (-1,-1), 'CENTER'),
+        ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0,0), (-1,-1), 12),
+    ]))
+    story.append(table)
+    story.append(Spacer(1, 20))
+
+    if traj is not None and len(traj["year"]) > 1:
+        story.append(Paragraph("<b>Career Trajectory</b>", styles["Heading3"]))
+        story.append(trajectory_drawing(traj))
+        story.append(Spacer(1, 20))
+
+    if top_papers:
+        story.append(Paragraph("<b>Top 10 Most Cited Papers</b>", styles["Heading3"]))
+        story.append(Spacer(1, 8))
+        for idx, p in enumerate(top_papers, 1):
+            title = p["title"] or "Untitled"
+            year = p["year"] or "n/a"
+            cites = p["citationCount"]
+            authors = ", ".join(p["authors"][:6])
+            if p["nAuthors"] > 6:
+                authors += " et al."
+            story.append(Paragraph(f"{idx}. <b>{title}</b> ({year}) — <font color='#7c3aed'>{cites}</font> citations", styles["Normal"]))
+            story.append(Paragraph(f"    <i>{authors}</i>", styles["Normal"]))
+            story.append(Spacer(1, 6))
+
+    with telemetry.span("pdf_build"):
+        doc.build(story)
+    return buffer.getvalue()
+
+def metrics_fingerprint(author_name, metrics):
+    return hashlib.sha1(json.dumps([author_name, metrics], sort_keys=True, default=str).encode()).hexdigest()
+
+def pdf_report(author_id, author_name, metrics, papers, traj=None):
+    # Built only when the download button is clicked, then kept by
+    # (author ID, metrics fingerprint) so repeat downloads cost nothing
+    key = (str(author_id), metrics_fingerprint(author_name, metrics))
+    return get_pdf_cache().get_or_compute(key, lambda: build_pdf_report(author_name, metrics, papers.top_papers(10), traj))
+
+def display_metrics(m):
+    return {
+        "Total Papers": m["papers"],
+        "Total Citations": m["total_citations"],
+        "Classic h-index": m["h_index"],
+        "Freshness-Weighted h": m["freshness_h"],
+        "CRI (Collab-Resilient)": m["cri"],
+        "CLS Score": m["cls"],
+    }
+
+def ordinal(n):
+    # 1 -> "1st", 12 -> "12th", 22 -> "22nd"
+    suffix = "th" if n % 100 in (11, 12, 13) else {1: "st", 2: "nd", 3: "rd"}.get(n % 10, "th")
+    return f"{n}{suffix}"
+
+def display_percentiles(m):
+    # {card label: "Nth percentile of M researchers"} from the cohort index
+    index = get_cohort_index()
+    labels = {"h_index": "Classic h-index", "freshness_h": "Freshness-Weighted h",
+              "cri": "CRI (Collab-Resilient)", "cls": "CLS Score"}
+    size = len(index)
+    return {labels[k]: f"{ordinal(round(p))} percentile of {size:,} researchers" for k, p in index.percentiles(m).items()}
+
+def render_results(name_slot, cards_slot, author_name, metrics, notes=None):
+    name_slot.markdown(f"<h2 class='researcher-name'>{html.escape(str(author_name))}</h2>", unsafe_allow_html=True)
+    notes = notes or {}
+    with cards_slot.container():
+        cols = st.columns(3)
+        for i, (label, value) in enumerate(metrics.items()):
+            note = f'<div class="metric-note">{notes[label]}</div>' if label in notes else ""
+            with cols[i % 3]:
+                st.markdown(f"""
+                <div class="metric-card">
+                    <div class="metric-label">{label}</div>
+                    <div class="metric-value">{value}</div>
+                    {note}
+                </div>
+                """, unsafe_allow_html=True)
+
+def fetch_author_name(author_id):
+    found, _, _ = BulkFetcher().fetch_authors([author_id], "name")
+    return found.get(str(author_id), {}).get("name")
+
+def resolve_author(query):
+    # (author_id, name) for an ID or a name; a name takes the best search match
+    query = query.strip()
+    if query.isdigit():
+        return query, None
+    data, _ = find_authors(query)
+    if not data:
+        return None, None
+    return data[0]["authorId"], data[0]["name"]
+
+def compare_one(query):
+    author_id, name = resolve_author(query)
+    if author_id is None:
+        return None
+    result = analyze(author_id, name)
+    if not result["papers"]:
+        return None
+    return {"author_id": author_id, "name": result["name"] or name or author_id,
+            "metrics": result["metrics"], "complete": result["complete"]}
+
+def compare_authors(queries, on_result):
+    # Resolve and analyze every query in a bounded pool; on_result(query, row)
+    # runs on the script thread as each one finishes, in completion order
+    ctx = get_script_run_ctx()
+    rows = {}
+    with ThreadPoolExecutor(max_workers=COMPARE_WORKERS, initializer=add_script_run_ctx,
+                            initargs=(None, ctx)) as pool:
+        futures = {pool.submit(telemetry.wrap(compare_one), q): q for q in queries}
+        for future in as_completed(futures):
+            query = futures[future]
+            try:
+                rows[query] = future.result()
+            except Exception:
+                rows[query] = None
+            on_result(query, rows[query])
+    return [(q, rows[q]) for q in queries]
+
+def render_compare_card(slot, query, row):
+    if row is None:
+        slot.markdown(f"""
+        <div class="metric-card">
+            <div class="metric-label">{html.escape(query)}</div>
+            <div class="metric-note">Not found or could not be fetched</div>
+        </div>
+        """, unsafe_allow_html=True)
+        return
+    m = row["metrics"]
+    note = "" if row["complete"] else '<div class="metric-note">Some papers could not be fetched</div>'
+    slot.markdown(f"""
+    <div class="metric-card">
+        <div class="metric-label">{html.escape(str(row['name']))}</div>
+        <div class="metric-value">{m['h_index']}</div>
+        <div class="metric-note">h-index · Freshness-h {m['freshness_h']} · CRI {m['cri']} · CLS {m['cls']}</div>
+        <div class="metric-note">{m['papers']:,} papers · {m['total_citations']:,} citations</div>
+        {note}
+    </div>
+    """, unsafe_allow_html=True)
+
+def render_debug_panel(trace):
+    # Stage timings and counters of this session's last analysis, plus
+    # process-wide totals in the Prometheus text format
+    if trace is None:
+        st.caption("Run an analysis to see its timings.")
+        return
+    st.caption(f"Last {trace['trace']}: {trace['seconds']:.2f} s")
+    spans = pd.DataFrame(trace["spans"])
+    if len(spans):
+        by_stage = spans.groupby("name")["seconds"].agg(["count", "sum", "max"]).sort_values("sum", ascending=False)
+        st.dataframe((by_stage * [1, 1000, 1000]).rename(columns={"sum": "total ms", "max": "max ms"}).round(1))
+    if trace["counters"]:
+        st.dataframe(pd.Series(trace["counters"], name="count"))
+    with st.expander("Prometheus metrics"):
+        st.code(telemetry.prometheus_text(), language="text")
+
+def comparison_frame(rows):
+    found = [{"Researcher": row["name"], **display_metrics(row["metrics"])} for _, row in rows if row]
+    return pd.DataFrame(found).set_index("Researcher") if found else pd.DataFrame()
 
 #  HEADER 
+with st.sidebar:
+    cache_stats = get_paper_cache().stats()
+    st.caption(f"Paper cache: {cache_stats['entries']} authors, "
+               f"{cache_stats['hits'] + cache_stats['stale_hits']} hits / {cache_stats['misses']} misses")
+    result_stats = get_result_cache().stats()
+    st.caption(f"Result cache: {result_stats['entries']} entries, {result_stats['hits']} hits, "
+               f"{result_stats['shared']} shared in-flight")
+    st.caption(f"Cohort index: {len(get_cohort_index()):,} researchers")
+    get_metrics_server()
+    show_debug = st.toggle("Debug timings")
+    # Filled at the end of the script, once this run's analysis has finished
+    debug_panel = st.container()
+
 st.markdown('<h1 class="big-title">Levelling Up Academia</h1>', unsafe_allow_html=True)
 st.markdown('<p class="subtitle">A fairer, smarter way to measure research impact</p>', unsafe_allow_html=True)
 
 #  NAVIGATION 
-tabs = ["Home", "About", "How It Works", "Values", "Developer"]
+tabs = ["Home", "Compare", "About", "How It Works", "Values", "Developer"]
 if "page" not in st.session_state:
     st.session_state.page = "Home"
 
@@ -274,141 +617,177 @@ elif st.session_state.page == "Developer":
     </div>
     """, unsafe_allow_html=True)
 
+#  COMPARE 
+elif st.session_state.page == "Compare":
+    st.markdown('<div class="input-label">Researchers to Compare (names or IDs, one per line) :</div>', unsafe_allow_html=True)
+    text = st.text_area("", placeholder="Yoshua Bengio\nYann LeCun\n1741101", label_visibility="collapsed", height=160)
+
+    if st.button("Compare Researchers"):
+        queries = list(dict.fromkeys(q.strip() for q in re.split(r"[\n,;]", text) if q.strip()))
+        if len(queries) < 2:
+            st.warning("Please enter at least two names or IDs")
+        else:
+            if len(queries) > MAX_COMPARE:
+                st.info(f"Comparing the first {MAX_COMPARE} researchers.")
+                queries = queries[:MAX_COMPARE]
+            cols = st.columns(3)
+            slots = {q: cols[i % 3].empty() for i, q in enumerate(queries)}
+            for q, slot in slots.items():
+                slot.markdown(f'<div class="metric-card"><div class="metric-label">{html.escape(q)}</div>'
+                              f'<div class="metric-note">Fetching...</div></div>', unsafe_allow_html=True)
+            started = datetime.now()
+            with telemetry.trace("compare", researchers=len(queries)) as compare_trace:
+                st.session_state.comparison = compare_authors(queries, lambda q, row: render_compare_card(slots[q], q, row))
+            st.session_state.last_trace = compare_trace.to_dict()
+            st.caption(f"{len(queries)} researchers analyzed in {(datetime.now() - started).total_seconds():.1f} s")
+    elif st.session_state.get("comparison"):
+        # Keep the last comparison across reruns
+        cols = st.columns(3)
+        for i, (q, row) in enumerate(st.session_state.comparison):
+            render_compare_card(cols[i % 3].empty(), q, row)
+
+    rows = st.session_state.get("comparison") or []
+    table = comparison_frame(rows)
+    if len(table):
+        st.subheader("Comparison")
+        st.dataframe(table)
+        st.bar_chart(table[["Classic h-index", "Freshness-Weighted h", "CRI (Collab-Resilient)"]], stack=False)
+
+    run_ids = results_store.runs()
+    if run_ids:
+        with st.expander(f"Latest evaluation run ({run_ids[-1]})"):
+            board = load_run(run_ids[-1], ("Author ID", "Name", "Papers", "h-index", "Freshness-Weighted h",
+                                           "CRI (Collab-Resilient)", "CLS (Consistency Score)"))
+            st.caption(f"{len(board):,} researchers evaluated by main.py / ingest.py")
+            st.dataframe(board.sort_values("h-index", ascending=False).head(100), hide_index=True)
+
 #  HOME / ANALYZER 
 else:
     st.markdown('<div class="input-label">Enter Researcher Name or Semantic Scholar ID :</div>', unsafe_allow_html=True)
-    query = st.text_input("", placeholder="e.g. Yoshua Bengio or 1741105", label_visibility="collapsed")
-
-    if st.button("Analyze Researcher"):
-        if not query.strip():
+    query = st.text_input("", placeholder="e.g. Yoshua Bengio or 1741105", label_visibility="collapsed", key="query").strip()
+
+    # Names already seen (searched, analyzed, evaluated or ingested) are
+    # suggested straight from the local index, without an API call
+    suggestions = {} if query.isdigit() else {s["authorId"]: s["name"] for s in get_author_index().suggest(query)}
+    picked = None
+    if suggestions:
+        picked = st.pills("Known researchers", list(suggestions), format_func=lambda aid: f"{suggestions[aid]} ({aid})",
+                          key=f"suggest-{query}")
+
+    def clear_suggestion():
+        st.session_state.pop(f"suggest-{st.session_state.query.strip()}", None)
+
+    # The search survives reruns (choosing in the radio below reruns the
+    # script), so picking one of several matches goes straight to the fetch
+    search = st.session_state.get("search")
+    if search and search["query"] != query:
+        search = st.session_state.search = None
+    if st.button("Analyze Researcher", on_click=clear_suggestion):
+        if not query:
             st.warning("Please enter a name or ID")
+        elif query.isdigit():
+            # The name comes back with the paper fetch below
+            search = {"query": query, "results": [{"authorId": query, "name": None}], "source": "id"}
+        else:
+            try:
+                with st.spinner("Searching..."):
+                    results, source = find_authors(query)
+            except Exception:
+                st.error("Network error. Please try again.")
+                st.stop()
+            search = {"query": query, "results": results, "source": source}
+        st.session_state.search = search
+
+    author_id = None
+    author_name = "Unknown Researcher"
+    if picked:
+        author_id, author_name = picked, suggestions[picked]
+    elif search:
+        data = search["results"]
+        if search["source"] == "local" and st.button("Not the right researcher? Search Semantic Scholar"):
+            try:
+                st.session_state.search = dict(search, results=find_authors(query, remote=True)[0], source="api")
+            except Exception:
+                st.error("Network error. Please try again.")
+                st.stop()
+            st.rerun()
+        if not data:
+            st.error("Researcher not found!")
+        elif len(data) == 1:
+            author_id = data[0]["authorId"]
+            author_name = data[0]["name"] or author_name
         else:
-            with st.spinner("Searching & fetching papers..."):
-                author_id = None
-                author_name = "Unknown Researcher"
-                try:
-                    if query.strip().isdigit():
-                        author_id = query.strip()
-                        r = requests.get(f"https://api.semanticscholar.org/graph/v1/author/{author_id}", params={"fields":"name"}, timeout=15)
-                        author_name = safe_get_json(r).get("name", author_name)
-                    else:
-                        r = requests.get("https://api.semanticscholar.org/graph/v1/author/search", params={"query":query,"limit":10}, timeout=15)
-                        data = safe_get_json(r).get("data", [])
-                        if not data:
-                            st.error("Researcher not found!")
-                            st.stop()
-                        if len(data) == 1:
-                            author_id = data[0]["authorId"]
-                            author_name = data[0]["name"]
-                        else:
-                            choice = st.radio("Multiple researchers found. Please select:", 
-                                            [f"{d['name']} ({d['authorId']})" for d in data], 
-                                            index=0)
-                            author_id = choice.split("(")[-1].rstrip(")")
-                            author_name = next(d["name"] for d in data if d["authorId"] == author_id)
-                except Exception:
-                    st.error("Network error. Please try again.")
-                    st.stop()
-
-                # Fetch all papers
-                papers = []
-                offset = 0
-                limit = 100
-                progress_bar = st.progress(0)
-                status_text = st.empty()
-
-                try:
-                    while True:
-                        r = requests.get(f"https://api.semanticscholar.org/graph/v1/author/{author_id}/papers",
-                                        params={"fields":"title,year,citationCount,authors","limit":limit,"offset":offset}, 
-                                        timeout=20)
-                        batch = safe_get_json(r).get("data", [])
-                        if not batch: break
-                        papers.extend(batch)
-                        offset += limit
-                        progress_bar.progress(min(offset / 3000, 1.0))
-                        status_text.text(f"Fetched {len(papers)} papers...")
-                        time.sleep(0.1)
-                        if offset >= 5000: break
-                except:
-                    pass
-                finally:
-                    progress_bar.empty()
-                    status_text.empty()
-
-                if not papers:
-                    st.error("No publications found for this researcher.")
-                else:
-                    citations = [p.get("citationCount", 0) or 0 for p in papers]
-
-                    metrics = {
-                        "Total Papers": len(papers),
-                        "Total Citations": sum(citations),
-                        "Classic h-index": h_index(citations),
-                        "Freshness-Weighted h": freshness_h(papers),
-                        "CRI (Collab-Resilient)": cri(papers),
-                        "CLS Score": cls(papers),
-                    }
-
-                    st.markdown(f"<h2 class='researcher-name'>{author_name}</h2>", unsafe_allow_html=True)
-
-                    cols = st.columns(3)
-                    for i, (label, value) in enumerate(metrics.items()):
-                        with cols[i % 3]:
-                            st.markdown(f"""
-                            <div class="metric-card">
-                                <div class="metric-label">{label}</div>
-                                <div class="metric-value">{value}</div>
-                            </div>
-                            """, unsafe_allow_html=True)
-
-                    # PDF Report
-                    buffer = io.BytesIO()
-                    doc = SimpleDocTemplate(buffer, pagesize=A4, topMargin=30*mm, leftMargin=20*mm, rightMargin=20*mm)
-                    styles = getSampleStyleSheet()
-                    story = []
-
-                    story.append(Paragraph("Levelling Up Academia – Research Impact Report", styles["Title"]))
-                    story.append(Spacer(1, 12))
-                    story.append(Paragraph(f"<b>Researcher:</b> {author_name}", styles["Heading2"]))
-                    story.append(Paragraph(f"<b>Generated on:</b> {datetime.now().strftime('%B %d, %Y at %I:%M %p')}", styles["Normal"]))
-                    story.append(Spacer(1, 20))
-
-                    table_data = [["Metric", "Value"]] + [[k, str(v)] for k, v in metrics.items()]
-                    table = Table(table_data, colWidths=[360, 140])
-                    table.setStyle(TableStyle([
-                        ('BACKGROUND', (0,0), (-1,0), colors.HexColor("#c084fc")),
-                        ('TEXTCOLOR', (0,0), (-1,0), colors.white),
-                        ('GRID', (0,0), (-1,-1), 0.8, colors.HexColor("#e9d5ff")),
-                        ('BACKGROUND', (0,1), (-1,-1), colors.HexColor("#faf5ff")),
-                        ('ALIGN', (1,1), (-1,-1), 'CENTER'),
-                        ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
-                        ('FONTSIZE', (0,0), (-1,-1), 12),
-                    ]))
-                    story.append(table)
-                    story.append(Spacer(1, 20))
-
-                    top_papers = sorted(papers, key=lambda x: x.get("citationCount", 0) or 0, reverse=True)[:10]
-                    if top_papers:
-                        story.append(Paragraph("<b>Top 10 Most Cited Papers</b>", styles["Heading3"]))
-                        story.append(Spacer(1, 8))
-                        for idx, p in enumerate(top_papers, 1):
-                            title = p.get("title", "Untitled")
-                            year = p.get("year", "n/a")
-                            cites = p.get("citationCount", 0) or 0
-                            authors = ", ".join(a.get("name", "") for a in p.get("authors", [])[:6])
-                            if len(p.get("authors", [])) > 6:
-                                authors += " et al."
-                            story.append(Paragraph(f"{idx}. <b>{title}</b> ({year}) — <font color='#7c3aed'>{cites}</font> citations", styles["Normal"]))
-                            story.append(Paragraph(f"    <i>{authors}</i>", styles["Normal"]))
-                            story.append(Spacer(1, 6))
-
-                    doc.build(story)
-                    buffer.seek(0)
-
-                    st.download_button(
-                        label="Download Professional PDF Report",
-                        data=buffer,
-                        file_name=f"{author_name.replace(' ', '_')}_Research_Impact_Report.pdf",
-                        mime="application/pdf"
-                    )
\ No newline at end of file
+            choice = st.radio("Multiple researchers found. Please select:",
+                              [f"{d['name']} ({d['authorId']})" for d in data],
+                              index=0, key=f"choice-{query}")
+            author_id = choice.split("(")[-1].rstrip(")")
+            author_name = next(d["name"] for d in data if d["authorId"] == author_id)
+
+    if author_id is not None:
+        with st.spinner("Fetching papers..."), telemetry.trace("analysis", query=query) as analysis_trace:
+            # Fetch all papers (served from the local cache when possible),
+            # drawing partial results as batches arrive
+            name_slot = st.empty()
+            cards_slot = st.empty()
+            progress_bar = st.progress(0.0)
+            status_text = st.empty()
+
+            def show_partial(name, m, done, total):
+                progress_bar.progress(done / total if total else 1.0)
+                status_text.text(f"Fetched {m['papers']} papers ({done} of {total} batches)...")
+                render_results(name_slot, cards_slot, name or author_name, display_metrics(m))
+
+            def show_waiting():
+                status_text.text("This researcher is already being analyzed in another session, waiting for it...")
+
+            try:
+                known_name = None if author_id == query else author_name
+                result = analyze(author_id, known_name, show_partial, show_waiting)
+            except FetchError:
+                st.error("Semantic Scholar is not responding right now. Please try again in a minute.")
+                st.stop()
+            finally:
+                progress_bar.empty()
+                status_text.empty()
+            papers, m, complete, traj = result["papers"], result["metrics"], result["complete"], result["trajectory"]
+            author_name = result["name"] or author_name
+
+            if not papers:
+                name_slot.empty()
+                cards_slot.empty()
+                st.error("No publications found for this researcher.")
+            else:
+                metrics = display_metrics(m)
+                render_results(name_slot, cards_slot, author_name, metrics, display_percentiles(m))
+                if not complete:
+                    st.warning("Some papers could not be fetched, so these metrics may be incomplete.")
+
+                if len(traj["year"]) > 1:
+                    st.subheader("Career Trajectory")
+                    st.caption("Each metric as of every year, over the papers published up to that year (today's citation counts).")
+                    st.line_chart(trajectory_frame(traj))
+
+                collab = result["collaboration"]
+                if collab["coauthors"]:
+                    st.subheader("Collaboration Network")
+                    c1, c2, c3, c4 = st.columns(4)
+                    c1.metric("Distinct Co-authors", f"{collab['coauthors']:,}")
+                    c2.metric("Top-5 Collaborator Share", f"{collab['top5_share']:.0%}")
+                    c3.metric("Solo Citation Share", f"{collab['solo_citation_share']:.0%}")
+                    c4.metric("Team Citation Share", f"{collab['team_citation_share']:.0%}")
+                    st.dataframe(pd.DataFrame(collab["top"]).rename(columns={
+                        "name": "Collaborator", "authorId": "Author ID", "papers": "Joint Papers",
+                        "citations": "Joint Citations"}), hide_index=True)
+
+                st.download_button(
+                    label="Download Professional PDF Report",
+                    data=lambda: pdf_report(author_id, author_name, metrics, papers, traj),
+                    file_name=f"{author_name.replace(' ', '_')}_Research_Impact_Report.pdf",
+                    mime="application/pdf",
+                    on_click="ignore",
+                )
+        st.session_state.last_trace = analysis_trace.to_dict()
+
+if show_debug:
+    with debug_panel:
+        render_debug_panel(st.session_state.get("last_trace"))